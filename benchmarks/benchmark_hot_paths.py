@@ -0,0 +1,205 @@
+"""Benchmark suite timing the scraper and application hot paths offline, against recorded or generated FbRef pages.
+
+Every request is served by the ReplayAdapter of FbRefScraper, so the suite never connects to fbref.com. Pages are
+replayed from a fixture directory recorded with FBREF_REPLAY=record (see tests/test_scraper.py) when --fixtures is
+passed, otherwise from generated pages of a similar size and layout written to a temporary fixture directory. The
+suite times _scrape_table, _process_table and each scrape_* method on a new scraper, so that every call requests and
+parses its page, and the redraw triggered by FbRefApplication._update on an off-screen Agg canvas. As _update only
+submits the selection to the data loader, the redraw is timed as the _load of the selected metrics followed by the
+ScatterRenderer draw of _apply, on an application built without its tkinter widgets. The draw_idle of the Agg canvas
+renders the figure at once, so the redraw includes its one rasterization, the span FbRefApplication.REDRAW_TARGET
+covers.
+
+The mean milliseconds per call can be saved as a json baseline, and compared against a previous baseline: the suite
+exits with status 1 if any hot path is slower than the baseline by more than the tolerance factor.
+
+Usage:
+    python benchmarks/benchmark_hot_paths.py [--fixtures DIR] [--repeat N] [--save PATH] [--baseline PATH]
+        [--tolerance FACTOR]
+
+"""
+
+# Import dependencies
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+from matplotlib.figure import Figure  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.scraper import FbRefScraper  # noqa: E402
+from modules.replay import ReplayAdapter  # noqa: E402
+from modules.analysis import ProjectionEngine  # noqa: E402
+from modules.metric_cache import MetricCache  # noqa: E402
+from modules.renderer import ScatterRenderer  # noqa: E402
+from modules.application import FbRefApplication  # noqa: E402
+from benchmark_parser import generate_page  # noqa: E402
+
+
+# Define the squad code of the generated match log page
+SQUAD_CODE = '00000000'
+
+
+def generate_match_log(n_matches: int = 38) -> str:
+    """Generates a html page laid out like an FbRef squad scores and fixtures page."""
+    rows = []
+    for i in range(n_matches):
+        played = i < n_matches - 5
+        cells = {'comp': 'Premier League',
+                 'round': f"Matchweek {i + 1}",
+                 'venue': 'Home' if i % 2 else 'Away',
+                 'result': 'WDL'[i % 3] if played else '',
+                 'goals_for': str(i % 4) if played else '',
+                 'goals_against': str(i % 3) if played else '',
+                 'opponent': f"Squad {i % 19}",
+                 'xg_for': f"{i % 5 * 0.6:.1f}" if played else '',
+                 'xg_against': f"{i % 4 * 0.7:.1f}" if played else '',
+                 'possession': str(40 + i % 20) if played else '',
+                 'attendance': f"{50000 + i * 97:,}" if played else ''}
+        rows.append(f'<tr><th scope="row" class="left " data-stat="date">{2021 + (i + 32) // 52}-'
+                    f'{((i + 32) % 52) // 5 + 1:02d}-{((i + 32) % 52) % 5 * 6 + 1:02d}</th>' +
+                    ''.join(f'<td class="left " data-stat="{stat}">{value}</td>' for stat, value in cells.items()) +
+                    '</tr>')
+    return f'<html><body><table id="matchlogs_for"><thead><tr><th class="poptip center" data-stat="date">Date</th>' \
+           f'</tr></thead><tbody>{"".join(rows)}</tbody></table></body></html>'
+
+
+def record_generated(directory: str):
+    """Writes a generated summaries page for every stat category and a generated match log page as fixtures."""
+    adapter = ReplayAdapter(directory=directory, mode='record', level=logging.WARNING)
+    scraper = FbRefScraper(level=logging.WARNING)
+    for stat, name in FbRefScraper.SUMMARY_STAT_OPTS.items():
+        adapter.store(url=scraper._summaries_url(stat=stat), body=generate_page().replace('standard', name))
+    adapter.store(url=f"https://fbref.com/en/squads/{SQUAD_CODE}/matchlogs/c9/schedule/", body=generate_match_log())
+
+
+def headless_application(scraper: FbRefScraper) -> tuple:
+    """Builds a FbRefApplication without its tkinter widgets, drawing on an off-screen Agg figure.
+
+    Returns:
+        A tuple of the application and the Agg canvas of its figure.
+
+    """
+    app = FbRefApplication.__new__(FbRefApplication)
+    app._log = logging.getLogger("SquadAnalysisGui")
+    app._scraper = scraper
+    app._metrics = MetricCache(scraper=scraper)
+    app._projector = ProjectionEngine(scraper=scraper)
+    fig = Figure(figsize=(8, 6))
+    canvas = FigureCanvasAgg(fig)
+    app._renderer = ScatterRenderer(ax=fig.add_subplot())
+    return app, canvas
+
+
+def redraw(app: FbRefApplication, selection: dict):
+    """Loads the data of a selection and draws it as FbRefApplication._apply does, rendering the figure once."""
+    data = app._load(selection=selection)
+    app._renderer.draw(x=data['x'], y=data['y'], title=data['title'],
+                       xlabel=data['label']['x'], ylabel=data['label']['y'])
+
+
+def mean_ms(function, repeat: int, setup=None) -> float:
+    """Returns the mean number of milliseconds taken by function over repeat calls, excluding the time of setup."""
+    seconds = 0.0
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        seconds += time.perf_counter() - start
+    return seconds / repeat * 1e3
+
+
+def run(fixtures_dir: str, repeat: int) -> dict:
+    """Times each hot path against the fixtures, returning the mean milliseconds per call keyed by hot path."""
+    def new_scraper():
+        return FbRefScraper(level=logging.WARNING, replay_dir=fixtures_dir),
+
+    # Find the table of the standard stats page and a squad code to scrape the match log of
+    scraper, = new_scraper()
+    url, table_id = scraper._player_summaries_source(stat='stats')
+    table = scraper._scrape_table(url=url, table_id=table_id)
+    code = SQUAD_CODE if ReplayAdapter(directory=fixtures_dir).load(
+        url=f"https://fbref.com/en/squads/{SQUAD_CODE}/matchlogs/c9/schedule/") else \
+        next(iter(scraper.scrape_squad_codes().values()))
+
+    results = dict()
+    results['_scrape_table'] = mean_ms(lambda s: s._scrape_table(url=url, table_id=table_id), repeat, new_scraper)
+    results['_process_table'] = mean_ms(lambda: scraper._process_table(table=table), repeat)
+    results['scrape_squad_codes'] = mean_ms(lambda s: s.scrape_squad_codes(), repeat, new_scraper)
+    results['scrape_player_codes'] = mean_ms(lambda s: s.scrape_player_codes(), repeat, new_scraper)
+    results['scrape_squad_summaries'] = mean_ms(lambda s: s.scrape_squad_summaries(stat='stats', vs='for'), repeat,
+                                                new_scraper)
+    results['scrape_player_summaries'] = mean_ms(lambda s: s.scrape_player_summaries(stat='stats'), repeat,
+                                                 new_scraper)
+    results['scrape_page_tables'] = mean_ms(lambda s: s.scrape_page_tables(url=url, prefixes=['stats_squads']),
+                                            repeat, new_scraper)
+    results['scrape_match_logs'] = mean_ms(lambda s: s.scrape_match_logs(code=code), repeat, new_scraper)
+
+    # Draw random metric pairs of the standard stats page, warming the caches as the first redraw of each metric does
+    random.seed(0)
+    app, _ = headless_application(scraper=scraper)
+    metrics = [column for column in scraper.get_player_summaries(stat='stats').columns
+               if column in scraper.get_squad_summaries(stat='stats', vs='for').columns]
+    selections = [{'table': random.choice(['squad', 'player']), 'projection': False,
+                   'x': ('stats', 'for', random.choice(metrics)), 'y': ('stats', 'for', random.choice(metrics))}
+                  for _ in range(repeat)]
+    for selection in selections:
+        redraw(app, selection)
+    selections = iter(selections)
+    results['FbRefApplication._update'] = mean_ms(lambda: redraw(app, next(selections)), repeat)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help="directory of recorded fbref.com pages, defaults to generated pages")
+    parser.add_argument('--repeat', type=int, default=20, help="number of times each hot path is timed")
+    parser.add_argument('--save', help="path to save the timings to as a json baseline")
+    parser.add_argument('--baseline', help="path of a json baseline to compare the timings against")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="slowdown factor reported as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as generated_dir:
+        if args.fixtures is None:
+            record_generated(directory=generated_dir)
+        results = run(fixtures_dir=args.fixtures or generated_dir, repeat=args.repeat)
+
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    regressions = []
+    for name, ms in results.items():
+        line = f"{name + ':':<30}{ms:9.3f} ms"
+        if name in baseline:
+            ratio = ms / baseline[name]
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio > args.tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"regressions:  {', '.join(regressions)} slower than {args.tolerance}x the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark comparing the lxml table extraction in FbRefScraper against the previous BeautifulSoup implementation.
+
+The benchmark parses an FbRef summaries page, either a saved copy passed with --html or a generated page of a similar
+size and layout, extracts the squad and player tables with both implementations, checks that both produce the same
+values and reports the mean time per page.
+
+Usage:
+    python benchmarks/benchmark_parser.py [--html PATH] [--repeat N]
+
+"""
+
+# Import dependencies
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from modules.scraper import FbRefScraper  # noqa: E402
+
+
+TABLES = {'stats_squads_standard_for': ('squad', True),
+          'stats_squads_standard_against': ('squad', True),
+          'stats_standard': ('player', False)}
+
+
+def generate_page(n_squads: int = 20, n_players: int = 600, n_metrics: int = 30) -> str:
+    """Generates a html page laid out like an FbRef standard stats page, with two of its three tables commented out."""
+    metrics = [f"metric_{i}" for i in range(n_metrics)]
+
+    def squad_table(table_id, prefix):
+        rows = ''.join(f'<tr><th scope="row" class="left " data-stat="squad"><a href="/en/squads/{i:08x}/Squad-{i}">'
+                       f'{prefix}Squad {i}</a></th>' +
+                       ''.join(f'<td class="right " data-stat="{m}">{i * j / 7:.2f}</td>'
+                               for j, m in enumerate(metrics)) +
+                       '</tr>' for i in range(n_squads))
+        return f'<table id="{table_id}"><thead><tr><th class="poptip center" data-stat="squad">Squad</th></tr>' \
+               f'</thead><tbody>{rows}</tbody></table>'
+
+    def player_table(table_id):
+        rows = []
+        for i in range(n_players):
+            if i and i % 25 == 0:
+                rows.append('<tr class="thead"><th class="ranker poptip right" data-stat="ranker">Rk</th></tr>')
+            rows.append(f'<tr><th scope="row" class="right " data-stat="ranker">{i + 1}</th>'
+                        f'<td class="left " data-stat="player"><a href="/en/players/{i:08x}/P-{i}">Player {i}</a></td>'
+                        f'<td class="left " data-stat="squad"><a href="/en/squads/x/S">Squad {i % n_squads}</a></td>' +
+                        ''.join(f'<td class="right " data-stat="{m}">{"" if (i + j) % 11 == 0 else i * j}</td>'
+                                for j, m in enumerate(metrics)) + '</tr>')
+        return f'<table id="{table_id}"><tbody>{"".join(rows)}</tbody></table>'
+
+    navigation = ''.join(f'<li><a href="/en/comps/{i}/">Competition {i}</a></li>' for i in range(2000))
+    return f'<html><head><script>var x = "<!-- -->";</script></head><body><ul>{navigation}</ul>' \
+           f'<div>{squad_table("stats_squads_standard_for", "")}</div>' \
+           f'<div><!--\n{squad_table("stats_squads_standard_against", "vs ")}\n--></div>' \
+           f'<div><!--\n{player_table("stats_standard")}\n--></div></body></html>'
+
+
+def legacy_extract(text: str) -> dict:
+    """Extracts and processes the benchmark tables with the regex and BeautifulSoup implementation."""
+    soup = BeautifulSoup(re.compile("<!--|-->").sub("", text), 'lxml')
+    tables = {table['id']: table for table in reversed(soup.find_all('table')) if 'id' in table.attrs}
+
+    frames = dict()
+    for table_id, (index, include_row_header) in TABLES.items():
+        data_dict = dict()
+        for tr in tables[table_id].find_all('tr'):
+            th = tr.find('th')
+            if (th['class'] == ['left']) or (th['class'] == ['right']):
+                if include_row_header:
+                    data_dict.setdefault(th['data-stat'], []).append(th.text)
+                for td in tr.find_all('td'):
+                    try:
+                        data_dict.setdefault(td['data-stat'], []).append(float(td.text))
+                    except ValueError:
+                        data_dict.setdefault(td['data-stat'], []).append(td.text)
+        frames[table_id] = pd.DataFrame(data=data_dict, index=data_dict[index]).drop(labels=[index], axis=1)
+    return frames
+
+
+def lxml_extract(scraper: FbRefScraper, text: str) -> dict:
+    """Extracts and processes the benchmark tables with the lxml implementation in FbRefScraper."""
+    tables = scraper._parse_tables(text=text)
+    return {table_id: scraper._process_table(table=tables[table_id], index=index, include_row_header=header)
+            for table_id, (index, header) in TABLES.items()}
+
+
+def assert_same_values(legacy: pd.DataFrame, new: pd.DataFrame):
+    """Checks the typed columns produced by FbRefScraper hold the same values as the legacy float and text columns."""
+    pd.testing.assert_index_equal(legacy.index, new.index, exact=False)
+    pd.testing.assert_index_equal(legacy.columns, new.columns)
+    for column in new.columns:
+        if pd.api.types.is_numeric_dtype(new[column]):
+            expected = pd.to_numeric(legacy[column].replace('', np.nan)).to_numpy(dtype='float64')
+            actual = new[column].to_numpy(dtype='float64', na_value=np.nan)
+            assert np.allclose(expected, actual, equal_nan=True), column
+        else:
+            assert list(legacy[column]) == list(new[column]), column
+
+
+def mean_seconds(function, repeat: int) -> float:
+    """Returns the mean number of seconds taken by function over repeat calls."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--html', help="path of a saved FbRef standard stats page")
+    parser.add_argument('--repeat', type=int, default=5, help="number of times each implementation is timed")
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = generate_page()
+
+    scraper = FbRefScraper(level=logging.WARNING)
+
+    # Check both implementations produce the same values before timing them
+    legacy = legacy_extract(text)
+    new = lxml_extract(scraper, text)
+    for table_id in TABLES:
+        assert_same_values(legacy[table_id], new[table_id])
+
+    legacy_seconds = mean_seconds(lambda: legacy_extract(text), args.repeat)
+    lxml_seconds = mean_seconds(lambda: lxml_extract(scraper, text), args.repeat)
+
+    print(f"page size:      {len(text) / 1e6:.2f} MB")
+    print(f"beautifulsoup:  {legacy_seconds * 1e3:.1f} ms/page")
+    print(f"lxml:           {lxml_seconds * 1e3:.1f} ms/page")
+    print(f"speedup:        {legacy_seconds / lxml_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
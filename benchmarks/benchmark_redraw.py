@@ -0,0 +1,104 @@
+"""Benchmark comparing the data path of a FbRefApplication redraw against the previous clean and merge implementation.
+
+The benchmark fills a FbRefScraper with generated pages for every stat category, then times preparing the x and y
+values of a scatter plot for random metric pairs, either by cleaning two summaries columns and merging them as
+FbRefApplication._update used to, or by looking up the memoised arrays of a MetricCache. The memo is warmed first, as
+in the application after the first redraw of each metric. Both implementations are checked to produce the same values,
+and the mean time per redraw is reported against FbRefApplication.REDRAW_TARGET.
+
+Usage:
+    python benchmarks/benchmark_redraw.py [--table {squad,player}] [--repeat N]
+
+"""
+
+# Import dependencies
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.scraper import FbRefScraper  # noqa: E402
+from modules.metric_cache import MetricCache  # noqa: E402
+from benchmark_parser import generate_page  # noqa: E402
+
+# Keep in sync with FbRefApplication.REDRAW_TARGET, which is not imported to avoid requiring a display
+REDRAW_TARGET = 0.05
+
+
+def fill_scraper(scraper: FbRefScraper):
+    """Stores a generated page for every stat category in the scraper, so that no request is made."""
+    for stat, name in FbRefScraper.SUMMARY_STAT_OPTS.items():
+        text = generate_page().replace('standard', name)
+        scraper._pages[scraper._summaries_url(stat=stat)] = scraper._parse_tables(text=text)
+
+
+def legacy_values(scraper: FbRefScraper, table: str, x_key: tuple, y_key: tuple) -> tuple:
+    """Prepares the plotted values by cleaning and merging two summaries columns, as _update used to."""
+    def column(stat, vs, metric):
+        if table == 'squad':
+            series = scraper.get_squad_summaries(stat=stat, vs=vs)[metric].copy()
+        else:
+            series = scraper.get_player_summaries(stat=stat)[metric].copy()
+        series.replace('', np.nan, inplace=True)
+        series.dropna(inplace=True)
+        return series
+
+    df = pd.merge(column(*x_key), column(*y_key), left_index=True, right_index=True)
+    return df[df.columns[0]].to_numpy(dtype='float64'), df[df.columns[1]].to_numpy(dtype='float64')
+
+
+def memo_values(metrics: MetricCache, table: str, x_key: tuple, y_key: tuple) -> tuple:
+    """Prepares the plotted values from the memoised arrays of a MetricCache."""
+    x, y, _ = metrics.pair(x_key=(table,) + x_key, y_key=(table,) + y_key)
+    return x, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--table', choices=['squad', 'player'], default='player', help="table to plot")
+    parser.add_argument('--repeat', type=int, default=200, help="number of redraws timed")
+    args = parser.parse_args()
+
+    scraper = FbRefScraper(level=logging.WARNING)
+    fill_scraper(scraper)
+    metrics = MetricCache(scraper=scraper)
+
+    # Draw random metric pairs, warming the memo and checking both implementations agree
+    random.seed(0)
+    stats = list(FbRefScraper.SUMMARY_STAT_OPTS)
+    names = [f"metric_{i}" for i in range(30)]
+    pairs = [((random.choice(stats), random.choice(['for', 'against']), random.choice(names)),
+              (random.choice(stats), random.choice(['for', 'against']), random.choice(names)))
+             for _ in range(args.repeat)]
+    for x_key, y_key in pairs:
+        legacy = legacy_values(scraper, args.table, x_key, y_key)
+        memo = memo_values(metrics, args.table, x_key, y_key)
+        assert all(np.array_equal(np.sort(a), np.sort(b)) for a, b in zip(legacy, memo))
+
+    def timed(function):
+        start = time.perf_counter()
+        for x_key, y_key in pairs:
+            function(x_key, y_key)
+        return (time.perf_counter() - start) / len(pairs)
+
+    legacy_seconds = timed(lambda x_key, y_key: legacy_values(scraper, args.table, x_key, y_key))
+    memo_seconds = timed(lambda x_key, y_key: memo_values(metrics, args.table, x_key, y_key))
+
+    print(f"table:          {args.table} ({len(metrics.index(table=args.table))} rows)")
+    print(f"clean + merge:  {legacy_seconds * 1e3:.3f} ms/redraw")
+    print(f"memo lookup:    {memo_seconds * 1e3:.3f} ms/redraw")
+    print(f"speedup:        {legacy_seconds / memo_seconds:.1f}x")
+    print(f"target:         {REDRAW_TARGET * 1e3:.0f} ms/redraw, "
+          f"{'met' if memo_seconds <= REDRAW_TARGET else 'missed'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark comparing the frames per second of ScatterRenderer against clearing and re-creating the scatter plot.
+
+The benchmark cycles through a set of metrics as the '<-' and '->' buttons of MenuControlFrame do, drawing a scatter
+plot of each metric against a fixed metric on an off-screen Agg canvas. Each frame is either drawn as
+FbRefApplication._update used to, by clearing the axes and creating a new scatter collection, title and labels, or by
+updating the artists of a ScatterRenderer in place. The figure is fully rendered for every frame in both cases.
+
+Usage:
+    python benchmarks/benchmark_render.py [--points N] [--frames N]
+
+"""
+
+# Import dependencies
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from modules.renderer import ScatterRenderer  # noqa: E402
+
+
+def generate_metrics(n_points: int, n_metrics: int = 30) -> dict:
+    """Generates metric arrays with a different scale per metric, like the columns of a summaries dataframe."""
+    rng = np.random.default_rng(0)
+    return {f"metric_{i}": rng.gamma(shape=2, size=n_points) * 10 ** (i % 4) for i in range(n_metrics)}
+
+
+def legacy_frames(metrics: dict, n_frames: int) -> float:
+    """Draws n_frames frames by clearing the axes and re-creating the plot, returning the frames per second."""
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    names = list(metrics)
+    y = metrics[names[0]]
+
+    start = time.perf_counter()
+    for frame in range(n_frames):
+        name = names[frame % len(names)]
+        ax.clear()
+        ax.scatter(metrics[name], y)
+        ax.set_title("FbRef summary analysis - players")
+        ax.set_xlabel(name)
+        ax.set_ylabel(names[0])
+        fig.canvas.draw()
+    return n_frames / (time.perf_counter() - start)
+
+
+def renderer_frames(metrics: dict, n_frames: int) -> tuple:
+    """Draws n_frames frames with a ScatterRenderer, returning the frames per second and the number of rescales."""
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    renderer = ScatterRenderer(ax=ax)
+    names = list(metrics)
+    y = metrics[names[0]]
+
+    start = time.perf_counter()
+    for frame in range(n_frames):
+        name = names[frame % len(names)]
+        renderer.draw(x=metrics[name], y=y, title="FbRef summary analysis - players", xlabel=name, ylabel=names[0])
+    return n_frames / (time.perf_counter() - start), renderer.rescales
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=600, help="number of points in each frame")
+    parser.add_argument('--frames', type=int, default=120, help="number of frames drawn")
+    args = parser.parse_args()
+
+    metrics = generate_metrics(n_points=args.points)
+    legacy_fps = legacy_frames(metrics, args.frames)
+    renderer_fps, rescales = renderer_frames(metrics, args.frames)
+
+    print(f"points/frame:   {args.points}")
+    print(f"clear + redraw: {legacy_fps:.1f} fps")
+    print(f"in place:       {renderer_fps:.1f} fps ({rescales} of {args.frames} frames rescaled)")
+    print(f"speedup:        {renderer_fps / legacy_fps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""Module contains an analysis engine computing correlations between every metric of FbRef summary data.
+
+Classes:
+    CorrelationEngine: Computes Pearson and Spearman correlation matrices across every numeric metric of the wide
+        summaries dataframes with pairwise masking of missing values, and ranks the strongest pairs.
+    PlayerSimilarity: Finds the players most similar to a player across standardised per 90 minute metrics with a
+        ball tree nearest neighbour index.
+    ProjectionEngine: Projects every numeric metric of selected stat categories onto two dimensions with a cached
+        principal component analysis, scraping the selected categories only.
+
+"""
+
+# Import dependencies
+import re
+import time
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sklearn.neighbors import BallTree
+from sklearn.decomposition import PCA
+
+from modules.scraper import FbRefScraper
+
+
+class CorrelationEngine:
+    """Correlation matrices across every numeric metric of the wide summaries dataframes.
+
+    The metrics of a table are read from its wide dataframe (see FbRefScraper.get_wide_squad_summaries and
+    get_wide_player_summaries), so that the matrix covers every stat category at once. Each correlation uses the rows
+    where both metrics have a value, and Spearman correlations rank both metrics over those rows only. Rather than
+    correlating each pair separately, the sums the correlations are built from are computed for every pair at once with
+    matrix products of the values and of their masks. Matrices are cached with the ranking of their pairs until the
+    scraper's generation changes, so that repeated top-k queries are served from memory.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object the wide dataframes are recalled from.
+
+    """
+
+    # Define the supported correlation methods
+    METHODS = ('pearson', 'spearman')
+
+    def __init__(self, scraper: FbRefScraper, comp: int = 9, season: str = None, min_periods: int = 3,
+                 level=logging.WARNING):
+        """Creates an instance of the CorrelationEngine class.
+
+        Args:
+            scraper: FbRefScraper object the wide dataframes are recalled from.
+            comp: FbRef id of the competition, one of the keys of FbRefScraper.COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+            min_periods: minimum number of rows where both metrics have a value for a correlation to be computed.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("CorrelationEngine")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._comp = comp
+        self._season = season
+        self.min_periods = min_periods
+
+        # Initialise the cache mapping (table, vs, method) to the generation a matrix was computed at, the matrix, the
+        # pairwise counts and the ranking of the pairs
+        self._matrices = dict()
+        self._lock = threading.Lock()
+
+    def matrix(self, table: str = 'squad', vs: str = 'for', method: str = 'pearson') -> pd.DataFrame:
+        """Recalls the correlation matrix of every numeric metric of a table.
+
+        Args:
+            table: 'squad' or 'player'.
+            vs: 'for' or 'against', ignored for players.
+            method: 'pearson', or 'spearman' to correlate the ranks of the values over the rows both metrics share.
+
+        Returns:
+            A square pandas dataframe indexed and labelled by the columns of the wide dataframe, with NaN for pairs with
+            fewer than min_periods shared values or a constant metric.
+
+        Raises:
+            ValueError: If method is not one of METHODS.
+
+        """
+        self._log.debug("'matrix' method called.")
+        return self._recall(table=table, vs=vs, method=method)['matrix']
+
+    def top_k(self, k: int = 10, table: str = 'squad', vs: str = 'for', method: str = 'pearson') -> pd.DataFrame:
+        """Returns the k pairs of distinct metrics with the strongest correlation, positive or negative.
+
+        Args:
+            k: number of pairs to return.
+            table: 'squad' or 'player'.
+            vs: 'for' or 'against', ignored for players.
+            method: 'pearson' or 'spearman'.
+
+        Returns:
+            A pandas dataframe with a row per pair, strongest first, with the 'x' and 'y' columns of the wide dataframe,
+            the correlation 'r' and the number 'n' of rows where both have a value.
+
+        """
+        self._log.debug("'top_k' method called.")
+
+        cached = self._recall(table=table, vs=vs, method=method)
+        rows, cols = cached['ranking'][0][:k], cached['ranking'][1][:k]
+        columns = cached['matrix'].columns
+        return pd.DataFrame(data={'x': columns[rows],
+                                  'y': columns[cols],
+                                  'r': cached['matrix'].to_numpy()[rows, cols],
+                                  'n': cached['counts'][rows, cols]})
+
+    def _recall(self, table: str, vs: str, method: str) -> dict:
+        """Recalls the cached matrix for the specified arguments, computing it if missing or out of date."""
+        if method not in self.METHODS:
+            raise ValueError(f"Invalid argument 'method'. Method '{method}' is not one of {list(self.METHODS)}.")
+        if table == 'player':
+            vs = None
+
+        key = (table, vs, method)
+        generation = self._scraper.generation
+        with self._lock:
+            cached = self._matrices.get(key)
+        if cached is not None and cached['generation'] == generation:
+            return cached
+
+        if table == 'squad':
+            df = self._scraper.get_wide_squad_summaries(vs=vs, comp=self._comp, season=self._season)
+        else:
+            df = self._scraper.get_wide_player_summaries(comp=self._comp, season=self._season)
+        numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+        values = df[numeric].to_numpy(dtype='float64', na_value=np.nan)
+        if method == 'spearman':
+            r, counts = self.spearman(values=values, min_periods=self.min_periods)
+        else:
+            r, counts = self.correlate(values=values, min_periods=self.min_periods)
+
+        # Rank the pairs above the diagonal by absolute correlation, skipping pairs without a correlation
+        rows, cols = np.triu_indices(len(numeric), k=1)
+        strength = np.abs(r[rows, cols])
+        order = np.argsort(-strength[~np.isnan(strength)], kind='stable')
+        rows, cols = rows[~np.isnan(strength)][order], cols[~np.isnan(strength)][order]
+
+        cached = {'generation': generation,
+                  'matrix': pd.DataFrame(data=r, index=numeric, columns=numeric),
+                  'counts': counts,
+                  'ranking': (rows, cols)}
+        with self._lock:
+            self._matrices[key] = cached
+        return cached
+
+    @staticmethod
+    def correlate(values: np.ndarray, min_periods: int = 3) -> tuple:
+        """Computes the Pearson correlation of every pair of columns of a matrix, using the rows where both have values.
+
+        For columns i and j, the sums over the rows where both have a value of x_i, x_i squared and x_i * x_j are
+        computed for every pair at once as matrix products of the values with missing values set to zero and of the
+        mask of present values.
+
+        Args:
+            values: float64 array with a row per observation and a column per metric, with NaN for missing values.
+            min_periods: minimum number of rows where both columns have a value for a correlation to be computed.
+
+        Returns:
+            A tuple of the square array of correlations, with NaN where undefined, and the square array of the number
+            of rows where both columns have a value.
+
+        """
+        present = ~np.isnan(values)
+        mask = present.astype('float64')
+
+        # Centre each column on its mean to limit the loss of precision when subtracting the sums below
+        filled = np.where(present, values, 0.0)
+        filled = np.where(present, filled - filled.sum(axis=0) / np.maximum(mask.sum(axis=0), 1), 0.0)
+
+        counts = mask.T @ mask
+        sums = filled.T @ mask
+        squares = (filled * filled).T @ mask
+        products = filled.T @ filled
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = products - sums * sums.T / counts
+            variance_x = squares - sums * sums / counts
+            variance_y = variance_x.T
+            r = covariance / np.sqrt(variance_x * variance_y)
+
+        r[(counts < min_periods) | ~(variance_x > 0) | ~(variance_y > 0)] = np.nan
+        return np.clip(r, -1.0, 1.0), counts.astype('int64')
+
+    @staticmethod
+    def spearman(values: np.ndarray, min_periods: int = 3) -> tuple:
+        """Computes the Spearman correlation of every pair of columns of a matrix, ranking both over their shared rows.
+
+        Columns are grouped by the rows where they have a value, which are few patterns for the wide dataframes as
+        every metric of a stat category is missing for the same rows. The columns of each pair of groups are ranked
+        once over the rows both groups share, averaging ties, and correlated with correlate, so that every pair is
+        ranked over exactly the rows where both columns have a value.
+
+        Args:
+            values: float64 array with a row per observation and a column per metric, with NaN for missing values.
+            min_periods: minimum number of rows where both columns have a value for a correlation to be computed.
+
+        Returns:
+            A tuple of the square array of correlations, with NaN where undefined, and the square array of the number
+            of rows where both columns have a value.
+
+        """
+        present = ~np.isnan(values)
+        patterns, groups = np.unique(present.T, axis=0, return_inverse=True)
+        members = [np.flatnonzero(groups.ravel() == group) for group in range(len(patterns))]
+        mask = present.astype('float64')
+        r = np.full((values.shape[1], values.shape[1]), np.nan)
+
+        for g in range(len(patterns)):
+            for h in range(g, len(patterns)):
+                rows = patterns[g] & patterns[h]
+                columns_g, columns_h = members[g], members[h]
+                columns = columns_g if g == h else np.concatenate([columns_g, columns_h])
+                ranks = pd.DataFrame(values[np.ix_(rows, columns)]).rank(method='average').to_numpy(dtype='float64')
+                block, _ = CorrelationEngine.correlate(values=ranks, min_periods=min_periods)
+                if g == h:
+                    r[np.ix_(columns_g, columns_g)] = block
+                else:
+                    r[np.ix_(columns_g, columns_h)] = block[:len(columns_g), len(columns_g):]
+                    r[np.ix_(columns_h, columns_g)] = block[len(columns_g):, :len(columns_g)]
+
+        return r, (mask.T @ mask).astype('int64')
+
+
+class PlayerSimilarity:
+    """Nearest neighbour search for the players most similar to a player across every numeric metric.
+
+    The feature matrix is built from the wide player dataframe (see FbRefScraper.get_wide_player_summaries). Counting
+    metrics are converted to per 90 minute rates by dividing them by the number of 90 minutes played, while metrics
+    which already are rates, percentages or averages are kept as they are, and playing time metrics are left out. Each
+    feature is then standardised to zero mean and unit variance, with missing values set to the mean, and the matrix is
+    indexed with a scikit-learn BallTree. The index is rebuilt only when the scraper's generation changes.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object the wide player dataframe is recalled from.
+        leaf_size: leaf size of the ball tree.
+
+    """
+
+    # Define the metrics left out of the features, the pattern of metrics which are not counts, and the minimum number
+    # of 90 minutes played for a player to be indexed
+    EXCLUDED = ('age', 'birth_year', 'minutes', 'minutes_90s', 'games', 'games_starts', 'games_subs', 'unused_subs')
+    RATE_PATTERN = re.compile(r'(_pct|per90|_per_|^avg_|_avg_|_avg$|^average_)')
+    MIN_90S = 1.0
+
+    def __init__(self, scraper: FbRefScraper, comp: int = 9, season: str = None, leaf_size: int = 40,
+                 level=logging.WARNING):
+        """Creates an instance of the PlayerSimilarity class.
+
+        Args:
+            scraper: FbRefScraper object the wide player dataframe is recalled from.
+            comp: FbRef id of the competition, one of the keys of FbRefScraper.COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+            leaf_size: leaf size of the ball tree.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("PlayerSimilarity")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._comp = comp
+        self._season = season
+        self.leaf_size = leaf_size
+
+        # Initialise the index, built on first use together with the generation it was built at
+        self._index = None
+        self._lock = threading.Lock()
+
+    def similar(self, player, k: int = 10, position: str = None, min_minutes: float = 0) -> pd.DataFrame:
+        """Finds the players most similar to a player.
+
+        Args:
+            player: index label of the player in the wide player dataframe, or a player code or name if it is unique.
+            k: number of similar players to return, excluding the player itself.
+            position: position the similar players must play (e.g. 'DF'), or None for any position.
+            min_minutes: minimum number of minutes the similar players must have played.
+
+        Returns:
+            A pandas dataframe indexed like the wide player dataframe with a row per similar player, most similar first,
+            with the 'distance' between the standardised features, the 'player' name, the 'position' and the 'minutes'
+            played.
+
+        Raises:
+            ValueError: If the player is not indexed, or a player name matches several players.
+
+        """
+        self._log.debug("'similar' method called.")
+
+        index = self._recall()
+        row = self._locate(labels=index['labels'], names=index['names'], player=player)
+
+        allowed = index['minutes'] >= min_minutes
+        if position is not None:
+            allowed &= index['position'].str.contains(position, regex=False).to_numpy(dtype=bool, na_value=False)
+        allowed[row] = False
+
+        # Query an increasing number of neighbours until k of them pass the filters
+        n = len(index['labels'])
+        query = min(n, 2 * k + 1)
+        while True:
+            distances, rows = index['tree'].query(index['features'][row:row + 1], k=query)
+            keep = allowed[rows[0]]
+            if keep.sum() >= k or query == n:
+                break
+            query = min(n, query * 4)
+
+        distances, rows = distances[0][keep][:k], rows[0][keep][:k]
+        return pd.DataFrame(data={'distance': distances,
+                                  'player': index['names'][rows],
+                                  'position': index['position'].to_numpy()[rows],
+                                  'minutes': index['minutes'][rows]},
+                            index=index['labels'][rows])
+
+    def features(self) -> pd.DataFrame:
+        """Returns the standardised per 90 minute feature matrix the index is built on."""
+        index = self._recall()
+        return pd.DataFrame(data=index['features'], index=index['labels'], columns=index['columns'])
+
+    def _recall(self) -> dict:
+        """Recalls the index, building it if it has not been built or the scraper's generation changed."""
+        generation = self._scraper.generation
+        with self._lock:
+            if self._index is not None and self._index['generation'] == generation:
+                return self._index
+
+        start = time.perf_counter()
+        df = self._scraper.get_wide_player_summaries(comp=self._comp, season=self._season)
+        nineties = self._column(df=df, metric='minutes_90s')
+        keep = nineties.to_numpy(dtype='float64', na_value=np.nan) >= self.MIN_90S
+        df, nineties = df[keep], nineties[keep].to_numpy(dtype='float64')
+
+        columns, values = [], []
+        for column in df.columns:
+            metric = column.rpartition('.')[2]
+            if metric in self.EXCLUDED or not pd.api.types.is_numeric_dtype(df[column]):
+                continue
+            feature = df[column].to_numpy(dtype='float64', na_value=np.nan)
+            if not self.RATE_PATTERN.search(metric):
+                feature = feature / nineties
+            columns.append(column)
+            values.append(feature)
+        values = np.column_stack(values) if values else np.empty((len(df), 0))
+
+        # Standardise each feature, dropping features without variance and setting missing values to the mean
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(values, axis=0) if len(values) else np.zeros(values.shape[1])
+            std = np.nanstd(values, axis=0) if len(values) else np.zeros(values.shape[1])
+        varied = std > 0
+        features = np.nan_to_num((values[:, varied] - mean[varied]) / std[varied], nan=0.0)
+
+        index = {'generation': generation,
+                 'tree': BallTree(features, leaf_size=self.leaf_size),
+                 'features': features,
+                 'columns': [column for column, keep in zip(columns, varied) if keep],
+                 'labels': df.index,
+                 'names': self._column(df=df, metric='player').to_numpy(dtype=object),
+                 'position': self._column(df=df, metric='position').astype(object).fillna('').astype(str),
+                 'minutes': self._column(df=df, metric='minutes').to_numpy(dtype='float64', na_value=0.0)}
+        self._log.info(f"Indexed {features.shape[0]} players on {features.shape[1]} features in "
+                       f"{time.perf_counter() - start:.3f} seconds.")
+
+        with self._lock:
+            self._index = index
+        return index
+
+    @staticmethod
+    def _column(df: pd.DataFrame, metric: str) -> pd.Series:
+        """Returns a standard stats metric of the wide player dataframe."""
+        return df[FbRefScraper.wide_column(df=df, stat='stats', metric=metric)]
+
+    @staticmethod
+    def _locate(labels: pd.Index, names: np.ndarray, player) -> int:
+        """Returns the row of a player, given by index label, by player code or by unique player name."""
+        if isinstance(player, tuple):
+            rows = np.flatnonzero(labels.isin([player]))
+        else:
+            rows = np.flatnonzero(labels.get_level_values(0) == player)
+            if not len(rows):
+                rows = np.flatnonzero(names == player)
+        if len(rows) != 1:
+            error_msg = f"Invalid argument 'player'. Player {player!r} matches {len(rows)} indexed players."
+            raise ValueError(error_msg)
+        return int(rows[0])
+
+
+class ProjectionEngine:
+    """Two dimensional projection of every numeric metric of selected stat categories.
+
+    The summaries dataframes of the selected categories only (see FbRefScraper.get_squad_summaries and
+    get_player_summaries) are joined with FbRefScraper.build_wide for one or several seasons, so that other categories
+    are neither scraped nor able to break a projection. Their numeric metrics are standardised with missing values set
+    to the mean, and projected onto their first two principal components with scikit-learn. Projections are cached per
+    table, categories, vs and seasons until the scraper's generation changes, so that switching back to a projection is
+    a dictionary lookup.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object the summaries dataframes are recalled from.
+
+    """
+
+    def __init__(self, scraper: FbRefScraper, comp: int = 9, level=logging.WARNING):
+        """Creates an instance of the ProjectionEngine class.
+
+        Args:
+            scraper: FbRefScraper object the summaries dataframes are recalled from.
+            comp: FbRef id of the competition, one of the keys of FbRefScraper.COMPETITIONS.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("ProjectionEngine")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._comp = comp
+
+        # Initialise the cache mapping (table, stats, vs, seasons) to the generation a projection was fitted at and the
+        # projection
+        self._projections = dict()
+        self._lock = threading.Lock()
+
+    def project(self, table: str, stats, vs: str = 'for', seasons=(None,)) -> pd.DataFrame:
+        """Recalls the projection of the metrics of the selected categories, fitting it on first use.
+
+        Args:
+            table: 'squad' or 'player'.
+            stats: stat categories whose metrics are projected, keys of FbRefScraper.SUMMARY_STAT_OPTS.
+            vs: 'for' or 'against', ignored for players.
+            seasons: seasons formatted as on FbRef (e.g. '2020-2021') to project together, with None for the current
+                season.
+
+        Returns:
+            A pandas dataframe with a row per entity and season, indexed by season and the index of the summaries
+            dataframes, with the 'x' and 'y' coordinates. The explained variance ratio of each coordinate is stored in
+            DataFrame.attrs['explained_variance_ratio'].
+
+        """
+        self._log.debug("'project' method called.")
+
+        if table == 'player':
+            vs = None
+        key = (table, tuple(sorted(set(stats))), vs, tuple(seasons))
+        generation = self._scraper.generation
+        with self._lock:
+            cached = self._projections.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        start = time.perf_counter()
+        frames = []
+        for season in seasons:
+            if table == 'squad':
+                stats = {stat: self._scraper.get_squad_summaries(stat=stat, vs=vs, comp=self._comp, season=season)
+                         for stat in key[1]}
+            else:
+                stats = {stat: self._scraper.get_player_summaries(stat=stat, comp=self._comp, season=season)
+                         for stat in key[1]}
+            frames.append(FbRefScraper.build_wide(frames=stats))
+        df = pd.concat(frames, keys=list(seasons), names=['season'])
+
+        columns = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+        values = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+        varied = std > 0
+        features = np.nan_to_num((values[:, varied] - mean[varied]) / std[varied], nan=0.0)
+
+        pca = PCA(n_components=2, random_state=0)
+        coordinates = pca.fit_transform(features)
+        projection = pd.DataFrame(data=coordinates, index=df.index, columns=['x', 'y'])
+        projection.attrs['explained_variance_ratio'] = tuple(pca.explained_variance_ratio_)
+        self._log.info(f"Projected {features.shape[0]} rows of {features.shape[1]} metrics in "
+                       f"{time.perf_counter() - start:.3f} seconds.")
+
+        with self._lock:
+            self._projections[key] = (generation, projection)
+        return projection
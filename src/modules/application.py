@@ -9,13 +9,20 @@ Classes:
 """
 
 # Import dependencies
+import time
 import logging
 
-import numpy as np
-import pandas as pd
 import tkinter as tk
 
+import pandas as pd
+
 from modules.scraper import FbRefScraper
+from modules.analysis import ProjectionEngine
+from modules.data_loader import DataLoader
+from modules.metric_cache import MetricCache
+from modules.scheduler import IdleScheduler
+from modules.renderer import ScatterRenderer
+from modules.instrumentation import Instrumentation
 
 from matplotlib import pyplot as plt
 
@@ -28,13 +35,21 @@ class FbRefApplication:
 
     Attributes:
         _log: logger object for the class
+        _instrumentation: Instrumentation object recording the duration of each load and redraw, shared with _scraper.
         _scraper: FbRefScraper object for scraping, processing, and caching data.
+        _metrics: MetricCache object memoising the cleaned metric arrays plotted by _update.
+        _projector: ProjectionEngine object caching the projections plotted in projection mode.
+        _loader: DataLoader object recalling the plotted data on a worker thread.
+        _scheduler: IdleScheduler object coalescing widget callbacks into one call of _update per idle cycle.
+        _redraw_seconds: number of seconds the last redraw took to load and draw its data.
         _root: tkinter top-level widget for displaying and running the application.
         _frame_table: custom tkinter Frame widget with controls for selecting whether to display squad or player data.
         _frame_data_x: custom tkinter Frame widget with controls for selecting data for x-axis.
         _frame_data_y: custom tkinter Frame widget with controls for selecting data for y_axis.
+        _status: tkinter Label widget showing whether data is loading or failed to load.
         _fig: matplotlib Figure object for containing _ax.
         _ax: matplotlib Axes object for displaying scatter plots.
+        _renderer: ScatterRenderer object updating the scatter plot on _ax in place.
 
     """
 
@@ -42,15 +57,31 @@ class FbRefApplication:
     PAD_X = 2
     PAD_Y = 2
 
-    def __init__(self, level=logging.WARNING):
+    # Define the target number of seconds for a redraw from cached data, covering the _load of the selection and the
+    # ScatterRenderer draw of _apply, which includes one rasterization of the figure on canvases rendering on draw_idle,
+    # slower redraws are logged as warnings
+    REDRAW_TARGET = 0.05
+
+    # Define the number of milliseconds between polls for data loaded in the background
+    POLL_INTERVAL = 20
+
+    # Define the number of snapshot versions kept when the data used in a session is saved
+    SNAPSHOT_VERSIONS = 5
+
+    def __init__(self, level=logging.WARNING, snapshot_dir: str = None, instrumentation: Instrumentation = None):
         """Creates an instance of the FbRefAnalysisGui class.
 
         Function initialises an instance of the class by creating a logger matching the class name and setting the log
         level at the specified level. Default and custom tkinter widgets are then initialised and packed before the
-        application is run.
+        application is run. If a snapshot directory is specified, data is loaded from the latest snapshot instead of
+        being scraped, and if any data was scraped in the session it is saved as a new snapshot when the application is
+        closed, keeping the SNAPSHOT_VERSIONS most recent versions. If an Instrumentation object is specified, the
+        scraper and the application record their measurements to it.
 
         Args:
             level: specifies the level of logging messages to record
+            snapshot_dir: directory of a snapshot store to load data from and save data to, disabled if None.
+            instrumentation: Instrumentation object to record measurements to, disabled if None.
 
         """
 
@@ -61,43 +92,64 @@ class FbRefApplication:
         # Logging message for function call
         self._log.debug(msg="'__init__' method called.")
 
-        # Initialise scraper object
-        self._scraper = FbRefScraper(level=logging.DEBUG)
+        # Initialise scraper object, sharing the instrumentation of the application
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation(enabled=False)
+        self._scraper = FbRefScraper(level=logging.DEBUG, snapshot_dir=snapshot_dir, instrumentation=instrumentation)
+        self._metrics = MetricCache(scraper=self._scraper, level=level)
+        self._projector = ProjectionEngine(scraper=self._scraper, level=level)
+        self._loader = DataLoader(level=level)
+        self._redraw_seconds = None
 
         # Initialise and pack widgets using grid
         self._root = tk.Tk()
+        self._scheduler = IdleScheduler(after_idle=self._root.after_idle, callback=self._update, level=level)
         self._frame_table = TableControlFrame(level=level,
                                               master=self._root,
                                               relief='groove',
                                               borderwidth=2,
-                                              _callback=self._update)
+                                              _callback=self._scheduler.request)
         self._frame_data_x = DataControlFrame(level=level,
                                               master=self._root,
                                               relief='groove',
                                               borderwidth=2,
-                                              _callback=self._update)
+                                              _callback=self._scheduler.request)
         self._frame_data_y = DataControlFrame(level=level,
                                               master=self._root,
                                               relief='groove',
                                               borderwidth=2,
-                                              _callback=self._update)
+                                              _callback=self._scheduler.request)
         self._frame_table.grid(row=0, column=0, padx=self.PAD_X, pady=self.PAD_Y, sticky='EW')
         self._frame_data_x.grid(row=1, column=0, padx=self.PAD_X, pady=self.PAD_Y)
         self._frame_data_y.grid(row=2, column=0, padx=self.PAD_X, pady=self.PAD_Y)
+        self._status = tk.Label(master=self._root, text='', anchor='w')
+        self._status.grid(row=3, column=0, padx=self.PAD_X, pady=self.PAD_Y, sticky='EW')
 
         # Initialise analysis figure
         self._fig = plt.figure(num=1)
         self._ax = plt.axes()
-        self._update()
+        self._renderer = ScatterRenderer(ax=self._ax, level=level)
+        self._scheduler.request()
+        plt.show(block=False)
 
-        # Run app
+        # Run app, polling for data loaded in the background, then save the data used in the session
+        self._root.after(self.POLL_INTERVAL, self._poll)
         self._root.mainloop()
+        self._loader.shutdown()
+        if snapshot_dir is not None:
+            self._scraper.save_snapshot(directory=snapshot_dir, keep=self.SNAPSHOT_VERSIONS)
 
-    def _update(self, *args):
-        """Retrieves data from the cache for selected options and updates the application figure.
+    def update_stats(self) -> dict:
+        """Returns the number of update requests made by widget callbacks, the number of updates run, and the number
+        of redundant requests suppressed by coalescing them, with the number of stale loads discarded."""
+        return {**self._scheduler.stats(), 'stale': self._loader.stale}
 
-        Args:
-            *args: required for tkinter callback to accept _update as argument.
+    def _update(self):
+        """Requests the data for the selected options in the background and shows a loading state until it arrives.
+
+        Function is run by the idle scheduler at most once per idle cycle, however many widget callbacks requested an
+        update. It reads the selected options on the tkinter thread and submits _load to the data loader, superseding
+        any request still in progress. The figure is updated by _poll once the data has loaded, so that the window
+        stays responsive while data is downloaded.
 
         Returns:
             None
@@ -106,78 +158,146 @@ class FbRefApplication:
         # Logging message for function call
         self._log.debug("'update' method called.")
 
-        # Clear the axis and initialise the new dataframes
-        self._ax.clear()
-        x_df = None
-        y_df = None
-
-        # If squad mode selected
-        if self._frame_table.variable.get() == "squad":
-
-            # Recall squad summary dataframes from the cache
-            x_df = self._scraper.get_squad_summaries(stat=self._frame_data_x.stat_menu.variable.get(),
-                                                     vs=self._frame_data_x.vs_menu.variable.get())
-            y_df = self._scraper.get_squad_summaries(stat=self._frame_data_y.stat_menu.variable.get(),
-                                                     vs=self._frame_data_y.vs_menu.variable.get())
-
-            # Enable child widgets in vs_menu widget
-            for child in self._frame_data_x.vs_menu.winfo_children():
-                child.configure(stat='normal')
-            for child in self._frame_data_y.vs_menu.winfo_children():
-                child.configure(stat='normal')
-
-            # Update plot title
-            plt.title("FbRef summary analysis - squads")
-
-        # If player mode selected
-        if self._frame_table.variable.get() == "player":
-
-            # Recall player summary dataframes from the cache
-            x_df = self._scraper.get_player_summaries(stat=self._frame_data_x.stat_menu.variable.get())
-            y_df = self._scraper.get_player_summaries(stat=self._frame_data_y.stat_menu.variable.get())
-
-            # Disable child widgets in vs_menu widget
-            for child in self._frame_data_x.vs_menu.winfo_children():
-                child.configure(stat='disable')
-            for child in self._frame_data_y.vs_menu.winfo_children():
-                child.configure(stat='disable')
-
-            # Update plot title
-            plt.title("FbRef summary analysis - players")
-
-        # Update menu widget values if required
-        if self._frame_data_x.metric_menu.values != list(x_df.columns):
-            self._frame_data_x.metric_menu.update_values(values=list(x_df.columns))
-        if self._frame_data_y.metric_menu.values != list(y_df.columns):
-            self._frame_data_y.metric_menu.update_values(values=list(y_df.columns))
-
-        # Clean x_df and y_df by dropping columns with blanks or NaN values then merge the dataframes
-        x = x_df[self._frame_data_x.metric_menu.variable.get()]
-        x.replace('', np.nan, inplace=True)
-        x.dropna(inplace=True)
-        y = y_df[self._frame_data_y.metric_menu.variable.get()]
-        y.replace('', np.nan, inplace=True)
-        y.dropna(inplace=True)
-        df = pd.merge(x, y, left_index=True, right_index=True)
-
-        # Update the plot
-        plt.scatter(df[df.columns[0]], df[df.columns[1]])
-        plt.xlabel(self._frame_data_x.metric_menu.variable.get())
-        plt.ylabel(self._frame_data_y.metric_menu.variable.get())
-        plt.show(block=False)
+        selection = {'table': self._frame_table.variable.get(),
+                     'projection': self._frame_table.projection.get(),
+                     'x': (self._frame_data_x.stat_menu.variable.get(),
+                           self._frame_data_x.vs_menu.variable.get(),
+                           self._frame_data_x.metric_menu.variable.get()),
+                     'y': (self._frame_data_y.stat_menu.variable.get(),
+                           self._frame_data_y.vs_menu.variable.get(),
+                           self._frame_data_y.metric_menu.variable.get())}
+        self._loader.submit(self._load, selection)
+        self._status.configure(text='Loading...')
+        self._instrumentation.count('updates')
+
+    def _load(self, selection: dict) -> dict:
+        """Recalls the data for the specified selection, run on a worker thread of the data loader.
+
+        Function recalls the summaries dataframes of the selected categories to find their metrics, falling back to the
+        first numeric metric of a category if the selected metric is not one of them, then recalls the cleaned arrays of
+        the selected metrics keeping the rows where both have a value. In projection mode, the values are instead the
+        projection of every metric of the selected categories, using the 'vs' data selected for the x-axis.
+
+        Args:
+            selection: dictionary with the selected 'table' and 'projection' mode, and the stat, vs and metric of the
+                'x' and 'y' axes.
+
+        Returns:
+            A dictionary with the 'table', the 'columns', 'metric' and 'label' of each axis, the plot 'title', and the
+            'x' and 'y' values.
+
+        """
+        table = selection['table']
+        data = {'table': table, 'columns': dict(), 'metric': dict()}
+        keys = dict()
+        for axis in ('x', 'y'):
+            stat, vs, metric = selection[axis]
+            if table == 'squad':
+                df = self._scraper.get_squad_summaries(stat=stat, vs=vs)
+            else:
+                df = self._scraper.get_player_summaries(stat=stat)
+            data['columns'][axis] = list(df.columns)
+            if metric not in df.columns:
+                numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+                metric = numeric[0] if numeric else df.columns[0]
+            data['metric'][axis] = metric
+            keys[axis] = (table, stat, vs, data['metric'][axis])
+
+        if selection['projection']:
+            projection = self._projector.project(table=table, stats=[selection['x'][0], selection['y'][0]],
+                                                 vs=selection['x'][1])
+            data['x'], data['y'] = projection['x'].to_numpy(), projection['y'].to_numpy()
+            ratios = projection.attrs['explained_variance_ratio']
+            data['label'] = {'x': f"PC1 ({ratios[0]:.0%})", 'y': f"PC2 ({ratios[1]:.0%})"}
+            data['title'] = f"FbRef summary analysis - {table}s projection"
+        else:
+            data['x'], data['y'], _ = self._metrics.pair(x_key=keys['x'], y_key=keys['y'])
+            data['label'] = data['metric']
+            data['title'] = f"FbRef summary analysis - {table}s"
+        return data
+
+    def _poll(self):
+        """Applies the data of the latest request once it has loaded, then schedules the next poll.
+
+        The next poll is scheduled even if applying the data raises, so that a single failure does not stop the
+        application from showing later data.
+
+        """
+        try:
+            loaded = self._loader.poll()
+            if loaded is not None:
+                generation, data, error, seconds = loaded
+                if seconds is not None:
+                    self._instrumentation.record('load', seconds)
+                if error is not None:
+                    self._instrumentation.count('load_errors')
+                    self._log.warning(f"Failed to load data: {error!r}")
+                    self._status.configure(text=f"Failed to load data: {error}")
+                else:
+                    self._apply(data=data, seconds=seconds)
+        finally:
+            self._root.after(self.POLL_INTERVAL, self._poll)
+
+    def _apply(self, data: dict, seconds: float):
+        """Updates the widgets and the application figure with loaded data, on the tkinter thread.
+
+        Args:
+            data: dictionary returned by _load.
+            seconds: number of seconds _load took.
+
+        Returns:
+            None
+
+        """
+        # Logging message for function call
+        self._log.debug("'_apply' method called.")
+        start = time.perf_counter()
+
+        # Enable child widgets in vs_menu widget for squads, disable them for players
+        state = 'normal' if data['table'] == 'squad' else 'disable'
+        for child in self._frame_data_x.vs_menu.winfo_children():
+            child.configure(state=state)
+        for child in self._frame_data_y.vs_menu.winfo_children():
+            child.configure(state=state)
+
+        # Update menu widget values if required, selecting the metrics _load plotted without requesting another update
+        with self._scheduler.paused():
+            for frame, axis in ((self._frame_data_x, 'x'), (self._frame_data_y, 'y')):
+                if frame.metric_menu.values != data['columns'][axis]:
+                    frame.metric_menu.update_values(values=data['columns'][axis], value=data['metric'][axis])
+
+        # Update the plot in place
+        with self._instrumentation.stage('draw'):
+            self._renderer.draw(x=data['x'], y=data['y'],
+                                title=data['title'],
+                                xlabel=data['label']['x'],
+                                ylabel=data['label']['y'])
+        if not self._loader.pending:
+            self._status.configure(text='')
+
+        # Record the redraw latency against the target
+        self._redraw_seconds = seconds + time.perf_counter() - start
+        self._instrumentation.record('redraw', self._redraw_seconds)
+        if self._redraw_seconds > self.REDRAW_TARGET:
+            self._instrumentation.count('redraw_target_missed')
+            self._log.warning(f"Redraw took {self._redraw_seconds * 1e3:.1f} ms, target is "
+                              f"{self.REDRAW_TARGET * 1e3:.0f} ms.")
 
 
 class TableControlFrame(tk.Frame):
     """Custom tkinter Frame widget for switching between squad and player summary data.
 
         Application allows user to switch between visualising cached squad and player summary data using tkinter radio
-        buttons. Selecting player summary data disables user from interacting with 'vs' menus.
+        buttons. Selecting player summary data disables user from interacting with 'vs' menus. Checking the projection
+        button plots a 2-D projection of every metric of the selected categories instead of the selected metrics.
 
         Attributes:
             _log: logger object for the class.
             variable: tk StringVar object for storing selected radio button value.
+            projection: tk BooleanVar object for storing whether projection mode is selected.
             radio_squad: tk Radio widget for selecting squad data.
             radio_player: tk Radio widget for selecting player data.
+            check_projection: tk Checkbutton widget for selecting projection mode.
 
         """
 
@@ -215,8 +335,15 @@ class TableControlFrame(tk.Frame):
                                            variable=self.variable,
                                            value='player',
                                            command=_callback)
+        self.projection = tk.BooleanVar()
+        self.projection.set(False)
+        self.check_projection = tk.Checkbutton(master=self,
+                                               text='projection',
+                                               variable=self.projection,
+                                               command=_callback)
         self.radio_squad.grid(row=0, column=0, padx=self.PAD_X, pady=self.PAD_Y)
         self.radio_player.grid(row=0, column=1, padx=self.PAD_X, pady=self.PAD_Y)
+        self.check_projection.grid(row=0, column=2, padx=self.PAD_X, pady=self.PAD_Y)
 
 
 class DataControlFrame(tk.Frame):
@@ -333,14 +460,15 @@ class MenuControlFrame(tk.Frame):
         self.menu.grid(row=0, column=1)
         self._button_fw.grid(row=0, column=2)
 
-    def update_values(self, values):
+    def update_values(self, values, value=None):
         """Updates the menu options with the specified values.
 
-        Updates the values property with the give values, sets the variable to the first value in values, clears all
-        values currently in the menu, and finally adds all the new values to the menu widget.
+        Updates the values property with the give values, sets the variable to the specified value or the first value in
+        values, clears all values currently in the menu, and finally adds all the new values to the menu widget.
 
         Args:
             values: List of values to show in the tkinter menu widget.
+            value: value to select, defaults to the first value in values.
 
         Returns:
             None
@@ -350,7 +478,7 @@ class MenuControlFrame(tk.Frame):
         self._log.debug(msg="'callback_optionmenu_stat' method called.")
         # Update the menu widget with the given values
         self.values = values
-        self.variable.set(self.values[0])
+        self.variable.set(value if value is not None else self.values[0])
         self.menu["menu"].delete(0, "end")
         for string in self.values:
             self.menu["menu"].add_command(label=string,
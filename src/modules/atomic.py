@@ -0,0 +1,32 @@
+"""Module contains a helper for writing files atomically.
+
+Functions:
+    write_atomic: Writes data to a file through a temporary file replacing it, so that readers never see a partial file.
+
+"""
+
+# Import dependencies
+import os
+import threading
+
+
+def write_atomic(path: str, data):
+    """Writes data to the specified path through a temporary file so readers never see a partial file.
+
+    The temporary file is named after the process and thread, so that concurrent writers of the same path do not write
+    to the same temporary file, and replaces the file at the path once it is complete.
+
+    Args:
+        path: path of the file to write.
+        data: bytes, or text written as utf-8.
+
+    Returns:
+        None
+
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
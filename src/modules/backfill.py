@@ -0,0 +1,169 @@
+"""Module contains a resumable job runner for backfilling historical summaries data from https://fbref.com/en/.
+
+Classes:
+    BackfillRunner: Runs (competition, season, stat) scraping jobs from a persistent sqlite queue with bounded
+        concurrency, checkpointing each completed job to a snapshot store.
+
+"""
+
+# Import dependencies
+import time
+import sqlite3
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.scraper import FbRefScraper
+from modules.snapshot import SnapshotStore
+
+
+class BackfillRunner:
+    """Resumable runner scraping summaries dataframes for every (competition, season, stat) job in a persistent queue.
+
+    Jobs are stored in a sqlite database with their status, so that a crawl interrupted at any point resumes with the
+    jobs which had not completed. Each job scrapes the 'for' and 'against' squad summaries and the player summaries of
+    one stat category, appends them to a version of a snapshot store, and only then marks the job as done. Failed jobs
+    are retried on later runs until they reach max_attempts.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object used to scrape each job.
+        _store: SnapshotStore object completed jobs are written to.
+        _db: sqlite connection to the job queue.
+        version: name of the snapshot version completed jobs are written to.
+        max_workers: maximum number of jobs run at the same time.
+        max_attempts: maximum number of times a job is attempted.
+
+    """
+
+    # Define the value stored in the queue for the current season, as sqlite primary keys cannot hold NULL
+    CURRENT_SEASON = ''
+
+    def __init__(self, scraper: FbRefScraper, queue_path: str, snapshot_dir: str, version: str = 'backfill',
+                 max_workers: int = 2, max_attempts: int = 3, level=logging.WARNING):
+        """Creates an instance of the BackfillRunner class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level, then opens the job queue, creating it if it does not exist.
+
+        Args:
+            scraper: FbRefScraper object used to scrape each job.
+            queue_path: path of the sqlite database holding the job queue.
+            snapshot_dir: directory of the snapshot store completed jobs are written to.
+            version: name of the snapshot version completed jobs are written to.
+            max_workers: maximum number of jobs run at the same time.
+            max_attempts: maximum number of times a job is attempted.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("BackfillRunner")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._store = SnapshotStore(directory=snapshot_dir, level=level)
+        self.version = version
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+
+        # Open the job queue, shared between worker threads behind a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(queue_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                             "comp INTEGER NOT NULL, "
+                             "season TEXT NOT NULL, "
+                             "stat TEXT NOT NULL, "
+                             "status TEXT NOT NULL DEFAULT 'pending', "
+                             "attempts INTEGER NOT NULL DEFAULT 0, "
+                             "error TEXT, "
+                             "seconds REAL, "
+                             "PRIMARY KEY (comp, season, stat))")
+
+    def add_jobs(self, comps, seasons, stats=None) -> int:
+        """Adds a job to the queue for every combination of the specified competitions, seasons and stats.
+
+        Jobs already in the queue are left unchanged, so the same backfill can be declared again on every run.
+
+        Args:
+            comps: list of FbRef competition ids, keys of FbRefScraper.COMPETITIONS.
+            seasons: list of seasons formatted as on FbRef (e.g. '2020-2021'), with None for the current season.
+            stats: list of stat categories, defaults to every key of FbRefScraper.SUMMARY_STAT_OPTS.
+
+        Returns:
+            The number of jobs added to the queue.
+
+        """
+        self._log.debug("'add_jobs' method called.")
+
+        if stats is None:
+            stats = list(FbRefScraper.SUMMARY_STAT_OPTS.keys())
+
+        jobs = [(comp, self.CURRENT_SEASON if season is None else season, stat)
+                for comp in comps for season in seasons for stat in stats]
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO jobs (comp, season, stat) VALUES (?, ?, ?)", jobs)
+            return self._db.total_changes - before
+
+    def run(self) -> dict:
+        """Runs every job in the queue which has not completed, with at most max_workers jobs at the same time.
+
+        Jobs left running by an interrupted run are returned to the queue first.
+
+        Returns:
+            A dictionary mapping each job status to the number of jobs with that status after the run.
+
+        """
+        self._log.debug("'run' method called.")
+
+        with self._lock, self._db:
+            self._db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+            jobs = self._db.execute("SELECT comp, season, stat FROM jobs WHERE status != 'done' AND attempts < ? "
+                                    "ORDER BY comp, season, stat", (self.max_attempts,)).fetchall()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda job: self._run_job(*job), jobs))
+
+        self._log.info(f"Ran {len(jobs)} backfill jobs in {time.perf_counter() - start:.2f} seconds.")
+        return self.status()
+
+    def status(self) -> dict:
+        """Returns a dictionary mapping each job status to the number of jobs in the queue with that status."""
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def _run_job(self, comp: int, season: str, stat: str):
+        """Scrapes the summaries dataframes of a single job, checkpoints them to the snapshot store and records the
+        outcome in the queue."""
+        self._set_status(comp, season, stat, status='running', attempt=True)
+
+        start = time.perf_counter()
+        scrape_season = None if season == self.CURRENT_SEASON else season
+        try:
+            self._scraper.get_squad_summaries(stat=stat, vs='for', comp=comp, season=scrape_season)
+            self._scraper.get_squad_summaries(stat=stat, vs='against', comp=comp, season=scrape_season)
+            self._scraper.get_player_summaries(stat=stat, comp=comp, season=scrape_season)
+            frames, info = self._scraper.release(stat=stat, comp=comp, season=scrape_season)
+            self._store.append(frames=frames, info=info, version=self.version)
+        except Exception as e:
+            self._scraper.release(stat=stat, comp=comp, season=scrape_season)
+            self._log.warning(f"Backfill job ({comp}, '{season}', '{stat}') failed: {e!r}")
+            self._set_status(comp, season, stat, status='failed', error=repr(e), seconds=time.perf_counter() - start)
+            return
+
+        self._set_status(comp, season, stat, status='done', seconds=time.perf_counter() - start)
+
+    def _set_status(self, comp: int, season: str, stat: str, status: str, attempt: bool = False, error: str = None,
+                    seconds: float = None):
+        """Updates the status of a job in the queue, counting a new attempt if attempt is True."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE jobs SET status = ?, attempts = attempts + ?, error = ?, seconds = ? "
+                             "WHERE comp = ? AND season = ? AND stat = ?",
+                             (status, int(attempt), error, seconds, comp, season, stat))
+
+    def close(self):
+        """Closes the connection to the job queue."""
+        self._db.close()
@@ -0,0 +1,258 @@
+"""Module contains a headless batch renderer exporting scatter plots of FbRef summary data from a snapshot.
+
+The renderer draws with matplotlib's Agg backend, so it runs without a display, and renders the plots across a pool of
+processes which each load the snapshot once.
+
+Classes:
+    BatchRenderer: Renders a scatter plot image for each pair of metrics of a snapshot across a process pool.
+
+Usage:
+    python -m modules.batch SNAPSHOT_DIR OUT_DIR [--table {squad,player}] [--vs {for,against}]
+        [--pair STAT:VS:METRIC STAT:VS:METRIC ...] [--format {png,svg}] [--processes N]
+
+"""
+
+# Import dependencies
+import os
+import re
+import time
+import logging
+import argparse
+import itertools
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from matplotlib.figure import Figure
+
+from modules.scraper import FbRefScraper
+from modules.snapshot import SnapshotStore
+from modules.renderer import ScatterRenderer
+
+
+# Define the state of a worker process, loaded once by _init_worker and reused for every plot the worker renders
+_worker = dict()
+
+
+class BatchRenderer:
+    """Headless renderer exporting scatter plots of pairs of metrics loaded from a snapshot store.
+
+    Each metric is identified by a tuple of its stat category, 'for' or 'against' (ignored for players) and column, as
+    in FbRefApplication. The dataframes of the selected table are loaded from the snapshot and joined into wide
+    dataframes with FbRefScraper.build_wide once per worker process, and each worker reuses a single figure through a
+    ScatterRenderer, so that rendering a plot only draws and writes the image. The renderer fits the axis limits to the
+    data of every plot, so that an image does not depend on the plots its worker rendered before. Nothing is scraped:
+    metrics of stat categories missing from the snapshot cannot be plotted.
+
+    Attributes:
+        _log: logger object for the class.
+        snapshot_dir: directory of the snapshot store to load dataframes from.
+        out_dir: directory the images are written to.
+        table: 'squad' or 'player'.
+        comp: FbRef id of the competition.
+        season: season formatted as on FbRef, or None for the current season.
+        version: name of the snapshot version, or None for the latest version.
+        fmt: image format, 'png' or 'svg'.
+        processes: number of worker processes, or None for the number of CPUs.
+
+    """
+
+    # Define the image formats which can be rendered
+    FORMATS = ('png', 'svg')
+
+    def __init__(self, snapshot_dir: str, out_dir: str, table: str = 'squad', comp: int = 9, season: str = None,
+                 version: str = None, fmt: str = 'png', processes: int = None, level=logging.WARNING):
+        """Creates an instance of the BatchRenderer class.
+
+        Args:
+            snapshot_dir: directory of the snapshot store to load dataframes from.
+            out_dir: directory to write the images to, created if it does not exist.
+            table: 'squad' or 'player'.
+            comp: FbRef id of the competition.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+            version: name of the snapshot version to load, or None for the latest version.
+            fmt: image format, 'png' or 'svg'.
+            processes: number of worker processes, or None for the number of CPUs.
+            level: specifies the level of logging messages to record.
+
+        Raises:
+            ValueError: If table or fmt is not one of the supported values.
+
+        """
+        self._log = logging.getLogger("BatchRenderer")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        if table not in ('squad', 'player'):
+            raise ValueError(f"Invalid argument 'table'. Table '{table}' is not one of ['squad', 'player'].")
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Invalid argument 'fmt'. Format '{fmt}' is not one of {list(self.FORMATS)}.")
+
+        self.snapshot_dir = snapshot_dir
+        self.out_dir = out_dir
+        self.table = table
+        self.comp = comp
+        self.season = season
+        self.version = version
+        self.fmt = fmt
+        self.processes = processes
+        self._level = level
+        os.makedirs(self.out_dir, exist_ok=True)
+
+    def all_pairs(self, vs: str = 'for') -> list:
+        """Lists every pair of distinct numeric metrics of the snapshot for the specified 'for' or 'against' data.
+
+        Metrics shared by several stat categories are listed once, under the first category they appear in.
+
+        Args:
+            vs: 'for' or 'against', ignored for players.
+
+        Returns:
+            A list of pairs of (stat, vs, metric) tuples.
+
+        """
+        self._log.debug("'all_pairs' method called.")
+
+        if self.table == 'player':
+            vs = None
+        frames = _load_frames(self.snapshot_dir, self.version, self.table, self.comp, self.season, self._level)[vs]
+        wide = FbRefScraper.build_wide(frames=frames)
+
+        metrics = dict()
+        for stat in [stat for stat in FbRefScraper.SUMMARY_STAT_OPTS if stat in frames]:
+            for metric in frames[stat].columns:
+                column = FbRefScraper.wide_column(df=wide, stat=stat, metric=metric)
+                if column in wide.columns and pd.api.types.is_numeric_dtype(wide[column]):
+                    metrics.setdefault(column, (stat, vs, metric))
+
+        return list(itertools.combinations(metrics.values(), 2))
+
+    def render(self, pairs) -> dict:
+        """Renders a scatter plot image for each pair of metrics across the process pool.
+
+        Args:
+            pairs: list of pairs of (stat, vs, metric) tuples, the first plotted on the x-axis and the second on the
+                y-axis.
+
+        Returns:
+            A dictionary with the number of 'plots' rendered, a dictionary of 'failed' pairs mapped to the error raised,
+            the number of 'seconds' the batch took, and the throughput in 'plots_per_second'.
+
+        """
+        self._log.debug("'render' method called.")
+
+        pairs = [(tuple(x), tuple(y)) for x, y in pairs]
+        initargs = (self.snapshot_dir, self.version, self.table, self.comp, self.season, self.out_dir, self.fmt,
+                    self._level)
+
+        processes = self.processes or os.cpu_count() or 1
+        chunksize = max(1, len(pairs) // (4 * processes))
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs) as executor:
+            errors = list(executor.map(_render_pair, pairs, chunksize=chunksize))
+        seconds = time.perf_counter() - start
+
+        failed = {pair: error for pair, error in zip(pairs, errors) if error is not None}
+        report = {'plots': len(pairs) - len(failed),
+                  'failed': failed,
+                  'seconds': seconds,
+                  'plots_per_second': (len(pairs) - len(failed)) / seconds if seconds > 0 else 0.0}
+        self._log.info(f"Rendered {report['plots']} plots in {seconds:.2f} seconds "
+                       f"({report['plots_per_second']:.1f} plots per second), {len(failed)} failed.")
+        return report
+
+
+def _load_frames(snapshot_dir: str, version: str, table: str, comp: int, season: str, level) -> dict:
+    """Loads the dataframes of a table from a snapshot, as a dictionary per 'for' or 'against' data mapping each stat
+    category to its dataframe."""
+    store = SnapshotStore(directory=snapshot_dir, version=version, level=level)
+    frames = dict()
+    for key in store.manifest():
+        key_table, key_comp, key_season, stat, vs = key
+        if (key_table, key_comp, key_season) == (table, comp, season):
+            frames.setdefault(vs, dict())[stat] = store.load(key=key)
+    if not frames:
+        raise ValueError(f"No '{table}' dataframes for competition {comp} and season {season} in the snapshot.")
+    return frames
+
+
+def _load_wide(snapshot_dir: str, version: str, table: str, comp: int, season: str, level) -> dict:
+    """Loads the dataframes of a table from a snapshot, joined into a wide dataframe per 'for' or 'against' data."""
+    frames = _load_frames(snapshot_dir, version, table, comp, season, level)
+    return {vs: FbRefScraper.build_wide(frames=stats) for vs, stats in frames.items()}
+
+
+def _init_worker(snapshot_dir: str, version: str, table: str, comp: int, season: str, out_dir: str, fmt: str, level):
+    """Loads the snapshot and creates the figure a worker process renders every plot with."""
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+    _worker.update(wide=_load_wide(snapshot_dir, version, table, comp, season, level),
+                   table=table, out_dir=out_dir, fmt=fmt, fig=fig,
+                   renderer=ScatterRenderer(ax=ax, fit=True, level=level))
+
+
+def _render_pair(pair: tuple):
+    """Renders the scatter plot of a pair of metrics in a worker process, returning the error raised or None."""
+    try:
+        table = _worker['table']
+        values = []
+        for stat, vs, metric in pair:
+            wide = _worker['wide'][None if table == 'player' else vs]
+            series = wide[FbRefScraper.wide_column(df=wide, stat=stat, metric=metric)]
+            values.append(pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+        x, y = values
+        mask = ~(np.isnan(x) | np.isnan(y))
+
+        (x_stat, x_vs, x_metric), (y_stat, y_vs, y_metric) = pair
+        _worker['renderer'].draw(x=x[mask], y=y[mask],
+                                 title=f"FbRef summary analysis - {table}s",
+                                 xlabel=f"{x_stat} {x_vs or ''} {x_metric}".replace('  ', ' '),
+                                 ylabel=f"{y_stat} {y_vs or ''} {y_metric}".replace('  ', ' '))
+        name = re.sub(r'[^\w.-]+', '_', '__'.join('-'.join(str(part) for part in key if part) for key in pair))
+        _worker['fig'].savefig(os.path.join(_worker['out_dir'], f"{table}__{name}.{_worker['fmt']}"))
+    except Exception as e:
+        return repr(e)
+    return None
+
+
+def _parse_metric(text: str) -> tuple:
+    """Parses a metric given on the command line as 'stat:vs:metric', with an empty vs for players."""
+    stat, vs, metric = text.split(':')
+    return stat, vs or None, metric
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('snapshot_dir', help="directory of the snapshot store to load dataframes from")
+    parser.add_argument('out_dir', help="directory to write the images to")
+    parser.add_argument('--table', choices=['squad', 'player'], default='squad', help="table to plot")
+    parser.add_argument('--vs', choices=['for', 'against'], default='for', help="squad data plotted by all pairs")
+    parser.add_argument('--pair', nargs=2, action='append', metavar='STAT:VS:METRIC',
+                        help="pair of metrics to plot, repeatable, defaults to all pairs")
+    parser.add_argument('--comp', type=int, default=9, help="FbRef id of the competition")
+    parser.add_argument('--season', default=None, help="season formatted as on FbRef, defaults to the current season")
+    parser.add_argument('--version', default=None, help="snapshot version, defaults to the latest version")
+    parser.add_argument('--format', choices=BatchRenderer.FORMATS, default='png', help="image format")
+    parser.add_argument('--processes', type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    renderer = BatchRenderer(snapshot_dir=args.snapshot_dir, out_dir=args.out_dir, table=args.table, comp=args.comp,
+                             season=args.season, version=args.version, fmt=args.format, processes=args.processes)
+    if args.pair:
+        pairs = [(_parse_metric(x), _parse_metric(y)) for x, y in args.pair]
+    else:
+        pairs = renderer.all_pairs(vs=args.vs)
+
+    report = renderer.render(pairs=pairs)
+    print(f"rendered:       {report['plots']} plots in {report['seconds']:.2f} s")
+    print(f"throughput:     {report['plots_per_second']:.1f} plots/s")
+    for pair, error in report['failed'].items():
+        print(f"failed:         {pair}: {error}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
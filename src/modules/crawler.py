@@ -0,0 +1,191 @@
+"""Module contains a rate limited, resumable crawler for individual player pages on https://fbref.com/en/.
+
+Classes:
+    TokenBucket: Thread-safe token bucket rate limiter.
+    PlayerPageCrawler: Concurrent crawler fetching the page of each player code under a token bucket rate limit and
+        storing the parsed tables on disk keyed by player code.
+
+"""
+
+# Import dependencies
+import os
+import time
+import pickle
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.atomic import write_atomic
+from modules.scraper import FbRefScraper
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    The bucket holds at most capacity tokens and is refilled at rate tokens per second. Each request takes one token,
+    waiting for the bucket to refill if it is empty, so that requests are limited to the rate on average while allowing
+    bursts of up to capacity requests.
+
+    Attributes:
+        rate: number of tokens added to the bucket per second.
+        capacity: maximum number of tokens the bucket holds.
+
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """Creates an instance of the TokenBucket class, starting with a full bucket.
+
+        Args:
+            rate: number of tokens added to the bucket per second.
+            capacity: maximum number of tokens the bucket holds.
+
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token from the bucket, blocking until one is available.
+
+        Returns:
+            The number of seconds spent waiting for the token.
+
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class PlayerPageCrawler:
+    """Concurrent, rate limited and resumable crawler for FbRef player pages.
+
+    The crawler requests the page of each player code (e.g. https://fbref.com/en/players/774cf58b/) with a pool of
+    worker threads sharing a token bucket, so that requests never exceed the rate FbRef allows however many workers are
+    running. The tables of each page whose ids match the configured prefixes are processed into dataframes and written
+    to one file per player in the store directory. Players with a file in the store are skipped, so an interrupted
+    crawl resumes with the players it had not reached.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object used to request and process each page.
+        _bucket: TokenBucket object shared by the worker threads.
+        store_dir: directory the tables of each player are written to.
+        url_template: url of a player page, formatted with the player 'code'.
+        prefixes: table id prefixes of the tables to store.
+        max_workers: maximum number of pages requested and processed at the same time.
+
+    """
+
+    # Define the default request rate, as FbRef allows at most 10 requests per minute
+    RATE = 10 / 60
+
+    def __init__(self, scraper: FbRefScraper, store_dir: str, rate: float = RATE, burst: float = 1,
+                 max_workers: int = 4, url_template: str = "https://fbref.com/en/players/{code}/",
+                 prefixes=('scout_summary', 'stats_standard', 'matchlogs'), level=logging.WARNING):
+        """Creates an instance of the PlayerPageCrawler class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level. The store directory is created if it does not already exist.
+
+        Args:
+            scraper: FbRefScraper object used to request and process each page.
+            store_dir: directory to write the tables of each player to.
+            rate: maximum average number of requests per second.
+            burst: maximum number of requests made at once after an idle period.
+            max_workers: maximum number of pages requested and processed at the same time.
+            url_template: url of a player page, formatted with the player 'code'.
+            prefixes: table id prefixes of the tables to store.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("PlayerPageCrawler")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._bucket = TokenBucket(rate=rate, capacity=burst)
+        self.store_dir = store_dir
+        self.url_template = url_template
+        self.prefixes = tuple(prefixes)
+        self.max_workers = max_workers
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def crawl(self, codes) -> dict:
+        """Crawls the page of every player code which is not already in the store.
+
+        Args:
+            codes: iterable of FbRef player codes, or a dictionary with player codes as values such as the one returned
+                by FbRefScraper.scrape_player_codes.
+
+        Returns:
+            A dictionary with the number of players 'crawled' and 'skipped', a dictionary of 'failed' player codes
+            mapped to the error raised, and the number of 'seconds' the crawl took.
+
+        """
+        self._log.debug("'crawl' method called.")
+
+        codes = list(codes.values() if isinstance(codes, dict) else codes)
+        stored = set(self.completed())
+        pending = [code for code in dict.fromkeys(codes) if code not in stored]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            errors = dict(zip(pending, executor.map(self._crawl_player, pending)))
+        failed = {code: error for code, error in errors.items() if error is not None}
+
+        report = {'crawled': len(pending) - len(failed),
+                  'skipped': len(stored.intersection(codes)),
+                  'failed': failed,
+                  'seconds': time.perf_counter() - start}
+        self._log.info(f"Crawled {report['crawled']} player pages in {report['seconds']:.2f} seconds, "
+                       f"{len(failed)} failed.")
+        return report
+
+    def completed(self) -> list:
+        """Returns the codes of every player whose tables are in the store."""
+        return [name[:-len('.pkl')] for name in os.listdir(self.store_dir) if name.endswith('.pkl')]
+
+    def load(self, code: str) -> dict:
+        """Loads the tables stored for a player.
+
+        Args:
+            code: FbRef player code.
+
+        Returns:
+            A dictionary mapping table ids to pandas dataframes, or None if the player is not in the store.
+
+        """
+        try:
+            with open(self._path(code=code), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _crawl_player(self, code: str):
+        """Requests, processes and stores the page of a single player, returning the error raised or None."""
+        self._bucket.acquire()
+        try:
+            tables = self._scraper.scrape_page_tables(url=self.url_template.format(code=code), prefixes=self.prefixes)
+        except Exception as e:
+            self._log.warning(f"Failed to crawl player '{code}': {e!r}")
+            return repr(e)
+
+        # Write atomically so that an interrupted write is not mistaken for a completed player
+        write_atomic(self._path(code=code), pickle.dumps(tables))
+        return None
+
+    def _path(self, code: str) -> str:
+        """Returns the path of the file storing the tables of a player."""
+        return os.path.join(self.store_dir, f"{code}.pkl")
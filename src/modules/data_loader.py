@@ -0,0 +1,107 @@
+"""Module contains a background data loader for running slow requests off the tkinter main thread.
+
+Classes:
+    DataLoader: Runs functions on worker threads and hands back the result of the latest request only, so that a GUI
+        can poll for it from its event loop and discard results of requests superseded by newer ones.
+
+"""
+
+# Import dependencies
+import time
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DataLoader:
+    """Background loader returning the result of the latest submitted request.
+
+    Each call to submit starts a new generation. Requests of older generations which have not started are cancelled,
+    and the results of those which were already running are discarded when they complete, so that a poll only ever
+    returns the result of the latest request. The loader never touches GUI state, leaving the caller to poll it from
+    its own event loop (e.g. with tkinter's after method) and to apply the result on the GUI thread.
+
+    Attributes:
+        _log: logger object for the class.
+        generation: generation of the latest submitted request.
+        stale: number of results discarded because a newer request was submitted.
+
+    """
+
+    def __init__(self, max_workers: int = 2, level=logging.WARNING):
+        """Creates an instance of the DataLoader class.
+
+        Args:
+            max_workers: maximum number of requests run at the same time.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("DataLoader")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='DataLoader')
+        self._futures = dict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.stale = 0
+
+    def submit(self, function, *args, **kwargs) -> int:
+        """Submits a request to run function with the specified arguments on a worker thread.
+
+        Args:
+            function: function to run.
+            *args: positional arguments of function.
+            **kwargs: keyword arguments of function.
+
+        Returns:
+            The generation of the request.
+
+        """
+        self._log.debug("'submit' method called.")
+
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self.generation += 1
+            self._futures[self.generation] = self._executor.submit(self._timed, function, *args, **kwargs)
+            return self.generation
+
+    def poll(self):
+        """Collects the result of the latest request if it has completed, discarding results of older requests.
+
+        Returns:
+            None if the latest request has not completed, otherwise a tuple of the generation of the request, its
+            result, the error it raised or None, and the number of seconds it took to run.
+
+        """
+        with self._lock:
+            for generation in [generation for generation, future in self._futures.items() if future.done()]:
+                future = self._futures.pop(generation)
+                if generation != self.generation:
+                    self.stale += not future.cancelled()
+                    continue
+                error = future.exception()
+                if error is not None:
+                    return generation, None, error, None
+                result, seconds = future.result()
+                return generation, result, None, seconds
+            return None
+
+    @property
+    def pending(self) -> bool:
+        """True if the latest request has not completed or been collected."""
+        with self._lock:
+            return self.generation in self._futures
+
+    def shutdown(self):
+        """Cancels every request which has not started and stops the worker threads without waiting for them."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _timed(function, *args, **kwargs) -> tuple:
+        """Runs function, returning its result with the number of seconds it took."""
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        return result, time.perf_counter() - start
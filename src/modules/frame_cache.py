@@ -0,0 +1,206 @@
+"""Module contains a bounded, least recently used cache for summaries dataframes scraped from https://fbref.com/en/.
+
+Classes:
+    FrameCache: Dictionary-like cache enforcing a memory budget on the dataframes it holds, evicting the least recently
+        used dataframes and optionally spilling them to disk.
+
+"""
+
+# Import dependencies
+import os
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class FrameCache:
+    """Bounded, least recently used cache of pandas dataframes.
+
+    The size of each dataframe is measured with DataFrame.memory_usage(deep=True) when it is stored. Whenever the total
+    size exceeds the memory budget, the least recently used dataframes are evicted until the cache fits the budget
+    again, always keeping the most recently stored dataframe. If a spill directory is specified, evicted dataframes are
+    written to disk and transparently loaded back on their next access, otherwise they are dropped.
+
+    Attributes:
+        _log: logger object for the class.
+        max_bytes: memory budget in bytes, or None for an unbounded cache.
+        spill_dir: directory evicted dataframes are written to, or None to drop evicted dataframes.
+        hits: number of lookups served from memory or from the spill directory.
+        misses: number of lookups for keys which are not in the cache.
+        evictions: number of dataframes evicted from memory.
+        reloads: number of evicted dataframes loaded back from the spill directory.
+
+    """
+
+    def __init__(self, max_bytes: int = None, spill_dir: str = None, level=logging.WARNING):
+        """Creates an instance of the FrameCache class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level.
+
+        Args:
+            max_bytes: memory budget in bytes, or None for an unbounded cache.
+            spill_dir: directory to write evicted dataframes to, or None to drop evicted dataframes.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("FrameCache")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+        # Initialise the resident dataframes in least to most recently used order with their sizes, and the paths of
+        # spilled dataframes
+        self._frames = OrderedDict()
+        self._sizes = dict()
+        self._spilled = dict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # Initialise counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    def get(self, key, default=None):
+        """Recalls the dataframe stored under the specified key, marking it as the most recently used.
+
+        Args:
+            key: key the dataframe is stored under.
+            default: value returned if the key is not in the cache.
+
+        Returns:
+            The stored dataframe, or default if the key is not in the cache.
+
+        """
+        with self._lock:
+            if key in self._frames:
+                self.hits += 1
+                self._frames.move_to_end(key)
+                return self._frames[key]
+            if key in self._spilled:
+                self.hits += 1
+                self.reloads += 1
+                path = self._spilled.pop(key)
+                df = pd.read_pickle(path)
+                os.remove(path)
+                self[key] = df
+                return df
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """Recalls the dataframe stored under the specified key without counting the lookup or changing its recency.
+
+        A spilled dataframe is read from disk without being loaded back into memory.
+
+        Args:
+            key: key the dataframe is stored under.
+            default: value returned if the key is not in the cache.
+
+        Returns:
+            The stored dataframe, or default if the key is not in the cache.
+
+        """
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+            if key in self._spilled:
+                return pd.read_pickle(self._spilled[key])
+            return default
+
+    def __setitem__(self, key, df: pd.DataFrame):
+        """Stores a dataframe under the specified key as the most recently used, then evicts dataframes over budget."""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._discard(key)
+            self._frames[key] = df
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+
+    def __getitem__(self, key) -> pd.DataFrame:
+        """Recalls the dataframe stored under the specified key, raising KeyError if the key is not in the cache."""
+        df = self.get(key)
+        if df is None:
+            raise KeyError(key)
+        return df
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._frames or key in self._spilled
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames) + len(self._spilled)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self) -> list:
+        """Returns the keys of every resident and spilled dataframe."""
+        with self._lock:
+            return list(self._frames.keys()) + list(self._spilled.keys())
+
+    def resident(self) -> dict:
+        """Returns a dictionary of the dataframes currently held in memory, least recently used first."""
+        with self._lock:
+            return dict(self._frames)
+
+    def pop(self, key, default=None):
+        """Removes the dataframe stored under the specified key from the cache and returns it.
+
+        Args:
+            key: key the dataframe is stored under.
+            default: value returned if the key is not in the cache.
+
+        Returns:
+            The removed dataframe, or default if the key is not in the cache.
+
+        """
+        with self._lock:
+            df = self.peek(key, default=default)
+            self._discard(key)
+            return df
+
+    def stats(self) -> dict:
+        """Returns the cache counters with the number of resident and spilled dataframes and resident bytes."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'reloads': self.reloads,
+                    'resident': len(self._frames),
+                    'spilled': len(self._spilled),
+                    'bytes': self._bytes,
+                    'max_bytes': self.max_bytes}
+
+    def _evict(self):
+        """Evicts least recently used dataframes until the cache fits the memory budget, keeping at least one."""
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._frames) > 1:
+            key, df = self._frames.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+            if self.spill_dir is not None:
+                path = os.path.join(self.spill_dir, hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.pkl')
+                df.to_pickle(path)
+                self._spilled[key] = path
+            self._log.debug(f"Evicted {key} from the cache.")
+
+    def _discard(self, key):
+        """Removes any resident or spilled dataframe stored under the specified key."""
+        if key in self._frames:
+            del self._frames[key]
+            self._bytes -= self._sizes.pop(key)
+        path = self._spilled.pop(key, None)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
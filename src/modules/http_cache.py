@@ -0,0 +1,199 @@
+"""Module contains a persistent, disk-backed cache for html responses requested from https://fbref.com/en/.
+
+Classes:
+    HttpCache: Disk-backed response cache keyed by url with compressed bodies, a time to live, and conditional
+        revalidation metadata.
+
+"""
+
+# Import dependencies
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+
+from modules.atomic import write_atomic
+
+
+class HttpCache:
+    """Disk-backed cache of html responses keyed by url.
+
+    Each cached response is stored as a zlib compressed body alongside a json metadata file recording when the response
+    was fetched and the ETag and Last-Modified validators returned by the server. Entries younger than the time to live
+    are served without a request, older entries are revalidated with If-None-Match and If-Modified-Since headers so
+    that unchanged pages only cost a 304 response.
+
+    Attributes:
+        _log: logger object for the class.
+        directory: path of the directory the cache files are written to.
+        ttl: number of seconds a cached response is served without revalidation.
+        hits: number of responses served from the cache without a request.
+        misses: number of responses which had to be downloaded in full.
+        revalidations: number of stale responses confirmed unchanged by a 304 response.
+        bytes_saved: number of body bytes served from the cache instead of downloaded.
+
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600, level=logging.WARNING):
+        """Creates an instance of the HttpCache class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level. The cache directory is created if it does not already exist.
+
+        Args:
+            directory: path of the directory to write cache files to.
+            ttl: number of seconds a cached response is served without revalidation.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("HttpCache")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Initialise counters, guarded by a lock as the cache may be shared between threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+
+    def load(self, url: str):
+        """Recalls the cached entry for the specified url.
+
+        Args:
+            url: url the response was requested from.
+
+        Returns:
+            A dictionary with the decompressed 'body' and the stored metadata, or None if the url is not cached.
+
+        """
+        self._log.debug("'load' method called.")
+
+        path = self._path(url=url)
+        try:
+            with open(f"{path}.json", 'r') as f:
+                entry = json.load(f)
+            with open(f"{path}.z", 'rb') as f:
+                entry['body'] = zlib.decompress(f.read()).decode('utf-8')
+        except (OSError, ValueError, zlib.error):
+            return None
+
+        return entry
+
+    def store(self, url: str, body: str, headers=None):
+        """Writes a downloaded response body and its validators to the cache.
+
+        Args:
+            url: url the response was requested from.
+            body: html text of the response.
+            headers: response headers, used to record the ETag and Last-Modified validators.
+
+        Returns:
+            None
+
+        """
+        self._log.debug("'store' method called.")
+
+        with self._lock:
+            self.misses += 1
+        headers = headers or {}
+        entry = {'url': url,
+                 'fetched': time.time(),
+                 'etag': headers.get('ETag'),
+                 'last_modified': headers.get('Last-Modified')}
+
+        path = self._path(url=url)
+        write_atomic(f"{path}.z", zlib.compress(body.encode('utf-8')))
+        write_atomic(f"{path}.json", json.dumps(entry))
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Checks whether a cached entry is younger than the time to live.
+
+        Args:
+            entry: cached entry returned by load.
+
+        Returns:
+            True if the entry can be served without revalidation.
+
+        """
+        return time.time() - entry['fetched'] < self.ttl
+
+    def hit(self, entry: dict) -> str:
+        """Records a response served from the cache without a request and returns its body.
+
+        Args:
+            entry: cached entry returned by load.
+
+        Returns:
+            The html text of the cached response.
+
+        """
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry['body'].encode('utf-8'))
+        return entry['body']
+
+    def revalidated(self, url: str, entry: dict) -> str:
+        """Records a stale entry confirmed unchanged by a 304 response, restarts its time to live and returns its body.
+
+        Args:
+            url: url the response was requested from.
+            entry: cached entry returned by load.
+
+        Returns:
+            The html text of the cached response.
+
+        """
+        self._log.debug("'revalidated' method called.")
+
+        with self._lock:
+            self.revalidations += 1
+            self.bytes_saved += len(entry['body'].encode('utf-8'))
+
+        metadata = {key: value for key, value in entry.items() if key != 'body'}
+        metadata['fetched'] = time.time()
+        write_atomic(f"{self._path(url=url)}.json", json.dumps(metadata))
+
+        return entry['body']
+
+    @staticmethod
+    def conditional_headers(entry) -> dict:
+        """Builds the request headers for revalidating a cached entry.
+
+        Args:
+            entry: cached entry returned by load, or None.
+
+        Returns:
+            A dictionary of If-None-Match and If-Modified-Since headers for the validators stored with the entry.
+
+        """
+        headers = dict()
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def stats(self) -> dict:
+        """Returns the cache counters.
+
+        Returns:
+            A dictionary of hit, miss, revalidation and bytes saved counters.
+
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'bytes_saved': self.bytes_saved}
+
+    def _path(self, url: str) -> str:
+        """Returns the path, without extension, of the cache files for the specified url."""
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest())
@@ -0,0 +1,274 @@
+"""Module contains structured timing and counter instrumentation for the scraper and application hot paths.
+
+Classes:
+    Instrumentation: Records the duration of named stages and named counters (e.g. bytes downloaded, rows parsed and
+        cache hits), and passes every measurement to pluggable hooks.
+    JsonLinesExporter: Hook appending every measurement to a file as a line of json.
+    PrometheusExporter: Hook periodically writing the aggregated measurements to a file in the Prometheus text format,
+        for the node exporter textfile collector.
+
+"""
+
+# Import dependencies
+import json
+import time
+import logging
+import threading
+
+from contextlib import nullcontext
+
+from modules.atomic import write_atomic
+
+
+# Define the context manager returned by a disabled Instrumentation for every stage, shared as it holds no state
+_DISABLED_STAGE = nullcontext()
+
+
+class Instrumentation:
+    """Records stage durations and counters, aggregating them and passing each measurement to hooks.
+
+    Stages are timed with the stage context manager, or recorded from an externally measured duration with record, and
+    aggregated into the number of calls, the total seconds and the slowest call per stage name. Counters are incremented
+    with count. Each measurement is passed to every hook as an event dictionary with the 'time' it was made, its 'kind'
+    ('stage' or 'counter'), its 'name' and its 'seconds' or 'value'. A disabled instance returns a shared no-op context
+    manager from stage and returns immediately from record and count, so that instrumented code costs a method call.
+
+    Attributes:
+        _log: logger object for the class.
+        enabled: specifies whether measurements are recorded.
+
+    """
+
+    def __init__(self, enabled: bool = True, hooks=None, level=logging.WARNING):
+        """Creates an instance of the Instrumentation class.
+
+        Args:
+            enabled: specifies whether measurements are recorded.
+            hooks: list of functions called with the event dictionary of every measurement.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("Instrumentation")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self.enabled = enabled
+        self._hooks = list(hooks or [])
+
+        # Initialise the aggregated measurements, guarded by a lock as stages are recorded from several threads
+        self._lock = threading.Lock()
+        self._stages = dict()
+        self._counters = dict()
+
+    def add_hook(self, hook):
+        """Adds a function called with the event dictionary of every measurement.
+
+        Args:
+            hook: function taking an event dictionary.
+
+        Returns:
+            None
+
+        """
+        self._hooks.append(hook)
+
+    def stage(self, name: str):
+        """Returns a context manager recording the duration of the stage it wraps.
+
+        Args:
+            name: name of the stage (e.g. 'request' or 'process').
+
+        Returns:
+            A context manager.
+
+        """
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return _Stage(instrumentation=self, name=name)
+
+    def record(self, name: str, seconds: float):
+        """Records a call of a stage which took the specified number of seconds.
+
+        Args:
+            name: name of the stage.
+            seconds: duration of the call.
+
+        Returns:
+            None
+
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            calls, total, slowest = self._stages.get(name, (0, 0.0, 0.0))
+            self._stages[name] = (calls + 1, total + seconds, max(slowest, seconds))
+        self._emit(event={'time': time.time(), 'kind': 'stage', 'name': name, 'seconds': seconds})
+
+    def count(self, name: str, value: int = 1):
+        """Increments a counter.
+
+        Args:
+            name: name of the counter (e.g. 'bytes_downloaded' or 'page_cache_hits').
+            value: amount to increment the counter by.
+
+        Returns:
+            None
+
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        self._emit(event={'time': time.time(), 'kind': 'counter', 'name': name, 'value': value})
+
+    def stats(self) -> dict:
+        """Returns the aggregated measurements.
+
+        Returns:
+            A dictionary with the 'stages', mapping each stage name to its number of 'calls', total 'seconds' and
+            'max_seconds', and the 'counters', mapping each counter name to its value.
+
+        """
+        with self._lock:
+            return {'stages': {name: {'calls': calls, 'seconds': total, 'max_seconds': slowest}
+                               for name, (calls, total, slowest) in self._stages.items()},
+                    'counters': dict(self._counters)}
+
+    def reset(self):
+        """Clears the aggregated measurements."""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def _emit(self, event: dict):
+        """Passes an event to every hook, logging rather than raising the errors of a hook."""
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                self._log.warning(f"Instrumentation hook {hook!r} failed: {e!r}")
+
+
+class _Stage:
+    """Context manager recording the duration of a stage in an Instrumentation object."""
+
+    __slots__ = ('_instrumentation', '_name', '_start')
+
+    def __init__(self, instrumentation: Instrumentation, name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._instrumentation.record(name=self._name, seconds=time.perf_counter() - self._start)
+        return False
+
+
+class JsonLinesExporter:
+    """Instrumentation hook appending every measurement to a file as a line of json.
+
+    Attributes:
+        path: path of the file the events are appended to.
+
+    """
+
+    def __init__(self, path: str):
+        """Creates an instance of the JsonLinesExporter class, opening the file in append mode.
+
+        Args:
+            path: path of the file to append the events to.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, event: dict):
+        """Appends an event to the file as a line of json."""
+        line = json.dumps(event) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """Closes the file."""
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusExporter:
+    """Instrumentation hook writing the aggregated measurements to a file in the Prometheus text format.
+
+    The file is rewritten at most once per interval as measurements arrive, and on every call of write, atomically so
+    that the node exporter textfile collector never reads a partial file. Stages are exported as the
+    '{prefix}_stage_calls_total' and '{prefix}_stage_seconds_total' counters and the '{prefix}_stage_seconds_max' gauge
+    labelled by stage, and each counter as '{prefix}_{name}_total'.
+
+    Attributes:
+        path: path of the file the measurements are written to, conventionally ending in '.prom'.
+        prefix: prefix of the metric names.
+        interval: minimum number of seconds between rewrites of the file triggered by measurements.
+
+    """
+
+    def __init__(self, path: str, instrumentation: Instrumentation, prefix: str = 'fbref', interval: float = 10):
+        """Creates an instance of the PrometheusExporter class.
+
+        Args:
+            path: path of the file to write the measurements to.
+            instrumentation: Instrumentation object whose aggregated measurements are written.
+            prefix: prefix of the metric names.
+            interval: minimum number of seconds between rewrites of the file triggered by measurements.
+
+        """
+        self.path = path
+        self.prefix = prefix
+        self.interval = interval
+        self._instrumentation = instrumentation
+        self._lock = threading.Lock()
+        self._written = None
+
+    def __call__(self, event: dict):
+        """Rewrites the file if the interval has passed since it was last written."""
+        if self._written is None or time.monotonic() - self._written >= self.interval:
+            self.write()
+
+    def write(self):
+        """Writes the aggregated measurements to the file."""
+        text = self.render(stats=self._instrumentation.stats(), prefix=self.prefix)
+        with self._lock:
+            write_atomic(self.path, text)
+            self._written = time.monotonic()
+
+    @staticmethod
+    def render(stats: dict, prefix: str = 'fbref') -> str:
+        """Renders aggregated measurements in the Prometheus text format.
+
+        Args:
+            stats: dictionary returned by Instrumentation.stats.
+            prefix: prefix of the metric names.
+
+        Returns:
+            The text of the metrics.
+
+        """
+        lines = []
+        stages = sorted(stats['stages'].items())
+        for metric, field, kind, description in (('stage_calls_total', 'calls', 'counter', "Number of calls"),
+                                                 ('stage_seconds_total', 'seconds', 'counter', "Total seconds"),
+                                                 ('stage_seconds_max', 'max_seconds', 'gauge', "Slowest call")):
+            if not stages:
+                break
+            lines.append(f"# HELP {prefix}_{metric} {description} of each instrumented stage.")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            lines.extend(f'{prefix}_{metric}{{stage="{name}"}} {values[field]}' for name, values in stages)
+
+        for name, value in sorted(stats['counters'].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,172 @@
+"""Module contains an append-only, on-disk store of squad match logs scraped from https://fbref.com/en/.
+
+Classes:
+    MatchLogStore: sqlite store of played matches keyed by (squad, date), updated incrementally with the matches
+        played since the last update and queried by squad and date range.
+
+"""
+
+# Import dependencies
+import time
+import sqlite3
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from modules.scraper import FbRefScraper
+
+
+class MatchLogStore:
+    """Append-only store of squad match logs keyed by (squad, date).
+
+    Matches are stored in a sqlite table whose primary key is (squad, date), laid out as a clustered index so that the
+    matches of a squad over a date range are read with a single index range scan, with a secondary index on date for
+    queries across every squad. Only played matches (i.e. with a result) are stored, and an update only inserts
+    matches dated after the latest match already stored for each squad, so a nightly update writes the one or two new
+    matches of each squad rather than rebuilding whole seasons.
+
+    Attributes:
+        _log: logger object for the class.
+        _db: sqlite connection to the store.
+        path: path of the sqlite database.
+
+    """
+
+    # Define the match log columns kept in the store, by FbRef data-stat
+    COLUMNS = ('comp', 'round', 'dayofweek', 'start_time', 'venue', 'result', 'goals_for', 'goals_against', 'opponent',
+               'xg_for', 'xg_against', 'possession', 'attendance', 'captain', 'formation', 'referee', 'notes')
+
+    def __init__(self, path: str, level=logging.WARNING):
+        """Creates an instance of the MatchLogStore class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level, then opens the store, creating it if it does not exist.
+
+        Args:
+            path: path of the sqlite database holding the store.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("MatchLogStore")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self.path = path
+
+        # Open the store, shared between worker threads behind a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        columns = ', '.join(self.COLUMNS)
+        with self._lock, self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS matches (squad TEXT NOT NULL, date TEXT NOT NULL, {columns}, "
+                             f"PRIMARY KEY (squad, date)) WITHOUT ROWID")
+            self._db.execute("CREATE INDEX IF NOT EXISTS matches_date ON matches (date)")
+
+    def update(self, scraper: FbRefScraper, comp: int = 9, season: str = None, max_workers: int = 4) -> dict:
+        """Appends the matches each squad of a competition has played since the last update.
+
+        Function scrapes the squad codes of the competition and season, then the match log of each squad with at most
+        max_workers requests at the same time, and appends the played matches dated after the latest match stored for
+        the squad.
+
+        Args:
+            scraper: FbRefScraper object used to scrape the squad codes and match logs.
+            comp: FbRef id of the competition, one of the keys of FbRefScraper.COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+            max_workers: maximum number of match logs scraped at the same time.
+
+        Returns:
+            A dictionary mapping each squad to the number of matches appended, or to the error raised if its match log
+            could not be scraped.
+
+        """
+        self._log.debug("'update' method called.")
+
+        codes = scraper.scrape_squad_codes(comp=comp, season=season)
+
+        def update_squad(squad):
+            try:
+                df = scraper.scrape_match_logs(code=codes[squad], comp=comp, season=season)
+            except Exception as e:
+                self._log.warning(f"Failed to scrape the match log of '{squad}': {e!r}")
+                return repr(e)
+            return self.append(squad=squad, df=df)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            appended = dict(zip(codes, executor.map(update_squad, codes)))
+
+        self._log.info(f"Updated the match logs of {len(codes)} squads in {time.perf_counter() - start:.2f} seconds.")
+        return appended
+
+    def append(self, squad: str, df: pd.DataFrame) -> int:
+        """Appends the played matches of a match log dated after the latest match stored for the squad.
+
+        Args:
+            squad: name of the squad the match log belongs to.
+            df: match log dataframe indexed by date, as returned by FbRefScraper.scrape_match_logs.
+
+        Returns:
+            The number of matches appended.
+
+        """
+        self._log.debug("'append' method called.")
+
+        latest = self.latest(squad=squad)
+        # Unplayed fixtures have a blank result, or a missing value when no match of the log has been played yet and the
+        # all-blank column was converted to float
+        if 'result' in df.columns:
+            df = df[df['result'].notna() & (df['result'].astype(str).str.strip() != '')]
+        else:
+            df = df.iloc[:0]
+        if latest is not None:
+            df = df[df.index.astype(str) > latest]
+
+        # Convert values to python objects, storing missing values and columns as NULL
+        df = df.reindex(columns=list(self.COLUMNS)).astype(object)
+        df = df.where(df.notna(), None)
+        rows = [(squad, str(date), *values) for date, values in zip(df.index, df.itertuples(index=False, name=None))]
+
+        placeholders = ', '.join('?' * (len(self.COLUMNS) + 2))
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(f"INSERT OR IGNORE INTO matches (squad, date, {', '.join(self.COLUMNS)}) "
+                                 f"VALUES ({placeholders})", rows)
+            return self._db.total_changes - before
+
+    def latest(self, squad: str):
+        """Returns the date of the latest match stored for a squad, or None if no match is stored."""
+        with self._lock:
+            return self._db.execute("SELECT MAX(date) FROM matches WHERE squad = ?", (squad,)).fetchone()[0]
+
+    def query(self, squad: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+        """Queries the stored matches of a squad, or of every squad, within a date range.
+
+        Args:
+            squad: name of the squad, or None for every squad.
+            start: first date of the range formatted as 'YYYY-MM-DD', or None for no lower bound.
+            end: last date of the range formatted as 'YYYY-MM-DD', or None for no upper bound.
+
+        Returns:
+            A pandas dataframe of the matches, indexed by squad and date and sorted by squad then date.
+
+        """
+        self._log.debug("'query' method called.")
+
+        conditions, params = [], []
+        for condition, param in (("squad = ?", squad), ("date >= ?", start), ("date <= ?", end)):
+            if param is not None:
+                conditions.append(condition)
+                params.append(param)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT * FROM matches{where} ORDER BY squad, date", self._db, params=params)
+        return df.set_index(['squad', 'date'])
+
+    def close(self):
+        """Closes the connection to the store."""
+        self._db.close()
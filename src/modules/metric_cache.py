@@ -0,0 +1,162 @@
+"""Module contains a memo of cleaned metric arrays used to redraw plots of FbRef summary data.
+
+Classes:
+    MetricCache: Memo of float64 NumPy arrays per (table, stat, vs, metric), aligned to a shared index per table.
+
+"""
+
+# Import dependencies
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.scraper import FbRefScraper
+
+
+class MetricCache:
+    """Memo of cleaned float64 metric arrays aligned to a shared index per table.
+
+    Each metric is read from the summaries dataframe of its own stat category (see FbRefScraper.get_squad_summaries and
+    get_player_summaries), so that a redraw only scrapes the pages of the plotted categories, converted once to a
+    float64 array with NaN for blank or non-numeric values, and kept for later redraws. Every array of a table is
+    aligned to the same index, which grows with the labels of each category read, so that a pair of metrics is
+    plotted with two lookups and the intersection of their non-NaN masks. As labels are only ever appended to the
+    shared index, an array memoised before it grew is aligned by padding it with NaN. The memo is cleared whenever the
+    scraper's generation changes, i.e. when refreshed data replaces a stored dataframe.
+
+    Attributes:
+        _log: logger object for the class.
+        _scraper: FbRefScraper object the summaries dataframes are recalled from.
+
+    """
+
+    def __init__(self, scraper: FbRefScraper, comp: int = 9, season: str = None, level=logging.WARNING):
+        """Creates an instance of the MetricCache class.
+
+        Args:
+            scraper: FbRefScraper object the summaries dataframes are recalled from.
+            comp: FbRef id of the competition, one of the keys of FbRefScraper.COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("MetricCache")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._scraper = scraper
+        self._comp = comp
+        self._season = season
+
+        # Initialise the memo of arrays keyed by (table, stat, vs, metric) and the shared index of each table, both
+        # valid for a single scraper generation
+        self._arrays = dict()
+        self._indexes = dict()
+        self._generation = scraper.generation
+        self._lock = threading.Lock()
+
+    def index(self, table: str) -> pd.Index:
+        """Returns the index the arrays of the specified table ('squad' or 'player') are aligned to.
+
+        The index only holds the labels of the categories read so far, and grows as further categories are read.
+
+        """
+        self._check_generation()
+        with self._lock:
+            return self._indexes.get(table, pd.Index([]))
+
+    def get(self, table: str, stat: str, vs: str, metric: str) -> np.ndarray:
+        """Recalls the cleaned float64 array of a metric, aligned to the index of its table.
+
+        Args:
+            table: 'squad' or 'player'.
+            stat: stat category of the metric, one of the keys of FbRefScraper.SUMMARY_STAT_OPTS.
+            vs: 'for' or 'against' for squad metrics, ignored for player metrics.
+            metric: column of the summaries dataframe of the stat category.
+
+        Returns:
+            A read-only float64 array with NaN for blank or non-numeric values.
+
+        """
+        if table == 'player':
+            vs = None
+        key = (table, stat, vs, metric)
+
+        self._check_generation()
+        with self._lock:
+            values = self._arrays.get(key)
+            if values is not None:
+                return self._pad(key=key, values=values)
+
+        series = self._frame(table=table, stat=stat, vs=vs)[metric]
+        if series.index.has_duplicates:
+            series = series[~series.index.duplicated()]
+        if pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            values = pd.to_numeric(series.astype(object), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+        with self._lock:
+            # Append the labels missing from the shared index, then align the values to it
+            index = self._indexes.get(table)
+            if index is None:
+                index = self._indexes[table] = series.index
+            else:
+                missing = series.index.difference(index, sort=False)
+                if len(missing):
+                    index = self._indexes[table] = index.append(missing)
+            if not series.index.equals(index):
+                values = pd.Series(values, index=series.index).reindex(index).to_numpy()
+            values.flags.writeable = False
+            self._arrays[key] = values
+            return values
+
+    def pair(self, x_key: tuple, y_key: tuple) -> tuple:
+        """Recalls two metrics, keeping only the rows where both have a value.
+
+        Args:
+            x_key: tuple of table, stat, vs and metric of the x-axis metric.
+            y_key: tuple of table, stat, vs and metric of the y-axis metric.
+
+        Returns:
+            A tuple of the x values, the y values and the index labels of the rows where both have a value.
+
+        """
+        x = self.get(*x_key)
+        y = self.get(*y_key)
+
+        # Recall the x-axis array again, padded if reading the y-axis metric grew the index of the table
+        x = self.get(*x_key)
+        mask = ~(np.isnan(x) | np.isnan(y))
+        return x[mask], y[mask], self.index(table=x_key[0])[mask]
+
+    def clear(self):
+        """Removes every memoised array and index."""
+        with self._lock:
+            self._arrays.clear()
+            self._indexes.clear()
+
+    def _check_generation(self):
+        """Clears the memo if the scraper's stored dataframes changed since it was filled."""
+        generation = self._scraper.generation
+        if generation != self._generation:
+            self._log.debug(f"Scraper generation changed from {self._generation} to {generation}, clearing memo.")
+            self.clear()
+            self._generation = generation
+
+    def _pad(self, key: tuple, values: np.ndarray) -> np.ndarray:
+        """Pads a memoised array with NaN to the length of the shared index of its table, called holding the lock."""
+        missing = len(self._indexes[key[0]]) - len(values)
+        if missing > 0:
+            values = np.concatenate([values, np.full(missing, np.nan)])
+            values.flags.writeable = False
+            self._arrays[key] = values
+        return values
+
+    def _frame(self, table: str, stat: str, vs: str) -> pd.DataFrame:
+        """Recalls the summaries dataframe of a stat category from the scraper."""
+        if table == 'squad':
+            return self._scraper.get_squad_summaries(stat=stat, vs=vs, comp=self._comp, season=self._season)
+        return self._scraper.get_player_summaries(stat=stat, comp=self._comp, season=self._season)
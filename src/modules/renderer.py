@@ -0,0 +1,115 @@
+"""Module contains a scatter plot renderer which updates a single set of matplotlib artists in place.
+
+Classes:
+    ScatterRenderer: Renders scatter plots on a matplotlib Axes by updating one PathCollection in place, rescaling the
+        axis limits only when the data no longer fits them.
+
+"""
+
+# Import dependencies
+import logging
+
+import numpy as np
+
+
+class ScatterRenderer:
+    """Scatter plot renderer reusing the same matplotlib artists for every redraw.
+
+    The scatter collection is created on the first draw. Later draws replace its points with set_offsets, change the
+    title and axis labels only when their text changes, and rescale the axis limits only when the new points fall
+    outside them or, with their margins, fill less than SHRINK of them. If fit is True, the limits are instead fitted
+    to the points of every draw, so that the plot only depends on the data drawn, as needed to export images. The figure
+    is then redrawn with draw_idle, which lets the GUI event loop coalesce several draws into one.
+
+    Attributes:
+        _log: logger object for the class.
+        _ax: matplotlib Axes object the scatter plot is drawn on.
+        _scatter: matplotlib PathCollection holding the points, or None before the first draw.
+        fit: specifies whether the axis limits are fitted to the points of every draw.
+        draws: number of draws made.
+        rescales: number of draws which changed the axis limits.
+
+    """
+
+    # Define the fraction of the data range added on each side when the limits are rescaled, and the fraction of the
+    # axis range the data must fill for the limits to be kept
+    MARGIN = 0.05
+    SHRINK = 0.5
+
+    def __init__(self, ax, fit: bool = False, level=logging.WARNING):
+        """Creates an instance of the ScatterRenderer class.
+
+        Args:
+            ax: matplotlib Axes object to draw the scatter plot on.
+            fit: specifies whether to fit the axis limits to the points of every draw, rather than only when needed.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("ScatterRenderer")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._ax = ax
+        self._scatter = None
+        self.fit = fit
+        self.draws = 0
+        self.rescales = 0
+
+    def draw(self, x: np.ndarray, y: np.ndarray, title: str = None, xlabel: str = None, ylabel: str = None) -> bool:
+        """Draws a scatter plot of the specified values, updating the existing artists in place.
+
+        Args:
+            x: array of x values.
+            y: array of y values, of the same length as x.
+            title: title of the plot, unchanged if None.
+            xlabel: label of the x-axis, unchanged if None.
+            ylabel: label of the y-axis, unchanged if None.
+
+        Returns:
+            True if the axis limits were rescaled.
+
+        """
+        self._log.debug("'draw' method called.")
+
+        offsets = np.column_stack((np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64')))
+        if self._scatter is None:
+            self._scatter = self._ax.scatter(offsets[:, 0], offsets[:, 1])
+        else:
+            self._scatter.set_offsets(offsets)
+
+        for text, getter, setter in ((title, self._ax.get_title, self._ax.set_title),
+                                     (xlabel, self._ax.get_xlabel, self._ax.set_xlabel),
+                                     (ylabel, self._ax.get_ylabel, self._ax.set_ylabel)):
+            if text is not None and text != getter():
+                setter(text)
+
+        rescaled = False
+        if len(offsets):
+            rescaled |= self._rescale(values=offsets[:, 0], get_lim=self._ax.get_xlim, set_lim=self._ax.set_xlim)
+            rescaled |= self._rescale(values=offsets[:, 1], get_lim=self._ax.get_ylim, set_lim=self._ax.set_ylim)
+        elif self.fit:
+            self._ax.set_xlim(0, 1)
+            self._ax.set_ylim(0, 1)
+            rescaled = True
+
+        self.draws += 1
+        self.rescales += rescaled
+        self._ax.figure.canvas.draw_idle()
+        return rescaled
+
+    def _rescale(self, values: np.ndarray, get_lim, set_lim) -> bool:
+        """Sets the limits of one axis around the values if they fall outside or fill too little of the current ones,
+        or if they are not fitted to the values in fit mode."""
+        low, high = float(values.min()), float(values.max())
+        span = high - low
+        pad = span * self.MARGIN if span > 0 else max(abs(low) * self.MARGIN, 0.5)
+
+        lim_low, lim_high = get_lim()
+        if self.fit:
+            if (lim_low, lim_high) == (low - pad, high + pad):
+                return False
+        elif lim_low <= low and high <= lim_high and (span + 2 * pad) >= self.SHRINK * (lim_high - lim_low):
+            return False
+
+        set_lim(low - pad, high + pad)
+        return True
@@ -0,0 +1,191 @@
+"""Module contains a record and replay transport for requests made to https://fbref.com/en/.
+
+Classes:
+    ReplayAdapter: requests transport adapter recording responses to a fixture directory, or replaying recorded
+        responses without a network connection.
+
+"""
+
+# Import dependencies
+import os
+import json
+import hashlib
+import logging
+import threading
+
+import requests
+
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from modules.atomic import write_atomic
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter recording responses to, or replaying responses from, a directory of html fixtures.
+
+    In 'record' mode requests are sent through the wrapped adapter and every successful response is written to the
+    fixture directory as the raw html body alongside a json file recording the url, status code and headers. In
+    'replay' mode no connection is made: responses are rebuilt from the recorded files, and a request without a
+    recording raises a requests ConnectionError, so that a test or benchmark never silently falls back to the network.
+    Fixture files are named by the sha1 hash of the url and are left uncompressed so that recorded pages can be
+    inspected and diffed.
+
+    Attributes:
+        _log: logger object for the class.
+        directory: path of the directory the fixtures are written to and read from.
+        mode: 'record' or 'replay'.
+        replayed: number of responses served from fixtures.
+        recorded: number of responses written to fixtures.
+        missing: number of requests in replay mode without a recorded response.
+
+    """
+
+    # Define the modes of the adapter and the response headers recorded with each fixture
+    MODES = ('record', 'replay')
+    RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+    def __init__(self, directory: str, mode: str = 'replay', adapter: BaseAdapter = None, level=logging.WARNING):
+        """Creates an instance of the ReplayAdapter class.
+
+        Args:
+            directory: path of the directory to write fixtures to and read fixtures from.
+            mode: 'record' to send requests and record the responses, or 'replay' to serve recorded responses only.
+            adapter: transport adapter requests are sent through in 'record' mode, defaults to an HTTPAdapter.
+            level: specifies the level of logging messages to record.
+
+        Raises:
+            ValueError: If mode is not one of MODES.
+
+        """
+        super().__init__()
+        self._log = logging.getLogger("ReplayAdapter")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid argument 'mode'. Mode '{mode}' is not one of {list(self.MODES)}.")
+
+        self.directory = directory
+        self.mode = mode
+        self._adapter = adapter if adapter is not None else requests.adapters.HTTPAdapter()
+        if mode == 'record':
+            os.makedirs(self.directory, exist_ok=True)
+
+        # Initialise counters, guarded by a lock as the adapter is shared by the threads of a session
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.recorded = 0
+        self.missing = 0
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:
+        """Sends a prepared request, recording the response in 'record' mode or replaying it in 'replay' mode.
+
+        Args:
+            request: requests.PreparedRequest object to send.
+            stream: passed to the wrapped adapter in 'record' mode.
+            timeout: passed to the wrapped adapter in 'record' mode.
+            verify: passed to the wrapped adapter in 'record' mode.
+            cert: passed to the wrapped adapter in 'record' mode.
+            proxies: passed to the wrapped adapter in 'record' mode.
+
+        Returns:
+            A requests.Response object.
+
+        Raises:
+            requests.ConnectionError: If no response was recorded for the url in 'replay' mode.
+
+        """
+        self._log.debug("'send' method called.")
+
+        if self.mode == 'record':
+            response = self._adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                          proxies=proxies)
+            if response.status_code == 200:
+                self.store(url=request.url, body=response.content, status_code=response.status_code,
+                           headers=response.headers)
+            return response
+
+        fixture = self.load(url=request.url)
+        if fixture is None:
+            with self._lock:
+                self.missing += 1
+            error_msg = f"No recorded response for '{request.url}' in '{self.directory}', record it in 'record' mode."
+            raise requests.ConnectionError(error_msg, request=request)
+
+        with self._lock:
+            self.replayed += 1
+        return self._build_response(request=request, fixture=fixture)
+
+    def close(self):
+        """Closes the wrapped adapter."""
+        self._adapter.close()
+
+    def store(self, url: str, body, status_code: int = 200, headers=None):
+        """Writes a response to the fixture directory.
+
+        Args:
+            url: url the response was requested from.
+            body: html text or bytes of the response.
+            status_code: status code of the response.
+            headers: response headers, of which the RECORDED_HEADERS are kept.
+
+        Returns:
+            None
+
+        """
+        self._log.debug("'store' method called.")
+
+        headers = headers or {}
+        body = body.encode('utf-8') if isinstance(body, str) else body
+        metadata = {'url': url,
+                    'status_code': status_code,
+                    'headers': {name: headers[name] for name in self.RECORDED_HEADERS if name in headers}}
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url=url)
+        write_atomic(f"{path}.html", body)
+        write_atomic(f"{path}.json", json.dumps(metadata, indent=2))
+        with self._lock:
+            self.recorded += 1
+
+    def load(self, url: str):
+        """Recalls the recorded response for the specified url.
+
+        Args:
+            url: url the response was requested from.
+
+        Returns:
+            A dictionary with the recorded metadata and the 'body' bytes, or None if the url was not recorded.
+
+        """
+        path = self._path(url=url)
+        try:
+            with open(f"{path}.json", 'r') as f:
+                fixture = json.load(f)
+            with open(f"{path}.html", 'rb') as f:
+                fixture['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+
+        return fixture
+
+    def stats(self) -> dict:
+        """Returns the number of responses replayed and recorded, and the number of requests without a recording."""
+        return {'replayed': self.replayed, 'recorded': self.recorded, 'missing': self.missing}
+
+    @staticmethod
+    def _build_response(request, fixture: dict) -> requests.Response:
+        """Builds a response object from a recorded fixture."""
+        response = requests.Response()
+        response.status_code = fixture['status_code']
+        response.headers = CaseInsensitiveDict(fixture['headers'])
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response._content = fixture['body']
+        return response
+
+    def _path(self, url: str) -> str:
+        """Returns the path, without extension, of the fixture files for the specified url."""
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest())
@@ -0,0 +1,92 @@
+"""Module contains an event-coalescing scheduler for running a GUI update once per idle cycle.
+
+Classes:
+    IdleScheduler: Marks a view dirty on every request and runs its update callback once on the next idle tick,
+        counting the requests which were coalesced into an update already scheduled.
+
+"""
+
+# Import dependencies
+import logging
+
+from contextlib import contextmanager
+
+
+class IdleScheduler:
+    """Coalesces update requests into a single call of an update callback per idle cycle.
+
+    The first request after an update marks the view dirty and schedules the callback with the specified after_idle
+    function (e.g. tkinter's Misc.after_idle). Further requests made before the callback runs are suppressed, as the
+    scheduled update reads the latest state anyway. The dirty flag is cleared before the callback runs, so that a
+    request made by the callback itself schedules one more update rather than being lost. Requests made while the
+    scheduler is paused, e.g. by variable traces fired when the view itself updates its widgets, are suppressed.
+
+    Attributes:
+        _log: logger object for the class.
+        requests: number of update requests.
+        runs: number of times the update callback was run.
+        suppressed: number of requests coalesced into an update which was already scheduled.
+
+    """
+
+    def __init__(self, after_idle, callback, level=logging.WARNING):
+        """Creates an instance of the IdleScheduler class.
+
+        Args:
+            after_idle: function scheduling a function to be called on the next idle tick of the event loop.
+            callback: update function to run, called without arguments.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("IdleScheduler")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self._after_idle = after_idle
+        self._callback = callback
+        self._dirty = False
+        self._paused = 0
+        self.requests = 0
+        self.runs = 0
+        self.suppressed = 0
+
+    def request(self, *args):
+        """Requests an update on the next idle tick.
+
+        Args:
+            *args: ignored, allows request to be used as a tkinter command or variable trace callback.
+
+        Returns:
+            None
+
+        """
+        self.requests += 1
+        if self._dirty or self._paused:
+            self.suppressed += 1
+            return
+        self._dirty = True
+        self._after_idle(self._run)
+
+    @contextmanager
+    def paused(self):
+        """Returns a context manager suppressing the requests made inside it.
+
+        Returns:
+            A context manager.
+
+        """
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def stats(self) -> dict:
+        """Returns the number of update requests, the number of updates run and the number of requests suppressed."""
+        return {'requests': self.requests, 'runs': self.runs, 'suppressed': self.suppressed}
+
+    def _run(self):
+        """Clears the dirty flag and runs the update callback."""
+        self._dirty = False
+        self.runs += 1
+        self._callback()
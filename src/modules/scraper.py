@@ -1,13 +1,27 @@
 """
 """
 
-import re
+import time
+import hashlib
 import logging
 import requests
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-from bs4 import BeautifulSoup
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from modules.frame_cache import FrameCache
+from modules.http_cache import HttpCache
+from modules.replay import ReplayAdapter
+from modules.instrumentation import Instrumentation
+from modules.snapshot import SnapshotStore
 
 
 class FbRefScraper:
@@ -25,29 +39,141 @@ class FbRefScraper:
                          'playingtime': 'playing_time',
                          'misc': 'misc'}
 
-    def __init__(self, level=logging.WARNING):
+    # Define the FbRef competition ids with the name used in their urls
+    COMPETITIONS = {9: 'Premier-League',
+                    10: 'Championship',
+                    11: 'Serie-A',
+                    12: 'La-Liga',
+                    13: 'Ligue-1',
+                    20: 'Bundesliga',
+                    22: 'Major-League-Soccer',
+                    23: 'Eredivisie',
+                    32: 'Primeira-Liga'}
+
+    # Define the parsers for columns with a known non-numeric format, mapping data-stat to method name
+    COLUMN_PARSERS = {'age': '_parse_age'}
+
+    # Define the fields of the tuple identifying each stored summaries dataframe, and the table and vs of the dataframes
+    # scraped from each summaries page
+    FRAME_KEY = ('table', 'comp', 'season', 'stat', 'vs')
+    PAGE_FRAMES = (('squad', 'for'), ('squad', 'against'), ('player', None))
+
+    # Define the text columns stored as categoricals, and the number of decimal places FbRef publishes, in compact mode
+    CATEGORICAL_COLUMNS = ('squad', 'nationality', 'position', 'comp')
+    PUBLISHED_DECIMALS = 3
+
+    # Define the url prefix of every FbRef page, which the record and replay transport is mounted for
+    BASE_URL = 'https://fbref.com/'
+
+    # Define the response status codes which are retried with exponential backoff
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, level=logging.WARNING, cache_dir: str = None, cache_ttl: float = 3600,
+                 pool_connections: int = 4, pool_maxsize: int = 8, connect_timeout: float = 5,
+                 read_timeout: float = 30, retries: int = 5, backoff_factor: float = 1, compact: bool = False,
+                 snapshot_dir: str = None, cache_max_bytes: int = None, spill_dir: str = None, replay_dir: str = None,
+                 replay_mode: str = 'replay', instrumentation: Instrumentation = None, max_pages: int = 12):
         """Creates an instance of the FbRefScraper class.
 
         Function initialises an instance of the class by creating a logger matching the class name and setting the log
-        level at the specified level.
+        level at the specified level. Requests are made through a pooled session which keeps connections alive between
+        requests and retries failed requests with exponential backoff, honouring any Retry-After header sent with a 429
+        or 503 response. If a cache directory is specified, responses are cached on disk so that new instances can
+        reuse pages downloaded by previous processes. If compact is True, summaries dataframes are stored with
+        downcast numeric columns and categorical text columns through _compact_frame. If a snapshot directory is
+        specified, summaries dataframes missing from the objects memory are loaded from the latest snapshot saved there
+        before falling back to scraping. Summaries dataframes are held in a least recently used cache which can be
+        bounded to a memory budget, optionally spilling evicted dataframes to disk. Parsed pages, whose lxml trees are
+        many times larger than the dataframes built from them, are dropped once every dataframe of the page is stored,
+        and at most max_pages of them are kept otherwise. If a replay directory is specified,
+        requests to fbref.com are recorded to, or replayed from, html fixtures in that directory by a ReplayAdapter. If
+        an Instrumentation object is specified, the duration of each request, parse and processing stage, the bytes
+        downloaded, the rows and cells parsed and the hits and misses of each cache are recorded to it.
 
         Args:
             level:
+            cache_dir: directory for the persistent response cache, the cache is disabled if None.
+            cache_ttl: number of seconds a cached response is used before it is revalidated with the server.
+            pool_connections: number of hosts to keep connection pools for.
+            pool_maxsize: maximum number of connections kept alive per host.
+            connect_timeout: number of seconds to wait for a connection to be established.
+            read_timeout: number of seconds to wait for the server to send data.
+            retries: maximum number of times a failed request is retried.
+            backoff_factor: base number of seconds for the exponential backoff between retries.
+            compact: specifies whether to store summaries dataframes in a compact memory representation.
+            snapshot_dir: directory of a snapshot store to load summaries dataframes from, disabled if None.
+            cache_max_bytes: memory budget in bytes of the summaries dataframe cache, unbounded if None.
+            spill_dir: directory evicted summaries dataframes are written to, dropped if None.
+            replay_dir: directory of recorded html fixtures, requests are sent to fbref.com if None.
+            replay_mode: 'record' to record the responses of requests, or 'replay' to serve recorded responses only.
+            instrumentation: Instrumentation object to record measurements to, disabled if None.
+            max_pages: maximum number of parsed pages kept in memory, least recently used pages are dropped first. The
+                default keeps every page of a concurrent prefetch of all stat categories.
         """
         self._log = logging.getLogger("FbRefScraper")
         self._log.setLevel(level=level)
         self._log.debug(msg="'__init__' method called.")
 
-        # Initialise dataframe dictionaries
-        self._squad_summaries = dict()
-        self._player_summaries = dict()
-
-    def scrape_squad_codes(self):
+        # Initialise the instrumentation, disabled unless an Instrumentation object is specified
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation(enabled=False)
+
+        # Initialise the dataframe cache keyed by FRAME_KEY tuples, and the dictionary recording the size of each
+        # compacted dataframe before it was compacted
+        self._summaries = FrameCache(max_bytes=cache_max_bytes, spill_dir=spill_dir, level=level)
+        self._compact = compact
+        self._original_bytes = dict()
+
+        # Initialise the dictionary recording the url, table id and scrape time of each stored dataframe, the number of
+        # dataframes scraped since the last snapshot was saved, and the optional snapshot store dataframes are lazily
+        # loaded from
+        self._frame_info = dict()
+        self._unsaved = 0
+        self._snapshot = None
+        if snapshot_dir is not None:
+            self._snapshot = SnapshotStore(directory=snapshot_dir, level=level)
+
+        # Initialise the least recently used page dictionary mapping each scraped url to the tables parsed from it, with
+        # a lock per url so that concurrent requests for the same page wait for a single download
+        self._pages = OrderedDict()
+        self._max_pages = max_pages
+        self._page_locks = dict()
+        self._lock = threading.Lock()
+
+        # Initialise the dictionary of wide dataframes joining every stat category, keyed by table, comp, season and vs
+        # and stored with the generation they were built at, which is incremented whenever a stored dataframe changes
+        self._wide = dict()
+        self._generation = 0
+
+        # Initialise the pooled session used for every request
+        self._timeout = (connect_timeout, read_timeout)
+        self._session = self._build_session(pool_connections=pool_connections,
+                                            pool_maxsize=pool_maxsize,
+                                            retries=retries,
+                                            backoff_factor=backoff_factor)
+
+        # Initialise the optional record and replay transport, mounted for fbref.com in front of the retrying adapter
+        self._replay = None
+        if replay_dir is not None:
+            self._replay = ReplayAdapter(directory=replay_dir, mode=replay_mode,
+                                         adapter=self._session.get_adapter(self.BASE_URL), level=level)
+            self._session.mount(self.BASE_URL, self._replay)
+
+        # Initialise the optional persistent response cache
+        self._http_cache = None
+        if cache_dir is not None:
+            self._http_cache = HttpCache(directory=cache_dir, ttl=cache_ttl, level=level)
+
+    def scrape_squad_codes(self, comp: int = 9, season: str = None):
         """Scrapes a dictionary mapping squad names to FbRef squad codes.
 
-        Function makes a request to the url "https://fbref.com/en/comps/9/stats/Premier-League-Stats" and processes the
-        "Squad Standard Stats" table into a dictionary with squad names as keys and squad codes as values. Squad codes
-        can be used to access squad stat pages (e.g. https://fbref.com/en/squads/18bb7c10/Arsenal-Stats).
+        Function makes a request to the standard stats url of the specified competition and season (e.g.
+        "https://fbref.com/en/comps/9/stats/Premier-League-Stats") and processes the "Squad Standard Stats" table into a
+        dictionary with squad names as keys and squad codes as values. Squad codes can be used to access squad stat
+        pages (e.g. https://fbref.com/en/squads/18bb7c10/Arsenal-Stats).
+
+        Args:
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
             A dictionary mapping squad names to FbRef squad codes.
@@ -56,27 +182,29 @@ class FbRefScraper:
         self._log.debug("'scrape_squad_codes' method called.")
 
         # Define the url to request from and the html table_id to process, then scrape the table
-        url = "https://fbref.com/en/comps/9/stats/Premier-League-Stats"
-        table_id = "stats_squads_standard_for"
+        url, table_id = self._squad_summaries_source(stat='stats', vs='for', comp=comp, season=season)
         table = self._scrape_table(url=url, table_id=table_id)
 
         # Extract the codes from the hyperlinks in the table.
         squad_codes = dict()
-        for tr in table.find_all('tr'):
-            th = tr.find('th')
-            if (th['class'] == ['left']) or (th['class'] == ['right']):
-                a = tr.find_all('a')[0]
-                squad_codes[th.text] = a['href'].split('/')[3]
+        for tr, th in self._data_rows(table=table):
+            a = next(tr.iter('a'))
+            squad_codes[th.text_content()] = a.get('href').split('/')[3]
 
         # Return a dictionary
         return squad_codes
 
-    def scrape_player_codes(self):
+    def scrape_player_codes(self, comp: int = 9, season: str = None):
         """Scrapes a dictionary mapping player names to FbRef player codes.
 
-        Function makes a request to the url "https://fbref.com/en/comps/9/stats/Premier-League-Stats" and processes the
-        "Player Standard Stats" table into a dictionary with player names as keys and player codes as values. Player
-        codes can be used to access player stat pages (e.g. https://fbref.com/en/players/774cf58b/Max-Aarons).
+        Function makes a request to the standard stats url of the specified competition and season (e.g.
+        "https://fbref.com/en/comps/9/stats/Premier-League-Stats") and processes the "Player Standard Stats" table into
+        a dictionary with player names as keys and player codes as values. Player codes can be used to access player
+        stat pages (e.g. https://fbref.com/en/players/774cf58b/Max-Aarons).
+
+        Args:
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
             A dictionary mapping squad names to FbRef player codes.
@@ -85,32 +213,29 @@ class FbRefScraper:
         self._log.debug("'scrape_player_codes' method called.")
 
         # Define the url to request from and the html table_id to process, then scrape the table
-        url = "https://fbref.com/en/comps/9/stats/Premier-League-Stats"
-        table_id = "stats_standard"
+        url, table_id = self._player_summaries_source(stat='stats', comp=comp, season=season)
         table = self._scrape_table(url=url, table_id=table_id)
 
         # Extract the codes from the hyperlinks in the table.
-        player_codes = dict()
-        for tr in table.find_all('tr'):
-            th = tr.find('th')
-            if (th['class'] == ['left']) or (th['class'] == ['right']):
-                td = tr.find_all('td')[0]
-                a = tr.find_all('a')[0]
-                player_codes[td.text] = a['href'].split('/')[3]
+        names = [tr.find('td').text_content() for tr, th in self._data_rows(table=table)]
+        player_codes = dict(zip(names, self._player_codes(table=table)))
 
         # Return a dictionary
         return player_codes
 
-    def get_squad_summaries(self, stat: str, vs: str):
+    def get_squad_summaries(self, stat: str, vs: str, comp: int = 9, season: str = None):
         """Recalls a squad summaries dataframe for the specified arguments.
 
         Function attempts to recall a previously scraped and stored squad summaries dataframe from the objects memory.
-        If the dataframe for the specified arguments does not exist, the function instead scrapes the dataframe, stores
-        it in the objects memory, and then returns the dataframe.
+        If the dataframe for the specified arguments does not exist, the function instead loads the dataframe from the
+        snapshot store, or scrapes the dataframe if it is not in the snapshot, stores it in the objects memory, and then
+        returns the dataframe.
 
         Args:
             stat:
             vs:
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
             A pandas dataframe of squad summary information.
@@ -119,22 +244,32 @@ class FbRefScraper:
         # Logging message for function call
         self._log.debug("'get_squad_summaries' method called.")
 
-        if stat not in self._squad_summaries:
-            self._squad_summaries[stat] = dict()
-        if vs not in self._squad_summaries[stat]:
-            self._squad_summaries[stat][vs] = self.scrape_squad_summaries(stat=stat, vs=vs)
+        key = ('squad', comp, season, stat, vs)
+        df = self._summaries.get(key)
+        if df is None:
+            self._instrumentation.count('frame_cache_misses')
+            df = self._load_snapshot(key=key)
+            if df is None:
+                df = self._scrape_frame(key=key)
+            self._summaries[key] = df
+            self._drop_page(stat=stat, comp=comp, season=season)
+        else:
+            self._instrumentation.count('frame_cache_hits')
 
-        return self._squad_summaries[stat][vs]
+        return df
 
-    def get_player_summaries(self, stat: str):
+    def get_player_summaries(self, stat: str, comp: int = 9, season: str = None):
         """Recalls a player summaries dataframe for the specified arguments.
 
         Function attempts to recall a previously scraped and stored player summaries dataframe from the objects memory.
-        If the dataframe for the specified arguments does not exist, the function instead scrapes the dataframe, stores
-        it in the objects memory, and then returns the dataframe.
+        If the dataframe for the specified arguments does not exist, the function instead loads the dataframe from the
+        snapshot store, or scrapes the dataframe if it is not in the snapshot, stores it in the objects memory, and then
+        returns the dataframe.
 
         Args:
             stat:
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
             A pandas dataframe of player summary information.
@@ -143,21 +278,365 @@ class FbRefScraper:
         # Logging message for function call
         self._log.debug("'get_squad_summaries' method called.")
 
-        if stat not in self._player_summaries:
-            self._player_summaries[stat] = self.scrape_player_summaries(stat=stat)
+        key = ('player', comp, season, stat, None)
+        df = self._summaries.get(key)
+        if df is None:
+            self._instrumentation.count('frame_cache_misses')
+            df = self._load_snapshot(key=key)
+            if df is None:
+                df = self._scrape_frame(key=key)
+            self._summaries[key] = df
+            self._drop_page(stat=stat, comp=comp, season=season)
+        else:
+            self._instrumentation.count('frame_cache_hits')
+
+        return df
+
+    @property
+    def generation(self) -> int:
+        """Number of times a stored summaries dataframe has been replaced with changed data, used to invalidate data
+        derived from the stored dataframes."""
+        return self._generation
+
+    def get_wide_squad_summaries(self, vs: str, comp: int = 9, season: str = None) -> pd.DataFrame:
+        """Recalls a wide dataframe joining the squad summaries of every stat category for the specified arguments.
+
+        Args:
+            vs: specifies whether to join the 'for' or 'against' squad summaries.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            A pandas dataframe with squad names as the index, with columns named as described in build_wide.
+
+        """
+        # Logging message for function call
+        self._log.debug("'get_wide_squad_summaries' method called.")
+
+        return self._get_wide(table='squad', comp=comp, season=season, vs=vs)
+
+    def get_wide_player_summaries(self, comp: int = 9, season: str = None) -> pd.DataFrame:
+        """Recalls a wide dataframe joining the player summaries of every stat category for the specified arguments.
+
+        Args:
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            A pandas dataframe indexed by FbRef player code and squad, with columns named as described in build_wide.
+
+        """
+        # Logging message for function call
+        self._log.debug("'get_wide_player_summaries' method called.")
+
+        return self._get_wide(table='player', comp=comp, season=season, vs=None)
+
+    @staticmethod
+    def wide_column(df: pd.DataFrame, stat: str, metric: str) -> str:
+        """Returns the name of the column of a wide dataframe holding a metric of a stat category.
 
-        return self._player_summaries[stat]
+        Args:
+            df: wide dataframe returned by get_wide_squad_summaries or get_wide_player_summaries.
+            stat: stat category the metric was scraped from.
+            metric: column of the summaries dataframe of the stat category.
+
+        Returns:
+            The namespaced column name 'stat.metric', or the metric itself if it is shared by every category.
+
+        """
+        column = f"{stat}.{metric}"
+        return column if column in df.columns else metric
+
+    def _get_wide(self, table: str, comp: int, season: str, vs: str) -> pd.DataFrame:
+        """Recalls the wide dataframe for the specified arguments, building it if it is missing or out of date."""
+        key = (table, comp, season, vs)
+        with self._lock:
+            generation, df = self._wide.get(key, (None, None))
+        if df is not None and generation == self._generation:
+            self._instrumentation.count('wide_cache_hits')
+            return df
+
+        self._instrumentation.count('wide_cache_misses')
+        generation = self._generation
+        if table == 'squad':
+            frames = {stat: self.get_squad_summaries(stat=stat, vs=vs, comp=comp, season=season)
+                      for stat in self.SUMMARY_STAT_OPTS}
+        else:
+            frames = {stat: self.get_player_summaries(stat=stat, comp=comp, season=season)
+                      for stat in self.SUMMARY_STAT_OPTS}
+        df = self.build_wide(frames=frames)
+
+        with self._lock:
+            self._wide[key] = (generation, df)
+        return df
+
+    @staticmethod
+    def build_wide(frames: dict) -> pd.DataFrame:
+        """Joins the summaries dataframes of several stat categories into a single wide dataframe.
+
+        Columns which appear in several categories with the same value for every row they share (e.g. 'minutes_90s' or
+        'games') are kept once under their own name, completed from every category. Every other column is namespaced as
+        'stat.metric', so that any metric of any category is a column of the wide dataframe. Rows are aligned on the
+        index of the summaries dataframes, the squad names or the player codes and squads, so that the join is a lookup
+        of unique labels. The method is static, so that dataframes loaded elsewhere (e.g. from a snapshot) can be joined
+        without creating a scraper.
+
+        Args:
+            frames: dictionary mapping stat categories to their squad or player summaries dataframes.
+
+        Returns:
+            A pandas dataframe with a row per index label of any category.
+
+        """
+        aligned = dict()
+        for stat, df in frames.items():
+            if df.index.has_duplicates:
+                logging.getLogger("FbRefScraper").warning(
+                    f"Dropping {df.index.duplicated().sum()} duplicated rows of '{stat}'.")
+                df = df[~df.index.duplicated()]
+            aligned[stat] = df
+
+        # Group the columns of every category by name, to find the columns shared between categories
+        occurrences = dict()
+        for stat, df in aligned.items():
+            for column in df.columns:
+                occurrences.setdefault(column, []).append(stat)
+
+        shared = dict()
+        for column, stats in occurrences.items():
+            if len(stats) < 2:
+                continue
+            series = [aligned[stat][column] for stat in stats]
+            if all(FbRefScraper._same_values(series[0], other) for other in series[1:]):
+                values = series[0]
+                for other in series[1:]:
+                    values = values.combine_first(other)
+                shared[column] = values
+
+        columns = [pd.DataFrame(data=shared)] if shared else []
+        for stat, df in aligned.items():
+            df = df.drop(columns=[column for column in df.columns if column in shared])
+            columns.append(df.add_prefix(f"{stat}."))
+
+        return pd.concat(columns, axis=1, join='outer')
+
+    @staticmethod
+    def _same_values(a: pd.Series, b: pd.Series) -> bool:
+        """Returns True if two series have the same missing values and the same values on every shared index label."""
+        common = a.index.intersection(b.index)
+        x = a.reindex(common).to_numpy(dtype=object)
+        y = b.reindex(common).to_numpy(dtype=object)
+        x_missing = pd.isna(x)
+        if (x_missing != pd.isna(y)).any():
+            return False
+        return bool((x[~x_missing] == y[~x_missing]).all())
+
+    def refresh(self, max_workers: int = 8) -> dict:
+        """Re-scrapes every stored summaries dataframe, re-processing only the tables whose html has changed.
+
+        Function requests every page a stored dataframe was scraped from again, revalidating any response in the
+        persistent response cache, and compares the hash of each table's html with the hash recorded when its dataframe
+        was scraped. Unchanged tables are skipped, while changed tables are processed again and their dataframes are
+        replaced in the objects memory. Pages are requested concurrently with a thread pool.
 
-    def scrape_squad_summaries(self, stat: str = 'stats', vs: str = 'for'):
+        Args:
+            max_workers: maximum number of pages to request at the same time.
+
+        Returns:
+            A dictionary mapping the FRAME_KEY tuple of each stored dataframe to 'changed', 'unchanged' or 'failed'.
+
+        """
+        # Logging message for function call
+        self._log.debug("'refresh' method called.")
+
+        pages = dict()
+        for key in self._summaries.keys():
+            pages.setdefault(self._frame_source(key=key)[0], []).append(key)
+
+        report = dict()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page_report in executor.map(lambda item: self._refresh_page(*item), pages.items()):
+                report.update(page_report)
+
+        changed = sum(status == 'changed' for status in report.values())
+        self._log.info(f"Refreshed {len(report)} dataframes from {len(pages)} pages, {changed} changed.")
+        return report
+
+    def _refresh_page(self, url: str, keys: list) -> dict:
+        """Requests a page again and replaces the stored dataframes of the specified keys whose table has changed.
+
+        Args:
+            url: url of the page.
+            keys: FRAME_KEY tuples of the stored dataframes scraped from the page.
+
+        Returns:
+            A dictionary mapping each key to 'changed', 'unchanged' or 'failed'.
+
+        """
+        with self._lock:
+            page_lock = self._page_locks.setdefault(url, threading.Lock())
+        try:
+            with page_lock:
+                tables = self._parse_tables(text=self._request(url=url, revalidate=True))
+                if not tables:
+                    raise ValueError(f"No tables found at '{url}'.")
+                self._store_page(url=url, tables=tables)
+        except Exception as e:
+            self._log.warning(f"Failed to refresh '{url}': {e!r}")
+            return {key: 'failed' for key in keys}
+
+        report = dict()
+        for key in keys:
+            try:
+                previous = self._frame_info.get(key, dict()).get('hash')
+                if self._table_hash(*self._frame_source(key=key)) == previous:
+                    report[key] = 'unchanged'
+                    continue
+                df = self._scrape_frame(key=key)
+            except Exception as e:
+                self._log.warning(f"Failed to refresh {key}: {e!r}")
+                report[key] = 'failed'
+                continue
+            self._summaries[key] = df
+            with self._lock:
+                self._generation += 1
+            report[key] = 'changed'
+
+        table, comp, season, stat, vs = keys[0]
+        self._drop_page(stat=stat, comp=comp, season=season)
+        return report
+
+    def _drop_page(self, stat: str, comp: int, season: str):
+        """Drops the parsed summaries page of a stat category once every dataframe scraped from it is stored."""
+        keys = [(table, comp, season, stat, vs) for table, vs in self.PAGE_FRAMES]
+        if all(key in self._summaries for key in keys):
+            with self._lock:
+                self._pages.pop(self._summaries_url(stat=stat, comp=comp, season=season), None)
+
+    def release(self, stat: str, comp: int = 9, season: str = None) -> tuple:
+        """Removes the summaries dataframes and the page of a stat category from the objects memory.
+
+        Function is used by long running jobs, such as backfills over many seasons, to free the memory used by a
+        category once its dataframes have been persisted elsewhere.
+
+        Args:
+            stat: specifies the category of performance metrics to release.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            A tuple of a dictionary mapping FRAME_KEY tuples to the released dataframes, and a dictionary mapping the
+            same keys to the url, table id and scrape time of each dataframe.
+
+        """
+        # Logging message for function call
+        self._log.debug("'release' method called.")
+
+        frames = dict()
+        for table, vs in self.PAGE_FRAMES:
+            df = self._summaries.pop((table, comp, season, stat, vs))
+            if df is not None:
+                frames[(table, comp, season, stat, vs)] = df
+        info = {key: self._frame_info.pop(key) for key in frames if key in self._frame_info}
+
+        with self._lock:
+            self._pages.pop(self._summaries_url(stat=stat, comp=comp, season=season), None)
+            for wide_key in [wide_key for wide_key in self._wide if wide_key[1:3] == (comp, season)]:
+                del self._wide[wide_key]
+
+        return frames, info
+
+    def memory_report(self) -> pd.DataFrame:
+        """Reports the memory used by each stored summaries dataframe.
+
+        Function measures the deep memory usage of every squad and player summaries dataframe held in the objects
+        memory, excluding dataframes spilled to disk. For dataframes stored in compact mode the memory used before
+        compaction is reported alongside, for other dataframes both values are the same.
+
+        Returns:
+            A pandas dataframe indexed by the FRAME_KEY fields with 'bytes_before' and 'bytes_after' columns.
+
+        """
+        # Logging message for function call
+        self._log.debug("'memory_report' method called.")
+
+        rows = []
+        for key, df in self._summaries.resident().items():
+            after = int(df.memory_usage(index=True, deep=True).sum())
+            rows.append(key + (self._original_bytes.get(key, after), after))
+
+        report = pd.DataFrame(data=rows, columns=list(self.FRAME_KEY) + ['bytes_before', 'bytes_after'])
+        return report.set_index(list(self.FRAME_KEY))
+
+    def prefetch_all(self, stats=None, max_workers: int = 8, comp: int = 9, season: str = None) -> dict:
+        """Scrapes and stores the squad and player summaries dataframes for several categories concurrently.
+
+        Function submits one task per stat category to a thread pool. Each task recalls the 'for' and 'against' squad
+        summaries and the player summaries for its category, so that each page is downloaded once and the pages of
+        different categories are downloaded in parallel. A failure in one category is logged and reported without
+        stopping the other categories.
+
+        Args:
+            stats: list of stat categories to prefetch, defaults to every key of SUMMARY_STAT_OPTS.
+            max_workers: maximum number of categories to fetch at the same time.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            A dictionary mapping each stat category to a dictionary with the number of 'seconds' the category took and
+            the 'error' raised while fetching it, or None if it succeeded.
+
+        """
+        # Logging message for function call
+        self._log.debug("'prefetch_all' method called.")
+
+        if stats is None:
+            stats = list(self.SUMMARY_STAT_OPTS.keys())
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {stat: executor.submit(self._prefetch, stat, comp, season) for stat in stats}
+        report = {stat: future.result() for stat, future in futures.items()}
+
+        self._log.info(f"Prefetched {len(stats)} categories in {time.perf_counter() - start:.2f} seconds.")
+        return report
+
+    def _prefetch(self, stat: str, comp: int = 9, season: str = None) -> dict:
+        """Recalls every summaries dataframe for a single stat category, recording the time taken and any error.
+
+        Args:
+            stat: specifies the category of performance metrics to prefetch.
+            comp: FbRef id of the competition.
+            season: season formatted as on FbRef, or None for the current season.
+
+        Returns:
+            A dictionary with the number of 'seconds' the category took and the 'error' raised, or None.
+
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            self.get_squad_summaries(stat=stat, vs='for', comp=comp, season=season)
+            self.get_squad_summaries(stat=stat, vs='against', comp=comp, season=season)
+            self.get_player_summaries(stat=stat, comp=comp, season=season)
+        except Exception as e:
+            self._log.warning(f"Failed to prefetch '{stat}': {e!r}")
+            error = repr(e)
+
+        return {'seconds': time.perf_counter() - start, 'error': error}
+
+    def scrape_squad_summaries(self, stat: str = 'stats', vs: str = 'for', comp: int = 9, season: str = None):
         """Scrapes a dataframe summarising each squads performance metrics for the specified category.
 
         Function makes a request to a url (e.g. "https://fbref.com/en/comps/9/stats/Premier-League-Stats") which
-        contains the squad summaries data for the specified stat category (e.g. 'shooting'). The table containing either
-        the 'for' or 'against' data is then scraped and processed into a dataframe.
+        contains the squad summaries data for the specified stat category (e.g. 'shooting'), competition and season.
+        The table containing either the 'for' or 'against' data is then scraped and processed into a dataframe.
 
         Args:
             stat: specifies the category of performance metrics to scrape.
             vs: specifies whether to scrape the 'for' or 'against' table.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
             A pandas dataframe with squad names as the index and performance metrics as the columns.
@@ -167,9 +646,7 @@ class FbRefScraper:
         self._log.debug("'_scrape_squad_summaries' method called.")
 
         # Define the url to request from and the html table_id to process, then scrape the table
-        url = f"https://fbref.com/en/comps/9/{stat}/Premier-League-Stats"
-        table_id = f"stats_squads_{self.SUMMARY_STAT_OPTS[stat]}_{vs}"
-
+        url, table_id = self._squad_summaries_source(stat=stat, vs=vs, comp=comp, season=season)
         table = self._scrape_table(url=url, table_id=table_id)
         df = self._process_table(table=table, index='squad', include_row_header=True)
 
@@ -182,44 +659,249 @@ class FbRefScraper:
         # Return a dataframe
         return df
 
-    def scrape_player_summaries(self, stat: str = 'stats'):
+    def scrape_player_summaries(self, stat: str = 'stats', comp: int = 9, season: str = None):
         """Scrapes a dataframe summarising each players performance metrics for the specified category.
 
         Function makes a request to a url (e.g. "https://fbref.com/en/comps/9/stats/Premier-League-Stats") which
-        contains the player summaries data for the specified stat category (e.g. 'shooting').
+        contains the player summaries data for the specified stat category (e.g. 'shooting'), competition and season.
 
         Args:
             stat: specifies the category of performance metrics to scrape.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
 
         Returns:
-            A pandas dataframe with player names as the index and performance metrics as the columns.
+            A pandas dataframe indexed by FbRef player code and squad, with the player names and performance metrics as
+            the columns.
 
         """
         # Logging message for function call
         self._log.debug("'_scrape_squad_summaries' method called.")
 
         # Define the url to request from and the html table_id to process, then scrape the table
-        url = f"https://fbref.com/en/comps/9/{stat}/Premier-League-Stats"
-        table_id = f"stats_{self.SUMMARY_STAT_OPTS[stat]}"
-
+        url, table_id = self._player_summaries_source(stat=stat, comp=comp, season=season)
         table = self._scrape_table(url=url, table_id=table_id)
-        df = self._process_table(table=table, index='player', include_row_header=False)
+        df = self._process_table(table=table, include_row_header=False)
+
+        # Index the rows by player code and squad, as player names are not unique and a player transferred during the
+        # season has a row per squad
+        index = pd.MultiIndex.from_arrays([self._player_codes(table=table), df['squad']],
+                                          names=['code', 'squad'])
+        df = df.drop(columns='squad').set_axis(index, axis=0)
 
         # Return a dataframe
         return df
 
+    def scrape_page_tables(self, url: str, prefixes=None, include_row_header: bool = True) -> dict:
+        """Scrapes every table of a page whose id starts with one of the specified prefixes into dataframes.
+
+        Function requests the specified url, through the persistent response cache if enabled, and processes each
+        matching table into a dataframe. Unlike the summaries pages, the page is not kept in the objects memory, so
+        that crawling many pages (e.g. one page per player) does not grow memory.
+
+        Args:
+            url: url of the page to scrape.
+            prefixes: list of table id prefixes to scrape, or None to scrape every table with an id.
+            include_row_header: specifies whether to include the row header cell of each row as a column.
+
+        Returns:
+            A dictionary mapping table ids to pandas dataframes.
+
+        Raises:
+            ValueError: If no table of the page matches the prefixes, e.g. for a rate limit or error page.
+
+        """
+        # Logging message for function call
+        self._log.debug("'scrape_page_tables' method called.")
+
+        tables = self._parse_tables(text=self._request(url=url))
+        frames = {table_id: self._process_table(table=table, include_row_header=include_row_header)
+                  for table_id, table in tables.items()
+                  if prefixes is None or table_id.startswith(tuple(prefixes))}
+        if not frames:
+            raise ValueError(f"No tables matching {prefixes} found at '{url}'.")
+        return frames
+
+    def scrape_match_logs(self, code: str, comp: int = 9, season: str = None) -> pd.DataFrame:
+        """Scrapes the match log of a squad in the specified competition and season into a pandas dataframe.
+
+        Function makes a request to the scores and fixtures page of the squad (e.g.
+        "https://fbref.com/en/squads/18bb7c10/matchlogs/c9/schedule/") and processes the "Scores & Fixtures" table into
+        a dataframe indexed by match date. Fixtures which have not been played yet are included with a blank result.
+        Like scrape_page_tables, the page is not kept in the objects memory.
+
+        Args:
+            code: FbRef squad code, one of the values returned by scrape_squad_codes.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            A pandas dataframe with a row per match, indexed by match date formatted as 'YYYY-MM-DD'.
+
+        Raises:
+            ValueError: If comp is not a key of COMPETITIONS, or the page has no match log table.
+
+        """
+        # Logging message for function call
+        self._log.debug("'scrape_match_logs' method called.")
+
+        if comp not in self.COMPETITIONS:
+            error_msg = f"Invalid argument 'comp'. Competition '{comp}' is not one of {list(self.COMPETITIONS)}."
+            raise ValueError(error_msg)
+
+        if season is None:
+            url = f"https://fbref.com/en/squads/{code}/matchlogs/c{comp}/schedule/"
+        else:
+            url = f"https://fbref.com/en/squads/{code}/{season}/matchlogs/c{comp}/schedule/"
+
+        table = self._parse_tables(text=self._request(url=url)).get('matchlogs_for')
+        if table is None:
+            raise ValueError(f"Table 'matchlogs_for' not found at '{url}'.")
+        return self._process_table(table=table, index='date', include_row_header=True)
+
+    def _summaries_url(self, stat: str, comp: int = 9, season: str = None) -> str:
+        """Returns the url of the summaries page for the specified stat category, competition and season.
+
+        Args:
+            stat: specifies the category of performance metrics.
+            comp: FbRef id of the competition, one of the keys of COMPETITIONS.
+            season: season formatted as on FbRef (e.g. '2020-2021'), or None for the current season.
+
+        Returns:
+            The url of the summaries page.
+
+        Raises:
+            ValueError: If comp is not a key of COMPETITIONS.
+
+        """
+        if comp not in self.COMPETITIONS:
+            error_msg = f"Invalid argument 'comp'. Competition '{comp}' is not one of {list(self.COMPETITIONS)}."
+            raise ValueError(error_msg)
+
+        if season is None:
+            return f"https://fbref.com/en/comps/{comp}/{stat}/{self.COMPETITIONS[comp]}-Stats"
+        return f"https://fbref.com/en/comps/{comp}/{season}/{stat}/{season}-{self.COMPETITIONS[comp]}-Stats"
+
+    def _squad_summaries_source(self, stat: str, vs: str, comp: int = 9, season: str = None) -> tuple:
+        """Returns the url and html table id of the squad summaries table for the specified arguments."""
+        url = self._summaries_url(stat=stat, comp=comp, season=season)
+        table_id = f"stats_squads_{self.SUMMARY_STAT_OPTS[stat]}_{vs}"
+        return url, table_id
+
+    def _player_summaries_source(self, stat: str, comp: int = 9, season: str = None) -> tuple:
+        """Returns the url and html table id of the player summaries table for the specified arguments."""
+        url = self._summaries_url(stat=stat, comp=comp, season=season)
+        table_id = f"stats_{self.SUMMARY_STAT_OPTS[stat]}"
+        return url, table_id
+
+    def save_snapshot(self, directory: str, keep: int = None) -> str:
+        """Saves every stored summaries dataframe as a new version of the snapshot store in the specified directory.
+
+        Function writes each squad and player summaries dataframe stored in the objects memory to a columnar file,
+        together with a manifest recording the url, table id and scrape time of each dataframe, so that a new instance
+        created with the same snapshot_dir can load the dataframes instead of scraping them. Dataframes in the snapshot
+        the object was created with which have not been loaded yet are carried over into the new version. No version is
+        written if nothing was scraped since the object was created from, or last saved to, the same snapshot store.
+        Once saved, dataframes are lazily loaded from the new version, so that pruning older versions is safe.
+
+        Args:
+            directory: directory of the snapshot store.
+            keep: number of most recent versions to keep in the store, every version is kept if None.
+
+        Returns:
+            The name of the saved version, or of the latest version if nothing was saved.
+
+        """
+        # Logging message for function call
+        self._log.debug("'save_snapshot' method called.")
+
+        store = SnapshotStore(directory=directory, level=self._log.level)
+        if not self._unsaved and self._snapshot is not None and self._snapshot.directory == directory:
+            self._log.info("Nothing was scraped since the snapshot was loaded, not saving a new version.")
+            return store.latest()
+
+        frames = self._stored_frames()
+        if self._snapshot is not None:
+            for key in self._snapshot.manifest():
+                if key not in frames:
+                    frames[key] = self._load_snapshot(key=key)
+        info = {key: self._frame_info[key] for key in frames if key in self._frame_info}
+        version = store.save(frames=frames, info=info)
+        self._unsaved = 0
+        self._snapshot = SnapshotStore(directory=directory, version=version, level=self._log.level)
+        if keep is not None:
+            self._snapshot.prune(keep=keep)
+        return version
+
+    def _frame_source(self, key: tuple) -> tuple:
+        """Returns the url and html table id of the table the dataframe with the specified FRAME_KEY is scraped from."""
+        table, comp, season, stat, vs = key
+        if table == 'squad':
+            return self._squad_summaries_source(stat=stat, vs=vs, comp=comp, season=season)
+        return self._player_summaries_source(stat=stat, comp=comp, season=season)
+
+    def _scrape_frame(self, key: tuple) -> pd.DataFrame:
+        """Scrapes the dataframe with the specified FRAME_KEY.
+
+        Function scrapes the squad or player summaries dataframe identified by the key, records the url, table id,
+        scrape time and table html hash of the dataframe, and compacts the dataframe in compact mode.
+
+        Args:
+            key: tuple of table, comp, season, stat and vs identifying the dataframe.
+
+        Returns:
+            A pandas dataframe of summary information.
+
+        """
+        table, comp, season, stat, vs = key
+        if table == 'squad':
+            df = self.scrape_squad_summaries(stat=stat, vs=vs, comp=comp, season=season)
+        else:
+            df = self.scrape_player_summaries(stat=stat, comp=comp, season=season)
+
+        url, table_id = self._frame_source(key=key)
+        self._unsaved += 1
+        self._frame_info[key] = {'url': url,
+                                 'table_id': table_id,
+                                 'scraped_at': time.time(),
+                                 'hash': self._table_hash(url=url, table_id=table_id)}
+
+        if self._compact:
+            df = self._compact_frame(df=df, key=key)
+        return df
+
+    def _table_hash(self, url: str, table_id: str) -> str:
+        """Returns the sha1 hash of the html of the specified table."""
+        return hashlib.sha1(etree.tostring(self._scrape_table(url=url, table_id=table_id))).hexdigest()
+
+    def _load_snapshot(self, key: tuple):
+        """Loads the dataframe for the specified key from the snapshot store, returning None if it is not available."""
+        if self._snapshot is None:
+            return None
+
+        with self._instrumentation.stage('snapshot_load'):
+            df = self._snapshot.load(key=key)
+        if df is not None:
+            self._frame_info[key] = {k: v for k, v in self._snapshot.manifest()[key].items()
+                                     if k in ('url', 'table_id', 'scraped_at', 'hash')}
+        return df
+
+    def _stored_frames(self) -> dict:
+        """Returns every stored summaries dataframe, including spilled dataframes, keyed by FRAME_KEY tuples."""
+        return {key: self._summaries.peek(key) for key in self._summaries.keys()}
+
     def _scrape_table(self, url: str, table_id: str):
         """Scrapes the specified table from the specified url.
 
-        Function makes a request to the specified url, coverts the html response into a BeautifulSoup object, parses
-        through each table in the soup until a match is found.
+        Function recalls the tables parsed from the specified url through _scrape_page, so that each url is only
+        requested and parsed once no matter how many of its tables are scraped, and returns the matching table.
 
         Args:
             url:
             table_id:
 
         Returns:
-            A BeautifulSoup object containing the html data for the specified table.
+            An lxml element containing the html data for the specified table.
 
         Raises:
             ValueError: If no table with an id matching table_id can be found.
@@ -227,28 +909,229 @@ class FbRefScraper:
         """
         self._log.debug("'scrape_table' method called.")
 
-        res = requests.get(url)
-        comm = re.compile("<!--|-->")
-        soup = BeautifulSoup(comm.sub("", res.text), 'lxml')
-        all_tables = soup.find_all('table')
-
-        for table in all_tables:
-            if 'id' not in table.attrs:
-                continue
-            if table['id'] == table_id:
-                return table
+        tables = self._scrape_page(url=url)
+        if table_id in tables:
+            return tables[table_id]
 
         error_msg = f"Invalid argument 'table_id'. A table with id '{table_id}' was not found in any table tag."
         raise ValueError(error_msg)
 
+    def _scrape_page(self, url: str) -> dict:
+        """Scrapes every table with an id from the specified url.
+
+        Function attempts to recall the tables previously parsed from the specified url from the objects memory. If the
+        url has not been scraped yet, the function makes a request to the url and extracts every table with an id
+        attribute through _parse_tables, keyed by that id. Failed requests and pages without any table (e.g. an error
+        page served with a 200 status) are not kept, so that the next call requests the page again.
+
+        Args:
+            url:
+
+        Returns:
+            A dictionary mapping table ids to lxml elements containing the html data for each table.
+
+        """
+        self._log.debug("'_scrape_page' method called.")
+
+        with self._lock:
+            page_lock = self._page_locks.setdefault(url, threading.Lock())
+
+        with page_lock:
+            with self._lock:
+                tables = self._pages.get(url)
+                if tables is not None:
+                    self._pages.move_to_end(url)
+            if tables is None:
+                self._instrumentation.count('page_cache_misses')
+                tables = self._parse_tables(text=self._request(url=url))
+                if tables:
+                    self._store_page(url=url, tables=tables)
+            else:
+                self._instrumentation.count('page_cache_hits')
+
+        return tables
+
+    def _store_page(self, url: str, tables: dict):
+        """Stores the tables parsed from a page, dropping the least recently used pages beyond max_pages."""
+        with self._lock:
+            self._pages[url] = tables
+            self._pages.move_to_end(url)
+            while len(self._pages) > max(self._max_pages, 1):
+                self._pages.popitem(last=False)
+
+    def _parse_tables(self, text: str) -> dict:
+        """Parses every table with an id from a html document, including tables hidden inside html comments.
+
+        FbRef serves most of the tables on a page inside html comments which are uncommented by javascript. Function
+        parses the document once with lxml and walks the table elements and comments in document order, parsing the
+        content of any comment containing a table as a html fragment. Only the first table is kept when several tables
+        share an id.
+
+        Args:
+            text: html text of the document.
+
+        Returns:
+            A dictionary mapping table ids to lxml elements containing the html data for each table.
+
+        """
+        self._log.debug("'_parse_tables' method called.")
+
+        with self._instrumentation.stage('parse_document'):
+            document = html.fromstring(text)
+
+        # The 'find_tables' stage includes the 'parse_comments' stages nested in it
+        tables = dict()
+        with self._instrumentation.stage('find_tables'):
+            for element in document.iter('table', etree.Comment):
+                if element.tag is etree.Comment:
+                    if '<table' not in (element.text or ''):
+                        continue
+                    with self._instrumentation.stage('parse_comments'):
+                        candidates = list(html.fragment_fromstring(element.text, create_parent='div').iter('table'))
+                else:
+                    candidates = [element]
+                for table in candidates:
+                    if table.get('id') is not None:
+                        tables.setdefault(table.get('id'), table)
+
+        return tables
+
+    def _request(self, url: str, revalidate: bool = False) -> str:
+        """Requests the html text of the specified url, using the persistent response cache if enabled.
+
+        Function serves the cached response if it is younger than the cache ttl, unless revalidate is True. Otherwise
+        the url is requested with the validators of any stale cached response, so that an unchanged page is confirmed by
+        a 304 response instead of being downloaded again. Successful full responses are written to the cache. As the
+        session retries 429 and 5xx responses without raising, the status code of the final response is checked so
+        that an error page is never returned as the requested page.
+
+        Args:
+            url:
+            revalidate: specifies whether to revalidate the cached response even if it is younger than the cache ttl.
+
+        Returns:
+            The html text of the response.
+
+        Raises:
+            requests.HTTPError: If the final response is not successful.
+
+        """
+        self._log.debug("'_request' method called.")
+
+        if self._http_cache is None:
+            with self._instrumentation.stage('request'):
+                res = self._session.get(url, timeout=self._timeout)
+            if self._instrumentation.enabled:
+                self._instrumentation.count('bytes_downloaded', len(res.content))
+            self._check_status(url=url, res=res)
+            return res.text
+
+        entry = self._http_cache.load(url=url)
+        if entry is not None and not revalidate and self._http_cache.is_fresh(entry=entry):
+            self._instrumentation.count('http_cache_hits')
+            return self._http_cache.hit(entry=entry)
+
+        with self._instrumentation.stage('request'):
+            res = self._session.get(url, headers=self._http_cache.conditional_headers(entry=entry),
+                                    timeout=self._timeout)
+        if self._instrumentation.enabled:
+            self._instrumentation.count('bytes_downloaded', len(res.content))
+        if res.status_code == 304 and entry is not None:
+            self._instrumentation.count('http_cache_revalidations')
+            return self._http_cache.revalidated(url=url, entry=entry)
+        self._instrumentation.count('http_cache_misses')
+        self._check_status(url=url, res=res)
+        self._http_cache.store(url=url, body=res.text, headers=res.headers)
+
+        return res.text
+
+    @staticmethod
+    def _check_status(url: str, res: requests.Response):
+        """Raises a requests.HTTPError if a response is not a successful full response."""
+        if res.status_code != 200:
+            error_msg = f"Request to '{url}' failed with status code {res.status_code}."
+            raise requests.HTTPError(error_msg, response=res)
+
+    def _build_session(self, pool_connections: int, pool_maxsize: int, retries: int,
+                       backoff_factor: float) -> requests.Session:
+        """Builds a pooled requests session which retries failed requests with exponential backoff.
+
+        Args:
+            pool_connections: number of hosts to keep connection pools for.
+            pool_maxsize: maximum number of connections kept alive per host.
+            retries: maximum number of times a failed request is retried.
+            backoff_factor: base number of seconds for the exponential backoff between retries.
+
+        Returns:
+            A requests.Session object with a retrying HTTPAdapter mounted for http and https urls.
+
+        """
+        self._log.debug("'_build_session' method called.")
+
+        retry = Retry(total=retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=self.RETRY_STATUS_CODES,
+                      allowed_methods=frozenset(['GET']),
+                      respect_retry_after_header=True,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def frame_cache_stats(self) -> dict:
+        """Returns the hit, miss, eviction and reload counters and the memory used by the summaries dataframe cache.
+
+        Returns:
+            A dictionary of counters.
+
+        """
+        return self._summaries.stats()
+
+    def instrumentation_stats(self) -> dict:
+        """Returns the stage durations and counters recorded by the instrumentation.
+
+        Returns:
+            A dictionary of 'stages' and 'counters' as returned by Instrumentation.stats, empty if disabled.
+
+        """
+        if not self._instrumentation.enabled:
+            return dict()
+        return self._instrumentation.stats()
+
+    def replay_stats(self) -> dict:
+        """Returns the replayed, recorded and missing counters of the record and replay transport.
+
+        Returns:
+            A dictionary of counters, empty if the transport is disabled.
+
+        """
+        if self._replay is None:
+            return dict()
+        return self._replay.stats()
+
+    def http_cache_stats(self) -> dict:
+        """Returns the hit, miss, revalidation and bytes saved counters of the persistent response cache.
+
+        Returns:
+            A dictionary of counters, empty if the cache is disabled.
+
+        """
+        if self._http_cache is None:
+            return dict()
+        return self._http_cache.stats()
+
     def _process_table(self, table, index: str = None, include_row_header: bool = False) -> pd.DataFrame:
         """Process a html table tag into a pandas dataframe object.
 
-        Function loops through all table rows in a table and then all table data in a table row, inserting the datapoint
-        into a data dictionary. The dictionary is converted into a pandas dataframe and returned.
+        Function loops through all data rows in a table and then all table data in a table row, collecting the raw text
+        of each datapoint into a list per column. Each column is then converted to a typed column in a single pass by
+        _convert_column, and the columns are assembled into a pandas dataframe and returned.
 
         Args:
-            table ():
+            table (lxml.html.HtmlElement):
             index (str):
             include_row_header (bool):
 
@@ -257,22 +1140,142 @@ class FbRefScraper:
         """
         self._log.debug("'_process_data' method called.")
 
-        data_dict = dict()
-        for tr in table.find_all('tr'):
-            th = tr.find('th')
-            if (th['class'] == ['left']) or (th['class'] == ['right']):
+        with self._instrumentation.stage('process'):
+            data_dict = dict()
+            for tr, th in self._data_rows(table=table):
                 if include_row_header:
-                    data_dict.setdefault(th['data-stat'], []).append(th.text)
-                for td in tr.find_all('td'):
-                    try:
-                        data_dict.setdefault(td['data-stat'], []).append(float(td.text))
-                    except ValueError:
-                        data_dict.setdefault(td['data-stat'], []).append(td.text)
+                    data_dict.setdefault(th.get('data-stat'), []).append(th.text_content())
+                for td in tr.iterchildren('td'):
+                    data_dict.setdefault(td.get('data-stat'), []).append(td.text_content())
+
+            columns = {column: self._convert_column(values=values, name=column)
+                       for column, values in data_dict.items() if column != index}
+
+        if self._instrumentation.enabled:
+            self._instrumentation.count('rows_parsed', max((len(values) for values in data_dict.values()), default=0))
+            self._instrumentation.count('cells_parsed', sum(len(values) for values in data_dict.values()))
 
         if not isinstance(index, type(None)):
-            return pd.DataFrame(data=data_dict, index=data_dict[index]).drop(labels=[index], axis=1)
+            return pd.DataFrame(data=columns).set_axis(pd.Index(data_dict[index]), axis=0)
         else:
-            return pd.DataFrame(data=data_dict)
+            return pd.DataFrame(data=columns)
+
+    def _convert_column(self, values: list, name: str):
+        """Converts a column of raw table text into a typed column.
+
+        Columns with a parser in COLUMN_PARSERS are converted by that parser. Otherwise the whole column is parsed as
+        numbers in one vectorized pass, and only values which fail that pass are parsed again with thousands separators
+        and surrounding whitespace removed. If every non-blank value is a number the column is converted to int64, to
+        the nullable Int64 dtype if it contains blanks, or to float64 if any value has a decimal point. Any other column
+        is returned as text.
+
+        Args:
+            values: list of raw text values.
+            name: data-stat of the column.
+
+        Returns:
+            An array of converted values, or the list of text values.
+
+        """
+        if name in self.COLUMN_PARSERS:
+            return getattr(self, self.COLUMN_PARSERS[name])(values)
+
+        raw = np.array(values, dtype=object)
+        blank = raw == ''
+        numbers = pd.to_numeric(raw, errors='coerce').astype('float64')
+
+        failed = np.isnan(numbers) & ~blank
+        if failed.any():
+            cleaned = np.array([value.replace(',', '').strip() for value in raw[failed]], dtype=object)
+            numbers[failed] = pd.to_numeric(cleaned, errors='coerce')
+            blank[failed] = cleaned == ''
+            if np.isnan(numbers[~blank]).any():
+                return values
+
+        if blank.all() or any('.' in value for value in raw[~blank]):
+            return numbers
+        if blank.any():
+            return pd.array(numbers, dtype='Int64')
+        return numbers.astype('int64')
+
+    @staticmethod
+    def _parse_age(values: list) -> np.ndarray:
+        """Converts a column of ages formatted as 'years-days' (e.g. '25-123') or 'years' into float64 years."""
+        parts = pd.Series(values, dtype=object).str.strip().str.split('-', n=1, expand=True).reindex(columns=[0, 1])
+        years = pd.to_numeric(parts[0].mask(parts[0] == ''), errors='coerce')
+        days = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+        return (years + days / 365.25).to_numpy(dtype='float64')
+
+    def _compact_frame(self, df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+        """Converts a summaries dataframe into a compact memory representation.
+
+        Function downcasts integer columns to the smallest integer dtype holding every value, and float64 columns to
+        float32 where every value is recovered exactly at the PUBLISHED_DECIMALS precision FbRef publishes. Text columns
+        listed in CATEGORICAL_COLUMNS are converted to pandas categoricals. The memory used by the dataframe before
+        compaction is recorded under the specified key for memory_report.
+
+        Args:
+            df: summaries dataframe to compact.
+            key: tuple of table, comp, season, stat and vs identifying the dataframe.
+
+        Returns:
+            A compacted copy of the dataframe.
+
+        """
+        self._log.debug("'_compact_frame' method called.")
+
+        self._original_bytes[key] = int(df.memory_usage(index=True, deep=True).sum())
+
+        columns = dict()
+        for column in df.columns:
+            values = df[column]
+            if pd.api.types.is_integer_dtype(values):
+                values = pd.to_numeric(values, downcast='integer')
+            elif pd.api.types.is_float_dtype(values):
+                single = values.astype('float32')
+                restored = single.astype('float64').round(self.PUBLISHED_DECIMALS)
+                if restored.equals(values):
+                    values = single
+            elif column in self.CATEGORICAL_COLUMNS:
+                values = values.astype('category')
+            columns[column] = values
+
+        return pd.DataFrame(data=columns, index=df.index)
+
+    def _player_codes(self, table) -> list:
+        """Extracts the FbRef player code of each data row of a player table from the hyperlink of the player name.
+
+        Args:
+            table (lxml.html.HtmlElement):
+
+        Returns:
+            A list of player codes, with None for rows without a player hyperlink.
+
+        """
+        codes = []
+        for tr, th in self._data_rows(table=table):
+            a = next(tr.iter('a'), None)
+            codes.append(a.get('href').split('/')[3] if a is not None else None)
+        return codes
+
+    @staticmethod
+    def _data_rows(table):
+        """Yields the data rows of a html table, skipping header and spacer rows.
+
+        FbRef marks data rows by giving the row header cell a class of exactly 'left' or 'right', whereas header rows
+        have additional classes.
+
+        Args:
+            table (lxml.html.HtmlElement):
+
+        Yields:
+            A tuple of the table row element and its table header cell element.
+
+        """
+        for tr in table.iter('tr'):
+            th = tr.find('th')
+            if th is not None and th.get('class', '').split() in (['left'], ['right']):
+                yield tr, th
 
 
 if __name__ == "__main__":
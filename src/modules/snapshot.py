@@ -0,0 +1,227 @@
+"""Module contains a versioned, columnar on-disk store for summaries dataframes scraped from https://fbref.com/en/.
+
+Classes:
+    SnapshotStore: Versioned store writing each dataframe to an uncompressed Feather file with a json manifest, and
+        loading dataframes lazily through memory mapping.
+
+"""
+
+# Import dependencies
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+
+from pyarrow import feather
+
+from modules.atomic import write_atomic
+
+
+class SnapshotStore:
+    """Versioned, columnar on-disk store for summaries dataframes.
+
+    Each snapshot is written to its own version directory containing one uncompressed Feather file per dataframe and a
+    manifest recording, for every dataframe, the file it is stored in, the url and table id it was scraped from and the
+    time it was scraped. A LATEST file at the top of the store names the most recent complete version, and is only
+    updated once every file of a version has been written. Dataframes are keyed by a tuple of the KEY_FIELDS.
+
+    Attributes:
+        _log: logger object for the class.
+        directory: path of the directory containing the version directories.
+        version: name of the version dataframes are loaded from, or None if the store is empty.
+
+    """
+
+    # Define the name of the index column written to each Feather file, suffixed with the level number for multi-level
+    # indexes, and the fields of the key of each dataframe
+    INDEX_COLUMN = '__index__'
+    KEY_FIELDS = ('table', 'comp', 'season', 'stat', 'vs')
+
+    def __init__(self, directory: str, version: str = None, level=logging.WARNING):
+        """Creates an instance of the SnapshotStore class.
+
+        Function initialises an instance of the class by creating a logger matching the class name and setting the log
+        level at the specified level. The store loads dataframes from the specified version, or from the latest version
+        if no version is specified.
+
+        Args:
+            directory: path of the directory containing the version directories.
+            version: name of the version to load dataframes from, defaults to the latest version.
+            level: specifies the level of logging messages to record.
+
+        """
+        self._log = logging.getLogger("SnapshotStore")
+        self._log.setLevel(level=level)
+        self._log.debug(msg="'__init__' method called.")
+
+        self.directory = directory
+        self.version = version if version is not None else self.latest()
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def latest(self):
+        """Returns the name of the latest complete version in the store, or None if the store is empty."""
+        try:
+            with open(os.path.join(self.directory, 'LATEST'), 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def versions(self) -> list:
+        """Returns the names of every complete version in the store, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isfile(os.path.join(self.directory, name, 'manifest.json')))
+
+    def manifest(self) -> dict:
+        """Returns the manifest of the loaded version, mapping each dataframe key to its manifest entry."""
+        with self._lock:
+            if self._manifest is None:
+                self._manifest = dict()
+                if self.version is not None:
+                    with open(os.path.join(self.directory, self.version, 'manifest.json'), 'r') as f:
+                        for entry in json.load(f)['frames']:
+                            self._manifest[self._key(entry=entry)] = entry
+        return self._manifest
+
+    def load(self, key: tuple):
+        """Loads the dataframe stored under the specified key from the loaded version.
+
+        The Feather file is memory mapped, so only the pages backing the columns are read from disk.
+
+        Args:
+            key: tuple of the KEY_FIELDS identifying the dataframe.
+
+        Returns:
+            A pandas dataframe, or None if the loaded version does not contain the key.
+
+        """
+        self._log.debug("'load' method called.")
+
+        entry = self.manifest().get(key)
+        if entry is None:
+            return None
+
+        path = os.path.join(self.directory, self.version, entry['file'])
+        df = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+        # Versions written before multi-level indexes were supported record a single 'index_name'
+        names = entry.get('index_names', [entry.get('index_name')])
+        if len(names) == 1:
+            return df.set_index(self.INDEX_COLUMN).rename_axis(index=names[0])
+        return df.set_index(self._index_columns(nlevels=len(names))).rename_axis(index=names)
+
+    def save(self, frames: dict, info: dict) -> str:
+        """Writes a new version containing the specified dataframes and makes it the latest version.
+
+        Args:
+            frames: dictionary mapping tuples of the KEY_FIELDS to pandas dataframes.
+            info: dictionary mapping the same keys to dictionaries with the 'url', 'table_id' and 'scraped_at' time of
+                each dataframe.
+
+        Returns:
+            The name of the new version.
+
+        """
+        self._log.debug("'save' method called.")
+
+        now = time.time()
+        version = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now)) + f".{int(now * 1e6) % 1000000:06d}"
+        os.makedirs(os.path.join(self.directory, version))
+
+        entries = self._write_frames(version=version, frames=frames, info=info)
+        self._write_manifest(version=version, entries=entries)
+
+        self._log.info(f"Saved {len(entries)} dataframes to snapshot version '{version}'.")
+        return version
+
+    def prune(self, keep: int) -> list:
+        """Removes every complete version but the specified number of most recent ones, never removing the latest.
+
+        Args:
+            keep: number of most recent versions to keep.
+
+        Returns:
+            The names of the removed versions.
+
+        Raises:
+            ValueError: If keep is less than 1.
+
+        """
+        self._log.debug("'prune' method called.")
+
+        if keep < 1:
+            raise ValueError(f"Invalid argument 'keep'. Keep '{keep}' is less than 1.")
+
+        latest = self.latest()
+        removed = [version for version in self.versions()[:-keep] if version not in (latest, self.version)]
+        for version in removed:
+            shutil.rmtree(os.path.join(self.directory, version))
+
+        self._log.info(f"Pruned {len(removed)} snapshot versions.")
+        return removed
+
+    def append(self, frames: dict, info: dict, version: str) -> str:
+        """Adds the specified dataframes to a version, creating it if needed, and makes it the latest version.
+
+        Dataframes already in the version under the same keys are replaced. The version manifest is rewritten after the
+        dataframe files, so an interrupted append leaves the version as it was before the append.
+
+        Args:
+            frames: dictionary mapping tuples of the KEY_FIELDS to pandas dataframes.
+            info: dictionary mapping the same keys to dictionaries with the 'url', 'table_id' and 'scraped_at' time of
+                each dataframe.
+            version: name of the version to add the dataframes to.
+
+        Returns:
+            The name of the version.
+
+        """
+        self._log.debug("'append' method called.")
+
+        with self._lock:
+            os.makedirs(os.path.join(self.directory, version), exist_ok=True)
+            try:
+                with open(os.path.join(self.directory, version, 'manifest.json'), 'r') as f:
+                    entries = {self._key(entry=entry): entry for entry in json.load(f)['frames']}
+            except OSError:
+                entries = dict()
+
+            for entry in self._write_frames(version=version, frames=frames, info=info):
+                entries[self._key(entry=entry)] = entry
+            self._write_manifest(version=version, entries=list(entries.values()))
+
+            if version == self.version:
+                self._manifest = None
+
+        return version
+
+    def _write_frames(self, version: str, frames: dict, info: dict) -> list:
+        """Writes each dataframe to an uncompressed Feather file in the version directory and returns their entries."""
+        entries = []
+        for key, df in frames.items():
+            entry = dict(zip(self.KEY_FIELDS, key))
+            entry['file'] = '-'.join('all' if value is None else str(value) for value in key) + '.feather'
+            df.rename_axis(index=self._index_columns(nlevels=df.index.nlevels)).reset_index().to_feather(
+                os.path.join(self.directory, version, entry['file']), compression='uncompressed')
+            entries.append(dict(entry, rows=len(df), index_names=list(df.index.names), **info.get(key, dict())))
+        return entries
+
+    def _index_columns(self, nlevels: int) -> list:
+        """Returns the names of the columns the levels of an index are written to."""
+        if nlevels == 1:
+            return [self.INDEX_COLUMN]
+        return [f"{self.INDEX_COLUMN}{level}" for level in range(nlevels)]
+
+    def _write_manifest(self, version: str, entries: list):
+        """Writes the manifest of a version, then makes the version the latest version."""
+        manifest = {'version': version, 'created_at': time.time(), 'frames': entries}
+        write_atomic(os.path.join(self.directory, version, 'manifest.json'), json.dumps(manifest, indent=2))
+        write_atomic(os.path.join(self.directory, 'LATEST'), version)
+
+    def _key(self, entry: dict) -> tuple:
+        """Returns the key of the dataframe described by a manifest entry."""
+        return tuple(entry[field] for field in self.KEY_FIELDS)
@@ -0,0 +1,54 @@
+"""Module contains html pages and responses laid out like those of https://fbref.com/en/, shared by the tests."""
+
+from unittest import mock
+
+from modules.scraper import FbRefScraper
+
+
+def _squad_table(table_id, prefix=''):
+    """Builds a html table laid out like an FbRef squad summaries table."""
+    rows = [('18bb7c10', 'Arsenal', '28', '1,234'), ('8602292d', 'Aston Villa', '27', '')]
+    html = f'<table id="{table_id}"><thead><tr><th class="over_header center">Playing Time</th></tr>' \
+           f'<tr><th class=" poptip sort_default_asc center" data-stat="squad">Squad</th></tr></thead><tbody>'
+    for code, squad, players_used, minutes in rows:
+        html += f'<tr><th scope="row" class="left " data-stat="squad">' \
+                f'<a href="/en/squads/{code}/{squad}-Stats">{prefix}{squad}</a></th>' \
+                f'<td class="right " data-stat="players_used">{players_used}</td>' \
+                f'<td class="right " data-stat="minutes">{minutes}</td></tr>'
+    return html + '</tbody></table>'
+
+
+def _player_table(table_id):
+    """Builds a html table laid out like an FbRef player summaries table."""
+    rows = [('1', '774cf58b', 'Max Aarons', 'DF', 'Norwich City', '21-364', '2,880'),
+            ('2', 'eaeca114', 'Nathan Aké', 'DF', 'Manchester City', '26-321', '1,012')]
+    html = f'<table id="{table_id}"><thead><tr><th class=" poptip center" data-stat="ranker">Rk</th></tr></thead>' \
+           f'<tbody>'
+    for rank, code, player, position, squad, age, minutes in rows:
+        html += f'<tr><th scope="row" class="right " data-stat="ranker">{rank}</th>' \
+                f'<td class="left " data-stat="player"><a href="/en/players/{code}/{player}">{player}</a></td>' \
+                f'<td class="center " data-stat="position">{position}</td>' \
+                f'<td class="left " data-stat="squad"><a href="/en/squads/x/{squad}-Stats">{squad}</a></td>' \
+                f'<td class="center " data-stat="age">{age}</td>' \
+                f'<td class="right " data-stat="minutes">{minutes}</td>' \
+                f'<td class="left group_start" data-stat="matches"><a href="/en/players/{code}/matchlogs">' \
+                f'Matches</a></td></tr>'
+    return html + '</tbody></table>'
+
+
+def _page(stat='stats'):
+    """Builds a html page laid out like an FbRef summaries page, hiding some tables inside comments."""
+    name = FbRefScraper.SUMMARY_STAT_OPTS[stat]
+    return f'<html><body><div>{_squad_table(f"stats_squads_{name}_for")}</div>' \
+           f'<div><!--\n{_squad_table(f"stats_squads_{name}_against", prefix="vs ")}\n--></div>' \
+           f'<div><!--\n{_player_table(f"stats_{name}")}\n--></div></body></html>'
+
+
+def _response(text, status_code=200, headers=None):
+    """Builds a mock response object for the given html text."""
+    response = mock.Mock()
+    response.text = text
+    response.content = text.encode('utf-8')
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
@@ -0,0 +1,163 @@
+import unittest
+import logging
+
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from modules.analysis import CorrelationEngine, PlayerSimilarity, ProjectionEngine
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page, _response
+
+
+class TestCorrelationEngine(unittest.TestCase):
+    """"""
+
+    def test_correlate_matches_pandas(self):
+        """"""
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(200, 6)) * [1, 10, 100, 1000, 1, 1] + [0, 0, 0, 3000, 0, 5]
+        values[:, 1] += values[:, 0] * 5
+        values[rng.random(values.shape) < 0.2] = np.nan
+        values[:, 5] = 5
+        values[3:, 4] = np.nan
+
+        r, counts = CorrelationEngine.correlate(values=values, min_periods=3)
+        expected = pd.DataFrame(values).corr(method='pearson', min_periods=3).to_numpy()
+        np.testing.assert_allclose(expected, r, atol=1e-12)
+        self.assertEqual(int((~np.isnan(values[:, 0]) & ~np.isnan(values[:, 1])).sum()), counts[0, 1])
+
+    def test_spearman_matches_pandas(self):
+        """"""
+        rng = np.random.default_rng(0)
+        values = np.round(rng.normal(size=(200, 8)) * 3)
+        values[:, 1] += values[:, 0] ** 3
+        values[:120, 2:4] = np.nan
+        values[80:, 4:6] = np.nan
+        values[rng.random(values.shape) < 0.05] = np.nan
+        values[:, 6] = 5
+        values[3:, 7] = np.nan
+
+        # Each pair is ranked over the rows both columns share, as pandas does
+        r, counts = CorrelationEngine.spearman(values=values, min_periods=3)
+        expected = pd.DataFrame(values).corr(method='spearman', min_periods=3).to_numpy()
+        np.testing.assert_allclose(expected, r, atol=1e-12)
+        np.testing.assert_array_equal(CorrelationEngine.correlate(values=values)[1], counts)
+
+    def test_top_k_cached_per_generation(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+        engine = CorrelationEngine(scraper=scraper, min_periods=2)
+
+        with mock.patch.object(scraper._session, 'get',
+                               side_effect=lambda url, **kwargs: _response(_page(stat=url.split('/')[-2]))):
+            top = engine.top_k(k=3, table='player', method='spearman')
+
+        # Age and minutes are the only numeric metrics, shared by every category, and rank the players in reverse
+        self.assertEqual([('age', 'minutes', -1.0, 2)], list(top.itertuples(index=False, name=None)))
+
+        with mock.patch.object(scraper, 'get_wide_player_summaries') as wide:
+            self.assertIs(engine.matrix(table='player', method='spearman'),
+                          engine.matrix(table='player', method='spearman'))
+        wide.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            engine.matrix(method='kendall')
+
+
+class TestPlayerSimilarity(unittest.TestCase):
+    """"""
+
+    def test_similar_players(self):
+        """"""
+        index = pd.MultiIndex.from_tuples([('a', 'Arsenal'), ('b', 'Burnley'), ('c', 'Chelsea'), ('d', 'Derby'),
+                                           ('e', 'Everton'), ('f', 'Everton')], names=['code', 'squad'])
+        df = pd.DataFrame(data={'player': ['A', 'B', 'C', 'D', 'E', 'A'],
+                                'position': ['FW', 'FW', 'DF', 'FW,MF', 'FW', 'MF'],
+                                'minutes': [900, 1800, 900, 450, 90, 900],
+                                'minutes_90s': [10.0, 20.0, 10.0, 5.0, 1.0, 0.5],
+                                'stats.goals': [5, 10, 0, 2, 1, 3],
+                                'shooting.goals': [5, 10, 0, 2, 1, 3],
+                                'passing.passes_pct': [70.0, 71.0, 90.0, 75.0, 60.0, np.nan]}, index=index)
+
+        scraper = FbRefScraper(level=logging.WARNING)
+        similarity = PlayerSimilarity(scraper=scraper)
+        with mock.patch.object(scraper, 'get_wide_player_summaries', return_value=df) as wide:
+            # Goals are compared per 90 minutes, so B scores at the same rate as A
+            similar = similarity.similar(player=('a', 'Arsenal'), k=2)
+            self.assertEqual([('b', 'Burnley'), ('d', 'Derby')], list(similar.index))
+            self.assertEqual(['B', 'D'], list(similar['player']))
+            self.assertEqual([('d', 'Derby')],
+                             list(similarity.similar(player='a', k=1, min_minutes=300, position='MF').index))
+
+            # The other player named A played too little to be indexed, so the name A is unique
+            self.assertEqual(4, len(similarity.similar(player='A', k=10)))
+            self.assertEqual(['stats.goals', 'shooting.goals', 'passing.passes_pct'],
+                             list(similarity.features().columns))
+            with self.assertRaises(ValueError):
+                similarity.similar(player=('f', 'Everton'))
+        wide.assert_called_once()
+
+    def test_rate_metrics_not_scaled(self):
+        """"""
+        index = pd.MultiIndex.from_tuples([('a', 'Arsenal'), ('b', 'Burnley'), ('c', 'Chelsea')],
+                                          names=['code', 'squad'])
+        df = pd.DataFrame(data={'player': ['A', 'B', 'C'],
+                                'position': ['FW', 'FW', 'DF'],
+                                'minutes': [900, 1800, 450],
+                                'minutes_90s': [10.0, 20.0, 5.0],
+                                'shooting.goals': [10, 10, 10],
+                                'shooting.average_shot_distance': [15.0, 18.0, 21.0],
+                                'passing.passes_avg_len': [20.0, 25.0, 30.0]}, index=index)
+
+        scraper = FbRefScraper(level=logging.WARNING)
+        similarity = PlayerSimilarity(scraper=scraper)
+        with mock.patch.object(scraper, 'get_wide_player_summaries', return_value=df):
+            features = similarity.features()
+
+        # Counts are divided by the 90 minutes played, averages are kept as they are
+        expected = (np.array([1.0, 0.5, 2.0]) - 7 / 6) / np.std([1.0, 0.5, 2.0])
+        np.testing.assert_allclose(expected, features['shooting.goals'])
+        np.testing.assert_allclose([-1.2247449, 0.0, 1.2247449], features['shooting.average_shot_distance'])
+        np.testing.assert_allclose([-1.2247449, 0.0, 1.2247449], features['passing.passes_avg_len'])
+
+
+class TestProjectionEngine(unittest.TestCase):
+    """"""
+
+    def test_project_cached_per_selection(self):
+        """"""
+        rng = np.random.default_rng(0)
+        players_used = rng.normal(size=20)
+
+        def summaries(stat, **kwargs):
+            if stat not in ('stats', 'shooting', 'passing'):
+                raise ValueError(f"No tables found for '{stat}'.")
+            return pd.DataFrame(data={'players_used': players_used, stat: rng.normal(size=20), 'position': 'FW'},
+                                index=[f"Squad {i}" for i in range(20)])
+
+        # Only the selected categories are recalled, so a failing category does not break a projection
+        scraper = FbRefScraper(level=logging.WARNING)
+        projector = ProjectionEngine(scraper=scraper)
+        with mock.patch.object(scraper, 'get_squad_summaries', side_effect=summaries) as recall:
+            projection = projector.project(table='squad', stats=['stats', 'shooting'], seasons=['2020-2021', None])
+            self.assertIs(projection, projector.project(table='squad', stats=['shooting', 'stats'],
+                                                        seasons=['2020-2021', None]))
+            self.assertEqual({'stats', 'shooting'}, {call.kwargs['stat'] for call in recall.call_args_list})
+            self.assertEqual(4, recall.call_count)
+            projector.project(table='squad', stats=['stats', 'passing'], seasons=['2020-2021', None])
+            self.assertEqual(8, recall.call_count)
+            with self.assertRaises(ValueError):
+                projector.project(table='squad', stats=['stats', 'keeprsadv'])
+
+        self.assertEqual((40, 2), projection.shape)
+        self.assertEqual(('2020-2021', 'Squad 0'), projection.index[0])
+        self.assertEqual(2, len(projection.attrs['explained_variance_ratio']))
+        self.assertGreater(sum(projection.attrs['explained_variance_ratio']), 2 / 3)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import logging
+
+from unittest import mock
+
+import pandas as pd
+
+from modules.application import FbRefApplication, MenuControlFrame
+from modules.instrumentation import Instrumentation
+from modules.scheduler import IdleScheduler
+
+
+def _application():
+    """Builds a FbRefApplication without its tkinter widgets, which require a display."""
+    app = FbRefApplication.__new__(FbRefApplication)
+    app._log = logging.getLogger("SquadAnalysisGui")
+    app._instrumentation = Instrumentation(level=logging.WARNING)
+    app._loader = mock.Mock()
+    app._root = mock.Mock()
+    app._status = mock.Mock()
+    app._renderer = mock.Mock()
+    app._scheduler = IdleScheduler(after_idle=mock.Mock(), callback=mock.Mock(), level=logging.WARNING)
+    for name in ('_frame_data_x', '_frame_data_y'):
+        frame = mock.Mock()
+        frame.vs_menu.winfo_children.return_value = []
+        frame.metric_menu = _menu(values=['players_used', 'minutes'], trace=app._scheduler.request)
+        setattr(app, name, frame)
+    return app
+
+
+def _menu(values, trace):
+    """Builds a MenuControlFrame without its tkinter widgets, whose variable calls trace whenever it is set."""
+    menu = MenuControlFrame.__new__(MenuControlFrame)
+    menu._log = logging.getLogger("DataControlFrame")
+    menu.values = values
+    menu.variable = mock.Mock()
+    menu.variable.set.side_effect = lambda value: trace('PY_VAR0', '', 'w')
+    menu.menu = mock.MagicMock()
+    return menu
+
+
+class TestFbRefApplication(unittest.TestCase):
+    """"""
+
+    def test_poll_failed_load(self):
+        """"""
+        app = _application()
+
+        # A failed load has no duration, and the next poll is scheduled even if applying data raises
+        app._loader.poll.return_value = (1, None, ValueError('404'), None)
+        app._poll()
+        app._root.after.assert_called_once_with(FbRefApplication.POLL_INTERVAL, app._poll)
+        self.assertEqual({'load_errors': 1}, app._instrumentation.stats()['counters'])
+
+        app._loader.poll.return_value = (2, dict(), None, 0.01)
+        with mock.patch.object(app, '_apply', side_effect=KeyError('x')):
+            with self.assertRaises(KeyError):
+                app._poll()
+        self.assertEqual(2, app._root.after.call_count)
+        self.assertEqual(1, app._instrumentation.stats()['stages']['load']['calls'])
+
+    def test_load_falls_back_to_numeric_metric(self):
+        """"""
+        app = _application()
+        app._scraper = mock.Mock()
+        app._metrics = mock.Mock()
+        app._metrics.pair.return_value = ([1.0], [2.0], None)
+        app._scraper.get_player_summaries.return_value = pd.DataFrame(
+            data={'player': ['Max Aarons'], 'position': ['DF'], 'age': [21.99], 'minutes': [2880]},
+            index=pd.MultiIndex.from_tuples([('774cf58b', 'Norwich City')], names=['code', 'squad']))
+
+        # A squad metric missing from the player table falls back to the first numeric metric, not the player names
+        data = app._load(selection={'table': 'player', 'projection': False,
+                                    'x': ('stats', 'for', 'players_used'), 'y': ('stats', 'for', 'minutes')})
+        self.assertEqual({'x': 'age', 'y': 'minutes'}, data['metric'])
+        app._metrics.pair.assert_called_once_with(x_key=('player', 'stats', 'for', 'age'),
+                                                  y_key=('player', 'stats', 'for', 'minutes'))
+
+    def test_apply_category_change(self):
+        """"""
+        app = _application()
+        app._loader.pending = False
+
+        # Updating the metric menus of a new category selects the metrics plotted, without requesting another load
+        data = {'table': 'squad', 'x': [1.0], 'y': [2.0], 'title': 'title',
+                'columns': {'x': ['goals', 'minutes'], 'y': ['players_used', 'minutes']},
+                'metric': {'x': 'minutes', 'y': 'players_used'},
+                'label': {'x': 'minutes', 'y': 'players_used'}}
+        app._apply(data=data, seconds=0.01)
+        app._frame_data_x.metric_menu.variable.set.assert_called_once_with('minutes')
+        app._frame_data_y.metric_menu.variable.set.assert_not_called()
+        self.assertEqual(['goals', 'minutes'], app._frame_data_x.metric_menu.values)
+        app._scheduler._after_idle.assert_not_called()
+        self.assertEqual({'requests': 1, 'runs': 0, 'suppressed': 1}, app._scheduler.stats())
+        app._renderer.draw.assert_called_once_with(x=[1.0], y=[2.0], title='title', xlabel='minutes',
+                                                   ylabel='players_used')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
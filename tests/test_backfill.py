@@ -0,0 +1,59 @@
+import os
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+from modules.backfill import BackfillRunner
+from modules.scraper import FbRefScraper
+from modules.snapshot import SnapshotStore
+
+from fbref_pages import _page, _response
+
+
+class TestBackfillRunner(unittest.TestCase):
+    """"""
+
+    def test_run_resumes_failed_jobs(self):
+        """"""
+        with tempfile.TemporaryDirectory() as directory:
+            queue_path = os.path.join(directory, 'queue.sqlite')
+            snapshot_dir = os.path.join(directory, 'snapshot')
+            broken = {'https://fbref.com/en/comps/9/2019-2020/shooting/2019-2020-Premier-League-Stats'}
+
+            def get(url, **kwargs):
+                if url in broken:
+                    return _response('<html></html>')
+                return _response(_page(stat=url.split('/')[-2]))
+
+            scraper = FbRefScraper(level=logging.WARNING)
+            runner = BackfillRunner(scraper=scraper, queue_path=queue_path, snapshot_dir=snapshot_dir)
+            self.assertEqual(4, runner.add_jobs(comps=[9], seasons=['2019-2020', '2020-2021'],
+                                                stats=['stats', 'shooting']))
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as first:
+                self.assertEqual({'done': 3, 'failed': 1}, runner.run())
+            runner.close()
+
+            # A new runner on the same queue only retries the job which failed
+            broken.clear()
+            scraper = FbRefScraper(level=logging.WARNING)
+            runner = BackfillRunner(scraper=scraper, queue_path=queue_path, snapshot_dir=snapshot_dir)
+            self.assertEqual(0, runner.add_jobs(comps=[9], seasons=['2019-2020'], stats=['stats', 'shooting']))
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as second:
+                self.assertEqual({'done': 4}, runner.run())
+            runner.close()
+
+            self.assertEqual(4, first.call_count)
+            self.assertEqual(1, second.call_count)
+            self.assertEqual(0, len(scraper._summaries))
+
+            store = SnapshotStore(directory=snapshot_dir)
+            self.assertEqual(12, len(store.manifest()))
+            df = store.load(key=('squad', 9, '2019-2020', 'shooting', 'against'))
+            self.assertEqual(['Arsenal', 'Aston Villa'], list(df.index))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
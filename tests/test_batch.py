@@ -0,0 +1,61 @@
+import os
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+from modules.batch import BatchRenderer
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page, _response
+
+
+class TestBatchRenderer(unittest.TestCase):
+    """"""
+
+    def test_render_all_pairs(self):
+        """"""
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_dir = os.path.join(directory, 'snapshot')
+            out_dir = os.path.join(directory, 'plots')
+
+            scraper = FbRefScraper(level=logging.WARNING)
+            with mock.patch.object(scraper._session, 'get',
+                                   side_effect=lambda url, **kwargs: _response(_page(stat=url.split('/')[-2]))):
+                for stat in ('stats', 'shooting'):
+                    scraper.prefetch_all(stats=[stat])
+            scraper.save_snapshot(directory=snapshot_dir)
+
+            renderer = BatchRenderer(snapshot_dir=snapshot_dir, out_dir=out_dir, processes=2, fmt='svg')
+            pairs = renderer.all_pairs()
+            self.assertEqual([(('stats', 'for', 'players_used'), ('stats', 'for', 'minutes'))], pairs)
+
+            pairs.append((('shooting', 'for', 'minutes'), ('stats', 'for', 'unknown')))
+            report = renderer.render(pairs=pairs)
+            self.assertEqual(1, report['plots'])
+            self.assertEqual([pairs[1]], list(report['failed']))
+            self.assertGreater(report['plots_per_second'], 0)
+            self.assertEqual(['squad__stats-for-players_used__stats-for-minutes.svg'], os.listdir(out_dir))
+
+            renderer = BatchRenderer(snapshot_dir=snapshot_dir, out_dir=out_dir, table='player', processes=1)
+            report = renderer.render(pairs=[(('stats', None, 'age'), ('shooting', None, 'minutes'))])
+            self.assertEqual(1, report['plots'])
+            self.assertIn('player__stats-age__shooting-minutes.png', os.listdir(out_dir))
+
+            # An image does not depend on the plots its worker rendered before
+            path = os.path.join(out_dir, 'player__stats-age__shooting-minutes.png')
+            with open(path, 'rb') as f:
+                alone = f.read()
+            renderer.render(pairs=[(('stats', None, 'minutes'), ('stats', None, 'age')),
+                                   (('stats', None, 'age'), ('shooting', None, 'minutes'))])
+            with open(path, 'rb') as f:
+                self.assertEqual(alone, f.read())
+
+        with self.assertRaises(ValueError):
+            BatchRenderer(snapshot_dir=snapshot_dir, out_dir=out_dir, fmt='jpg')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import time
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+from modules.crawler import PlayerPageCrawler, TokenBucket
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _player_table, _response
+
+
+class TestPlayerPageCrawler(unittest.TestCase):
+    """"""
+
+    def test_crawl_resumes_and_stores_tables(self):
+        """"""
+        page = f"<html><body>{_player_table('stats_standard_dom_lg')}<table id='other'></table></body></html>"
+        broken = {'https://fbref.com/en/players/eaeca114/'}
+        limited = {'https://fbref.com/en/players/eaeca114/'}
+
+        def get(url, **kwargs):
+            if url in broken:
+                return _response('', status_code=404)
+            if url in limited:
+                return _response('<html><body><p>Rate limited.</p><table id="other"></table></body></html>')
+            return _response(page)
+
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = FbRefScraper(level=logging.WARNING)
+            crawler = PlayerPageCrawler(scraper=scraper, store_dir=directory, rate=1000, burst=10)
+            codes = {'Bukayo Saka': '774cf58b', 'Ollie Watkins': 'eaeca114'}
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as first:
+                report = crawler.crawl(codes=codes)
+            self.assertEqual(1, report['crawled'])
+            self.assertEqual(['eaeca114'], list(report['failed']))
+            self.assertEqual(['774cf58b'], crawler.completed())
+            self.assertEqual(['stats_standard_dom_lg'], list(crawler.load(code='774cf58b')))
+            self.assertIsNone(crawler.load(code='eaeca114'))
+            self.assertEqual(0, len(scraper._pages))
+
+            # A page without the stored tables, such as a rate limit page, is not stored as a completed player
+            broken.clear()
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as second:
+                report = crawler.crawl(codes=iter(codes.values()))
+            self.assertEqual((0, 1, ['eaeca114']), (report['crawled'], report['skipped'], list(report['failed'])))
+            self.assertEqual(['774cf58b'], crawler.completed())
+
+            # A further crawl only requests the player which failed
+            limited.clear()
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as third:
+                report = crawler.crawl(codes=codes)
+            self.assertEqual((1, 1, {}), (report['crawled'], report['skipped'], report['failed']))
+            self.assertEqual(2, first.call_count)
+            self.assertEqual(1, second.call_count)
+            self.assertEqual(1, third.call_count)
+            self.assertEqual(['774cf58b.pkl', 'eaeca114.pkl'], sorted(os.listdir(directory)))
+
+    def test_token_bucket_limits_rate(self):
+        """"""
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 * 0.9)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
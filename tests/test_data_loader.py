@@ -0,0 +1,57 @@
+import time
+import unittest
+import logging
+import threading
+
+from modules.data_loader import DataLoader
+
+
+def _wait(loader, timeout=5):
+    """Polls the loader until the latest request completes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        loaded = loader.poll()
+        if loaded is not None:
+            return loaded
+        time.sleep(0.005)
+    raise TimeoutError()
+
+
+class TestDataLoader(unittest.TestCase):
+    """"""
+
+    def test_poll_discards_stale_results(self):
+        """"""
+        loader = DataLoader(max_workers=2, level=logging.WARNING)
+        release = threading.Event()
+
+        # The first request is still running when the selection changes
+        first = loader.submit(lambda: release.wait(5) and 'first')
+        self.assertIsNone(loader.poll())
+        self.assertTrue(loader.pending)
+        second = loader.submit(lambda value: value, 'second')
+        generation, result, error, seconds = _wait(loader)
+        self.assertEqual((second, 'second', None), (generation, result, error))
+        self.assertGreaterEqual(seconds, 0)
+        self.assertFalse(loader.pending)
+
+        release.set()
+        time.sleep(0.05)
+        self.assertIsNone(loader.poll())
+        self.assertEqual((2, 1), (second, loader.stale))
+        self.assertEqual(1, first)
+        loader.shutdown()
+
+    def test_poll_returns_errors(self):
+        """"""
+        loader = DataLoader(level=logging.WARNING)
+        loader.submit(lambda: 1 / 0)
+        generation, result, error, seconds = _wait(loader)
+        self.assertIsInstance(error, ZeroDivisionError)
+        self.assertIsNone(result)
+        loader.shutdown()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
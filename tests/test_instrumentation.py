@@ -0,0 +1,85 @@
+import os
+import json
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+from modules.instrumentation import Instrumentation, JsonLinesExporter, PrometheusExporter
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page, _response
+
+
+class TestInstrumentation(unittest.TestCase):
+    """"""
+
+    def test_scraper_stages_and_counters(self):
+        """"""
+        events = []
+        instrumentation = Instrumentation(hooks=[events.append], level=logging.WARNING)
+        scraper = FbRefScraper(level=logging.WARNING, instrumentation=instrumentation)
+
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+            scraper.get_squad_summaries(stat='stats', vs='for')
+            scraper.get_squad_summaries(stat='stats', vs='for')
+            scraper.get_player_summaries(stat='stats')
+
+        stats = scraper.instrumentation_stats()
+        self.assertEqual({'request', 'parse_document', 'find_tables', 'parse_comments', 'process'},
+                         set(stats['stages']))
+        self.assertEqual(1, stats['stages']['request']['calls'])
+        self.assertEqual(2, stats['stages']['parse_comments']['calls'])
+        self.assertEqual(2, stats['stages']['process']['calls'])
+        self.assertEqual({'bytes_downloaded': len(_page().encode('utf-8')),
+                          'frame_cache_hits': 1,
+                          'frame_cache_misses': 2,
+                          'page_cache_hits': 3,
+                          'page_cache_misses': 1,
+                          'rows_parsed': 4,
+                          'cells_parsed': 2 * 3 + 2 * 6}, stats['counters'])
+        self.assertEqual(sum(stage['calls'] for stage in stats['stages'].values()) + 12, len(events))
+        self.assertEqual({'time': events[0]['time'], 'kind': 'counter', 'name': 'frame_cache_misses', 'value': 1},
+                         events[0])
+        self.assertEqual({'time', 'kind', 'name', 'seconds'}, set(events[2]))
+
+        # A disabled instance records nothing
+        scraper = FbRefScraper(level=logging.WARNING)
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+            scraper.get_squad_summaries(stat='stats', vs='for')
+        self.assertEqual(dict(), scraper.instrumentation_stats())
+
+    def test_exporters(self):
+        """"""
+        with tempfile.TemporaryDirectory() as directory:
+            instrumentation = Instrumentation(level=logging.WARNING)
+            jsonl = JsonLinesExporter(path=os.path.join(directory, 'events.jsonl'))
+            prometheus = PrometheusExporter(path=os.path.join(directory, 'fbref.prom'),
+                                            instrumentation=instrumentation, interval=3600)
+            instrumentation.add_hook(jsonl)
+            instrumentation.add_hook(prometheus)
+
+            instrumentation.record('request', 0.5)
+            instrumentation.record('request', 1.5)
+            instrumentation.count('bytes_downloaded', 1024)
+            jsonl.close()
+            prometheus.write()
+
+            with open(jsonl.path, 'r') as f:
+                events = [json.loads(line) for line in f]
+            self.assertEqual(['request', 'request', 'bytes_downloaded'], [event['name'] for event in events])
+            self.assertEqual(1024, events[2]['value'])
+
+            with open(prometheus.path, 'r') as f:
+                lines = f.read().splitlines()
+            self.assertIn('fbref_stage_calls_total{stage="request"} 2', lines)
+            self.assertIn('fbref_stage_seconds_total{stage="request"} 2.0', lines)
+            self.assertIn('fbref_stage_seconds_max{stage="request"} 1.5', lines)
+            self.assertIn('fbref_bytes_downloaded_total 1024', lines)
+            self.assertIn('# TYPE fbref_stage_seconds_max gauge', lines)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
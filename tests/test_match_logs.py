@@ -0,0 +1,87 @@
+import os
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+from modules.match_logs import MatchLogStore
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page, _response
+
+
+def _match_log_page(matches):
+    """Builds a html page laid out like an FbRef squad scores and fixtures page."""
+    html = '<html><body><table id="matchlogs_for"><thead><tr><th class=" poptip sort_default_asc center" ' \
+           'data-stat="date">Date</th></tr></thead><tbody>'
+    for date, result, goals_for, goals_against, opponent in matches:
+        html += f'<tr><th scope="row" class="left " data-stat="date"><a href="/en/matches/x">{date}</a></th>' \
+                f'<td class="left " data-stat="comp">Premier League</td>' \
+                f'<td class="center " data-stat="result">{result}</td>' \
+                f'<td class="right " data-stat="goals_for">{goals_for}</td>' \
+                f'<td class="right " data-stat="goals_against">{goals_against}</td>' \
+                f'<td class="left " data-stat="opponent">{opponent}</td></tr>'
+    return html + '</tbody></table></body></html>'
+
+
+class TestMatchLogStore(unittest.TestCase):
+    """"""
+
+    def test_update_appends_new_matches(self):
+        """"""
+        matches = [('2021-08-13', 'L', '0', '2', 'Brentford'),
+                   ('2021-08-22', 'L', '0', '2', 'Chelsea'),
+                   ('2021-08-28', '', '', '', 'Manchester City')]
+
+        def get(url, **kwargs):
+            if '/squads/' in url:
+                return _response(_match_log_page(matches))
+            return _response(_page(stat='stats'))
+
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = FbRefScraper(level=logging.WARNING)
+            store = MatchLogStore(path=os.path.join(directory, 'matches.sqlite'))
+            with mock.patch.object(scraper._session, 'get', side_effect=get) as first:
+                self.assertEqual({'Arsenal': 2, 'Aston Villa': 2}, store.update(scraper=scraper))
+            self.assertIn('https://fbref.com/en/squads/18bb7c10/matchlogs/c9/schedule/',
+                          [call.args[0] for call in first.call_args_list])
+
+            # The fixture is played and a new fixture is scheduled
+            matches[2] = ('2021-08-28', 'L', '0', '5', 'Manchester City')
+            matches.append(('2021-09-11', '', '', '', 'Norwich City'))
+            with mock.patch.object(scraper._session, 'get', side_effect=get):
+                self.assertEqual({'Arsenal': 1, 'Aston Villa': 1}, store.update(scraper=scraper))
+
+            df = store.query(squad='Arsenal', start='2021-08-20')
+            self.assertEqual([('Arsenal', '2021-08-22'), ('Arsenal', '2021-08-28')], list(df.index))
+            self.assertEqual([2, 5], list(df['goals_against']))
+            self.assertEqual(6, len(store.query()))
+            self.assertEqual('2021-08-28', store.latest(squad='Aston Villa'))
+            store.close()
+
+    def test_append_unplayed_log(self):
+        """"""
+        matches = [('2021-08-13', '', '', '', 'Brentford'), ('2021-08-22', '', '', '', 'Chelsea')]
+
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = FbRefScraper(level=logging.WARNING)
+            store = MatchLogStore(path=os.path.join(directory, 'matches.sqlite'))
+
+            # No fixture has been played, so the blank result column is converted to missing values
+            with mock.patch.object(scraper._session, 'get', return_value=_response(_match_log_page(matches))):
+                df = scraper.scrape_match_logs(code='18bb7c10')
+            self.assertEqual(0, store.append(squad='Arsenal', df=df))
+            self.assertIsNone(store.latest(squad='Arsenal'))
+
+            matches[0] = ('2021-08-13', 'L', '0', '2', 'Brentford')
+            with mock.patch.object(scraper._session, 'get', return_value=_response(_match_log_page(matches))):
+                df = scraper.scrape_match_logs(code='18bb7c10')
+            self.assertEqual(1, store.append(squad='Arsenal', df=df))
+            self.assertEqual('2021-08-13', store.latest(squad='Arsenal'))
+            store.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
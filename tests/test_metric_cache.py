@@ -0,0 +1,85 @@
+import unittest
+import logging
+
+from unittest import mock
+
+import numpy as np
+import requests
+
+from modules.metric_cache import MetricCache
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page, _response
+
+
+class TestMetricCache(unittest.TestCase):
+    """"""
+
+    def test_pair_uses_memoised_arrays(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+        metrics = MetricCache(scraper=scraper)
+
+        def get(url, **kwargs):
+            return _response(_page(stat=url.split('/')[-2]))
+
+        with mock.patch.object(scraper._session, 'get', side_effect=get):
+            x, y, index = metrics.pair(x_key=('squad', 'stats', 'for', 'players_used'),
+                                       y_key=('squad', 'shooting', 'against', 'minutes'))
+
+        # Aston Villa has a blank number of minutes, so only Arsenal is plotted
+        self.assertEqual(['Arsenal'], list(index))
+        self.assertEqual([28.0], list(x))
+        self.assertEqual([1234.0], list(y))
+
+        # Further lookups neither scrape nor touch the summaries dataframes, and the arrays cannot be modified
+        with mock.patch.object(scraper, 'get_squad_summaries') as summaries:
+            values = metrics.get(table='squad', stat='stats', vs='for', metric='players_used')
+        summaries.assert_not_called()
+        self.assertIs(values, metrics.get(table='squad', stat='stats', vs='for', metric='players_used'))
+        self.assertEqual(np.float64, values.dtype)
+        self.assertFalse(values.flags.writeable)
+        self.assertEqual(1234, scraper.get_squad_summaries(stat='stats', vs='for').loc['Arsenal', 'minutes'])
+
+        # The memo is cleared when refreshed data replaces a stored dataframe
+        with mock.patch.object(scraper._session, 'get', side_effect=lambda url, **kwargs: _response(
+                _page(stat=url.split('/')[-2]).replace('28', '30'))):
+            scraper.refresh()
+        self.assertEqual([30.0, 27.0], list(metrics.get(table='squad', stat='stats', vs='for', metric='players_used')))
+
+    def test_pair_reads_plotted_categories_only(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+        metrics = MetricCache(scraper=scraper)
+
+        def get(url, **kwargs):
+            stat = url.split('/')[-2]
+            if stat == 'keeprsadv':
+                return _response('Not Found', status_code=404)
+            return _response(_page(stat=stat).replace('Aston Villa', 'Burnley') if stat == 'shooting' else _page(stat))
+
+        # A plot of a single category scrapes its page only, and a failing category does not affect other plots
+        with mock.patch.object(scraper._session, 'get', side_effect=get) as session_get:
+            x, y, index = metrics.pair(x_key=('squad', 'stats', 'for', 'players_used'),
+                                       y_key=('squad', 'stats', 'against', 'players_used'))
+            self.assertEqual(1, session_get.call_count)
+            self.assertEqual(['Arsenal', 'Aston Villa'], list(index))
+
+            with self.assertRaises(requests.HTTPError):
+                metrics.pair(x_key=('squad', 'stats', 'for', 'players_used'),
+                             y_key=('squad', 'keeprsadv', 'for', 'minutes'))
+
+            # Labels of a further category are appended to the shared index, and earlier arrays are padded with NaN
+            x, y, index = metrics.pair(x_key=('squad', 'stats', 'for', 'players_used'),
+                                       y_key=('squad', 'shooting', 'for', 'players_used'))
+        self.assertEqual(['Arsenal'], list(index))
+        self.assertEqual(['Arsenal', 'Aston Villa', 'Burnley'], list(metrics.index(table='squad')))
+        np.testing.assert_array_equal([28.0, 27.0, np.nan],
+                                      metrics.get(table='squad', stat='stats', vs='for', metric='players_used'))
+        np.testing.assert_array_equal([28.0, np.nan, 27.0],
+                                      metrics.get(table='squad', stat='shooting', vs='for', metric='players_used'))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import logging
+
+from unittest import mock
+
+import numpy as np
+
+from matplotlib.figure import Figure
+
+from modules.renderer import ScatterRenderer
+
+
+class TestScatterRenderer(unittest.TestCase):
+    """"""
+
+    def test_draw_reuses_artists(self):
+        """"""
+        fig = Figure()
+        ax = fig.add_subplot()
+        renderer = ScatterRenderer(ax=ax, level=logging.WARNING)
+
+        with mock.patch.object(fig.canvas, 'draw_idle') as draw_idle:
+            renderer.draw(x=[0, 10], y=[0, 100], title='squads', xlabel='goals', ylabel='xg')
+            scatter = ax.collections[0]
+
+            # Points inside the current limits keep the limits and the scatter collection
+            self.assertFalse(renderer.draw(x=[1, 9], y=[10, 90], title='squads', xlabel='shots', ylabel='xg'))
+            self.assertEqual([scatter], list(ax.collections))
+            np.testing.assert_array_equal([[1, 10], [9, 90]], scatter.get_offsets())
+            self.assertEqual('shots', ax.get_xlabel())
+
+            # Points outside, or filling too little of, the limits rescale them
+            self.assertTrue(renderer.draw(x=[0, 20], y=[10, 90]))
+            self.assertEqual((-1, 21), ax.get_xlim())
+            self.assertTrue(renderer.draw(x=[0, 1], y=[10, 90]))
+            self.assertEqual((-0.05, 1.05), ax.get_xlim())
+
+            # A single point, and no points, are drawn without error
+            renderer.draw(x=[5], y=[5])
+            self.assertFalse(renderer.draw(x=[5], y=[5]))
+            self.assertFalse(renderer.draw(x=[], y=[]))
+
+        self.assertEqual(7, draw_idle.call_count)
+        self.assertEqual((7, 3), (renderer.draws, renderer.rescales))
+
+    def test_fit_limits_every_draw(self):
+        """"""
+        fig = Figure()
+        ax = fig.add_subplot()
+        renderer = ScatterRenderer(ax=ax, fit=True, level=logging.WARNING)
+
+        # The limits only depend on the points drawn, not on the previous draws
+        renderer.draw(x=[0, 20], y=[0, 100])
+        self.assertTrue(renderer.draw(x=[0, 10], y=[0, 100]))
+        self.assertEqual((-0.5, 10.5), ax.get_xlim())
+        self.assertFalse(renderer.draw(x=[0, 10], y=[0, 100]))
+        renderer.draw(x=[], y=[])
+        self.assertEqual((0, 1), ax.get_xlim())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import logging
+import tempfile
+
+from unittest import mock
+
+import requests
+
+from modules.replay import ReplayAdapter
+from modules.scraper import FbRefScraper
+
+from fbref_pages import _page
+
+
+class TestReplayAdapter(unittest.TestCase):
+    """"""
+
+    def test_record_then_replay(self):
+        """"""
+        url = FbRefScraper(level=logging.WARNING)._summaries_url(stat='stats')
+
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            # Record a response sent through the wrapped adapter
+            response = requests.Response()
+            response.status_code = 200
+            response.headers['Content-Type'] = 'text/html; charset=utf-8'
+            response._content = _page().encode('utf-8')
+            transport = mock.Mock()
+            transport.send.return_value = response
+
+            scraper = FbRefScraper(level=logging.WARNING, replay_dir=fixtures_dir, replay_mode='record')
+            scraper._replay._adapter = transport
+            recorded = scraper.get_squad_summaries(stat='stats', vs='for')
+            self.assertEqual(1, transport.send.call_count)
+            self.assertEqual({'replayed': 0, 'recorded': 1, 'missing': 0}, scraper.replay_stats())
+
+            # A new instance replays the recorded page without a connection
+            scraper = FbRefScraper(level=logging.WARNING, replay_dir=fixtures_dir)
+            with mock.patch('requests.adapters.HTTPAdapter.send') as send:
+                replayed = scraper.get_squad_summaries(stat='stats', vs='for')
+                with self.assertRaises(requests.ConnectionError):
+                    scraper.scrape_match_logs(code='18bb7c10')
+            send.assert_not_called()
+            self.assertEqual({'replayed': 1, 'recorded': 0, 'missing': 1}, scraper.replay_stats())
+            self.assertEqual(1234, replayed.loc['Arsenal', 'minutes'])
+            self.assertEqual(list(recorded.columns), list(replayed.columns))
+
+        with self.assertRaises(ValueError):
+            ReplayAdapter(directory=fixtures_dir, mode='live')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
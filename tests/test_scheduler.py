@@ -0,0 +1,55 @@
+import unittest
+import logging
+
+from unittest import mock
+
+from modules.scheduler import IdleScheduler
+
+
+class TestIdleScheduler(unittest.TestCase):
+    """"""
+
+    def test_requests_coalesce_into_one_update(self):
+        """"""
+        idle = []
+        callback = mock.Mock()
+        scheduler = IdleScheduler(after_idle=idle.append, callback=callback, level=logging.WARNING)
+
+        # A radio button, a menu variable trace and a nested trace all request an update in the same cycle
+        scheduler.request()
+        scheduler.request('PY_VAR0', '', 'w')
+        scheduler.request('PY_VAR1', '', 'w')
+        self.assertEqual(1, len(idle))
+        callback.assert_not_called()
+
+        idle.pop()()
+        callback.assert_called_once_with()
+        self.assertEqual({'requests': 3, 'runs': 1, 'suppressed': 2}, scheduler.stats())
+
+        # A request made by the update itself schedules one more update
+        callback.side_effect = scheduler.request
+        scheduler.request()
+        idle.pop()()
+        self.assertEqual(1, len(idle))
+        self.assertEqual({'requests': 5, 'runs': 2, 'suppressed': 2}, scheduler.stats())
+
+    def test_paused_requests_are_suppressed(self):
+        """"""
+        idle = []
+        scheduler = IdleScheduler(after_idle=idle.append, callback=mock.Mock(), level=logging.WARNING)
+
+        # Traces fired while the view updates its own widgets do not schedule an update
+        with scheduler.paused():
+            scheduler.request('PY_VAR0', '', 'w')
+            with scheduler.paused():
+                scheduler.request('PY_VAR1', '', 'w')
+        self.assertEqual([], idle)
+        self.assertEqual({'requests': 2, 'runs': 0, 'suppressed': 2}, scheduler.stats())
+
+        scheduler.request()
+        self.assertEqual(1, len(idle))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    unittest.main()
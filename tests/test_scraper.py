@@ -1,15 +1,46 @@
+import os
 import unittest
 import logging
+import tempfile
+
+from unittest import mock
+
+import pandas as pd
+import requests
 
 from modules.scraper import FbRefScraper
+from modules.snapshot import SnapshotStore
+
+from fbref_pages import _page, _response
+
+
+# Define the directory of the recorded fbref.com pages replayed by TestFbRefScraper, and the mode it runs in, set with
+# the FBREF_REPLAY environment variable to 'replay', 'record' or 'live'. The tests check the structure of the real
+# pages, so they are skipped unless FBREF_REPLAY is set
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fbref')
+REPLAY_MODE = os.environ.get('FBREF_REPLAY')
 
 
 class TestFbRefScraper(unittest.TestCase):
     """"""
 
+    def setUp(self):
+        """"""
+        if REPLAY_MODE is None:
+            self.skipTest("Requires fbref.com pages, set FBREF_REPLAY to 'live', 'record' or 'replay' to run.")
+        if REPLAY_MODE == 'replay' and not os.path.isdir(FIXTURES_DIR):
+            self.skipTest(f"No recorded fbref.com pages in '{FIXTURES_DIR}', record them with FBREF_REPLAY=record.")
+
+    @staticmethod
+    def _scraper():
+        """Builds a scraper replaying or recording fbref.com pages, or requesting them live, as set by FBREF_REPLAY."""
+        if REPLAY_MODE == 'live':
+            return FbRefScraper(level=logging.WARNING)
+        return FbRefScraper(level=logging.WARNING, replay_dir=FIXTURES_DIR, replay_mode=REPLAY_MODE)
+
     def test_scrape_squad_codes(self):
         """"""
-        scraper = FbRefScraper(level=logging.WARNING)
+        scraper = self._scraper()
 
         expected = {'Arsenal': '18bb7c10',
                     'Aston Villa': '8602292d',
@@ -39,7 +70,7 @@ class TestFbRefScraper(unittest.TestCase):
 
     def test_scrape_player_codes(self):
         """"""
-        scraper = FbRefScraper(level=logging.WARNING)
+        scraper = self._scraper()
 
         expected = {'Max Aarons': '774cf58b',
                     'Nathan Aké': 'eaeca114',
@@ -132,20 +163,20 @@ class TestFbRefScraper(unittest.TestCase):
                          'xg_net',
                          'npxg_net']}
 
-        scraper = FbRefScraper(level=logging.WARNING)
+        scraper = self._scraper()
 
         # Check each
         for stat in expected.keys():
             for vs in ('for', 'against'):
                 self.assertEqual(expected[stat], list(scraper.scrape_squad_summaries(stat=stat, vs=vs).columns))
 
-    def test_scrape_squad_summaries(self):
+    def test_scrape_player_summaries(self):
         """"""
 
         expected = {
-            'stats': ['nationality',
+            'stats': ['player',
+                      'nationality',
                       'position',
-                      'squad',
                       'age',
                       'birth_year',
                       'games',
@@ -175,9 +206,9 @@ class TestFbRefScraper(unittest.TestCase):
                       'npxg_xa_per90',
                       'matches'],
 
-            'possession': ['nationality',
+            'possession': ['player',
+                           'nationality',
                            'position',
-                           'squad',
                            'age',
                            'birth_year',
                            'minutes_90s',
@@ -207,9 +238,9 @@ class TestFbRefScraper(unittest.TestCase):
                            'progressive_passes_received',
                            'matches'],
 
-            'shooting': ['nationality',
+            'shooting': ['player',
+                         'nationality',
                          'position',
-                         'squad',
                          'age',
                          'birth_year',
                          'minutes_90s',
@@ -232,12 +263,297 @@ class TestFbRefScraper(unittest.TestCase):
                          'npxg_net',
                          'matches']}
 
-        scraper = FbRefScraper(level=logging.WARNING)
+        scraper = self._scraper()
 
         # Check each
         for stat in expected.keys():
             self.assertEqual(expected[stat], list(scraper.scrape_player_summaries(stat=stat).columns))
 
+
+class TestFbRefScraperOffline(unittest.TestCase):
+    """"""
+
+    def test_scrape_page_requested_once(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())) as get:
+            scraper.scrape_squad_summaries(stat='stats', vs='for')
+            scraper.scrape_squad_summaries(stat='stats', vs='against')
+            scraper.scrape_player_summaries(stat='stats')
+            scraper.scrape_squad_codes()
+            scraper.scrape_player_codes()
+
+        self.assertEqual(1, get.call_count)
+
+    def test_failed_page_not_memoised(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        # Neither a failed request nor a page without tables is kept, so the next call requests the page again
+        responses = [_response('Too Many Requests', status_code=429), _response('<html></html>'), _response(_page())]
+        with mock.patch.object(scraper._session, 'get', side_effect=responses) as get:
+            with self.assertRaises(requests.HTTPError):
+                scraper.get_squad_summaries(stat='stats', vs='for')
+            with self.assertRaises(ValueError):
+                scraper.get_squad_summaries(stat='stats', vs='for')
+            self.assertEqual(1234, scraper.get_squad_summaries(stat='stats', vs='for').loc['Arsenal', 'minutes'])
+            scraper.get_player_summaries(stat='stats')
+        self.assertEqual(3, get.call_count)
+
+    def test_pages_bounded(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING, max_pages=1)
+
+        with mock.patch.object(scraper._session, 'get', side_effect=lambda url, **kwargs: _response(_page(
+                stat=url.split('/')[-2]))) as get:
+            # The page is kept until every dataframe scraped from it is stored
+            scraper.get_squad_summaries(stat='stats', vs='for')
+            scraper.get_squad_summaries(stat='stats', vs='against')
+            self.assertEqual(1, len(scraper._pages))
+            scraper.get_player_summaries(stat='stats')
+            self.assertEqual(0, len(scraper._pages))
+
+            # Beyond max_pages, the least recently used page is dropped
+            scraper.get_squad_summaries(stat='shooting', vs='for')
+            scraper.get_squad_summaries(stat='passing', vs='for')
+            self.assertEqual([scraper._summaries_url(stat='passing')], list(scraper._pages))
+        self.assertEqual(3, get.call_count)
+
+    def test_parse_tables_commented(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        tables = scraper._parse_tables(text=_page())
+
+        self.assertEqual(['stats_squads_standard_for', 'stats_squads_standard_against', 'stats_standard'],
+                         list(tables.keys()))
+        df = scraper._process_table(table=tables['stats_squads_standard_against'], index='squad',
+                                    include_row_header=True)
+        self.assertEqual(['vs Arsenal', 'vs Aston Villa'], list(df.index))
+        self.assertEqual([28.0, 27.0], list(df['players_used']))
+
+    def test_process_table_dtypes(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+        tables = scraper._parse_tables(text=_page())
+
+        squads = scraper._process_table(table=tables['stats_squads_standard_for'], index='squad',
+                                        include_row_header=True)
+        players = scraper._process_table(table=tables['stats_standard'], index='player')
+
+        self.assertEqual('int64', squads['players_used'].dtype)
+        self.assertEqual('Int64', squads['minutes'].dtype)
+        self.assertEqual(1234, squads.loc['Arsenal', 'minutes'])
+        self.assertTrue(pd.isna(squads.loc['Aston Villa', 'minutes']))
+        self.assertEqual([2880, 1012], list(players['minutes']))
+        self.assertAlmostEqual(21 + 364 / 365.25, players.loc['Max Aarons', 'age'])
+        self.assertEqual(['Matches', 'Matches'], list(players['matches']))
+
+    def test_compact_frames(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING, compact=True)
+
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+            squads = scraper.get_squad_summaries(stat='stats', vs='for')
+            players = scraper.get_player_summaries(stat='stats')
+
+        self.assertEqual('int8', squads['players_used'].dtype)
+        self.assertEqual('Int16', squads['minutes'].dtype)
+        self.assertEqual(['774cf58b', 'eaeca114'], list(players.index.get_level_values('code')))
+        self.assertEqual('category', players['position'].dtype)
+        self.assertEqual('float64', players['age'].dtype)
+        self.assertEqual([2880, 1012], list(players['minutes']))
+
+        report = scraper.memory_report()
+        self.assertEqual(['squad', 'player'], list(report.index.get_level_values('table')))
+        self.assertTrue((report['bytes_after'] <= report['bytes_before']).all())
+
+    def test_snapshot_round_trip(self):
+        """"""
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            scraper = FbRefScraper(level=logging.WARNING, compact=True)
+            with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+                squads = scraper.get_squad_summaries(stat='stats', vs='against')
+                players = scraper.get_player_summaries(stat='stats')
+            version = scraper.save_snapshot(directory=snapshot_dir)
+
+            # A new instance loads the dataframes from the snapshot without making a request
+            scraper = FbRefScraper(level=logging.WARNING, snapshot_dir=snapshot_dir)
+            with mock.patch.object(scraper._session, 'get') as get:
+                pd.testing.assert_frame_equal(squads, scraper.get_squad_summaries(stat='stats', vs='against'))
+                pd.testing.assert_frame_equal(players, scraper.get_player_summaries(stat='stats'))
+            self.assertEqual(0, get.call_count)
+            self.assertEqual(version, scraper._snapshot.version)
+            self.assertEqual('stats_standard', scraper._frame_info[('player', 9, None, 'stats', None)]['table_id'])
+
+            # Nothing is saved if nothing was scraped, and older versions are pruned once newly scraped data is saved
+            self.assertEqual(version, scraper.save_snapshot(directory=snapshot_dir, keep=1))
+            with mock.patch.object(scraper._session, 'get', return_value=_response(_page(stat='shooting'))):
+                scraper.get_squad_summaries(stat='shooting', vs='for')
+            latest = scraper.save_snapshot(directory=snapshot_dir, keep=1)
+            self.assertEqual([latest], SnapshotStore(directory=snapshot_dir).versions())
+            self.assertEqual(latest, scraper.save_snapshot(directory=snapshot_dir, keep=1))
+
+            scraper = FbRefScraper(level=logging.WARNING, snapshot_dir=snapshot_dir)
+            with mock.patch.object(scraper._session, 'get') as get:
+                pd.testing.assert_frame_equal(players, scraper.get_player_summaries(stat='stats'))
+                scraper.get_squad_summaries(stat='shooting', vs='for')
+            self.assertEqual(0, get.call_count)
+
+    def test_scrape_table_missing(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+            with self.assertRaises(ValueError):
+                scraper._scrape_table(url="https://fbref.com/en/comps/9/stats/Premier-League-Stats", table_id="nope")
+
+    def test_http_cache_revalidation(self):
+        """"""
+        url = "https://fbref.com/en/comps/9/stats/Premier-League-Stats"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # A cold cache downloads the page in full and stores it with its validators
+            scraper = FbRefScraper(level=logging.WARNING, cache_dir=cache_dir, cache_ttl=3600)
+            with mock.patch.object(scraper._session, 'get',
+                                   return_value=_response(_page(), headers={'ETag': '"abc"'})) as get:
+                scraper._scrape_table(url=url, table_id="stats_standard")
+            self.assertEqual(1, get.call_count)
+            self.assertEqual(1, scraper.http_cache_stats()['misses'])
+
+            # A new instance within the ttl is served from disk without a request
+            scraper = FbRefScraper(level=logging.WARNING, cache_dir=cache_dir, cache_ttl=3600)
+            with mock.patch.object(scraper._session, 'get') as get:
+                scraper._scrape_table(url=url, table_id="stats_standard")
+            self.assertEqual(0, get.call_count)
+            self.assertEqual(1, scraper.http_cache_stats()['hits'])
+
+            # A stale entry is revalidated with its ETag and served from disk after a 304
+            scraper = FbRefScraper(level=logging.WARNING, cache_dir=cache_dir, cache_ttl=0)
+            with mock.patch.object(scraper._session, 'get', return_value=_response('', status_code=304)) as get:
+                table = scraper._scrape_table(url=url, table_id="stats_standard")
+            self.assertEqual({'If-None-Match': '"abc"'}, get.call_args.kwargs['headers'])
+            self.assertEqual(1, scraper.http_cache_stats()['revalidations'])
+            self.assertEqual(len(_page().encode('utf-8')), scraper.http_cache_stats()['bytes_saved'])
+            self.assertEqual("stats_standard", table.get('id'))
+
+    def test_prefetch_all(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        def get(url, **kwargs):
+            stat = url.split('/')[-2]
+            if stat == 'misc':
+                return _response('<html></html>')
+            return _response(_page(stat=stat))
+
+        with mock.patch.object(scraper._session, 'get', side_effect=get):
+            report = scraper.prefetch_all(stats=['stats', 'shooting', 'misc'], max_workers=3)
+
+        self.assertEqual(['stats', 'shooting', 'misc'], list(report.keys()))
+        self.assertIsNone(report['stats']['error'])
+        self.assertIsNotNone(report['misc']['error'])
+        self.assertIn(('squad', 9, None, 'shooting', 'for'), scraper._summaries)
+        self.assertIn(('squad', 9, None, 'shooting', 'against'), scraper._summaries)
+        self.assertIn(('player', 9, None, 'shooting', None), scraper._summaries)
+        self.assertNotIn(('player', 9, None, 'misc', None), scraper._summaries)
+
+    def test_refresh_changed_tables(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        with mock.patch.object(scraper._session, 'get', return_value=_response(_page())):
+            squads = scraper.get_squad_summaries(stat='stats', vs='for')
+            scraper.get_squad_summaries(stat='stats', vs='against')
+            players = scraper.get_player_summaries(stat='stats')
+
+        # Only the player table changes between the two requests
+        page = _page().replace('2,880', '2,970')
+        with mock.patch.object(scraper._session, 'get', return_value=_response(page)) as get:
+            with mock.patch.object(scraper, '_process_table', wraps=scraper._process_table) as process:
+                report = scraper.refresh()
+
+        self.assertEqual(1, get.call_count)
+        self.assertEqual(1, process.call_count)
+        self.assertEqual({('squad', 9, None, 'stats', 'for'): 'unchanged',
+                          ('squad', 9, None, 'stats', 'against'): 'unchanged',
+                          ('player', 9, None, 'stats', None): 'changed'}, report)
+        self.assertIs(squads, scraper.get_squad_summaries(stat='stats', vs='for'))
+        self.assertIsNot(players, scraper.get_player_summaries(stat='stats'))
+        self.assertEqual(2970, scraper.get_player_summaries(stat='stats').loc[('774cf58b', 'Norwich City'), 'minutes'])
+
+    def test_wide_summaries(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        # The minutes of the shooting tables differ from every other category
+        def get(url, changed=('shooting',), **kwargs):
+            stat = url.split('/')[-2]
+            page = _page(stat=stat)
+            return _response(page.replace('1,234', '1,200').replace('2,880', '2,800') if stat in changed else page)
+
+        with mock.patch.object(scraper._session, 'get', side_effect=get) as first:
+            squads = scraper.get_wide_squad_summaries(vs='for')
+            players = scraper.get_wide_player_summaries()
+        self.assertEqual(len(FbRefScraper.SUMMARY_STAT_OPTS), first.call_count)
+
+        self.assertEqual(['Arsenal', 'Aston Villa'], list(squads.index))
+        self.assertEqual(28, squads.loc['Arsenal', 'players_used'])
+        self.assertEqual(1200, squads.loc['Arsenal', 'shooting.minutes'])
+        self.assertEqual(1234, squads.loc['Arsenal', 'stats.minutes'])
+        self.assertEqual('players_used', FbRefScraper.wide_column(df=squads, stat='shooting', metric='players_used'))
+        self.assertEqual('misc.minutes', FbRefScraper.wide_column(df=squads, stat='misc', metric='minutes'))
+        self.assertEqual(1 + len(FbRefScraper.SUMMARY_STAT_OPTS), len(squads.columns))
+
+        self.assertEqual(('774cf58b', 'Norwich City'), players.index[0])
+        self.assertTrue(players.index.is_unique)
+        self.assertEqual('Max Aarons', players.loc[('774cf58b', 'Norwich City'), 'player'])
+        self.assertEqual(2800, players.loc[('774cf58b', 'Norwich City'), 'shooting.minutes'])
+
+        # The wide frame is cached until a stored dataframe changes, here to match the shooting tables
+        self.assertIs(squads, scraper.get_wide_squad_summaries(vs='for'))
+        with mock.patch.object(scraper._session, 'get', side_effect=lambda url, **kwargs: get(
+                url, changed=FbRefScraper.SUMMARY_STAT_OPTS)):
+            scraper.refresh()
+        self.assertEqual(2 * (len(FbRefScraper.SUMMARY_STAT_OPTS) - 1), scraper.generation)
+        self.assertEqual(1200, scraper.get_wide_squad_summaries(vs='for').loc['Arsenal', 'minutes'])
+
+    def test_frame_cache_budget(self):
+        """"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            scraper = FbRefScraper(level=logging.WARNING, cache_max_bytes=1, spill_dir=spill_dir)
+
+            with mock.patch.object(scraper._session, 'get', return_value=_response(_page())) as get:
+                squads = scraper.get_squad_summaries(stat='stats', vs='for')
+                scraper.get_player_summaries(stat='stats')
+                spilled = scraper.get_squad_summaries(stat='stats', vs='for')
+
+            self.assertEqual(1, get.call_count)
+            pd.testing.assert_frame_equal(squads, spilled)
+            self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 2, 'reloads': 1, 'resident': 1, 'spilled': 1},
+                             {k: v for k, v in scraper.frame_cache_stats().items() if k not in ('bytes', 'max_bytes')})
+
+    def test_request_error_status(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING)
+
+        # The body of a 429 response left after the retries run out is not returned as the page
+        with mock.patch.object(scraper._session, 'get', return_value=_response('Too Many Requests', status_code=429)):
+            with self.assertRaises(requests.HTTPError):
+                scraper._request(url=scraper._summaries_url(stat='stats'))
+
+    def test_session_retry_settings(self):
+        """"""
+        scraper = FbRefScraper(level=logging.WARNING, pool_maxsize=16, retries=3, connect_timeout=2, read_timeout=10)
+
+        adapter = scraper._session.get_adapter("https://fbref.com/en/")
+        self.assertEqual(16, adapter._pool_maxsize)
+        self.assertEqual(3, adapter.max_retries.total)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertTrue(adapter.max_retries.respect_retry_after_header)
+        self.assertEqual((2, 10), scraper._timeout)
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.WARNING)
     unittest.main()